@@ -2,12 +2,39 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
-import numpy as np
 import altair as alt
-from database import get_db_context
-from sqlalchemy import func, desc, distinct, or_
-from elo import apply_elo_adjustments, calculate_elo_adjustments
-from models import Prix, Race, RaceResult, Player, Track, KartCombo, PrixResult
+from config import config
+from database import (
+    get_db_context,
+    shared_db_session,
+    get_cache_generation,
+    bump_cache_generation,
+    profile_queries,
+)
+from render_profiler import PROFILE_MODE, PROFILE_MODES, profile_rerun, profile_section
+from sqlalchemy import insert
+from prix_finalization import finalize_prix
+from kart_combos import get_or_create_combos, get_last_combo, set_last_combos
+from image_assets import get_thumbnail
+from track_stats import record_race
+from race_prediction import load_track_matrix, predict_race
+from catalog import KART_PARTS, KART_PART_INDEX, get_tracks
+from query_cache import (
+    load_leaderboard,
+    load_elo_history,
+    load_track_stats,
+    load_player_track_stats,
+    load_track_distribution,
+    load_player_names,
+    load_player_profile,
+    load_player_prix_count,
+    load_player_prix_history,
+    load_player_prix_races,
+    load_prix_count,
+    load_prix_list,
+    load_prix_race_results,
+)
+from models import Prix, Race, RaceResult, Player
 
 # Initialize session state for storing data
 if "prix_history" not in st.session_state:
@@ -25,9 +52,8 @@ if "combo_selections" not in st.session_state:
 if "reset_player_selector" not in st.session_state:
     st.session_state.reset_player_selector = False
 
-# Get track list from database
-with get_db_context() as db:
-    TRACK_LIST = [track.track_name for track in db.query(Track.track_name).order_by(Track.track_name).all()]
+# Track list from the process-wide catalog, loaded once rather than on every rerun
+TRACK_LIST = get_tracks().sorted_names
 
 
 # Add these mappings near the top of the file with other constants
@@ -55,794 +81,617 @@ COURSE_SETTING_MAPPING = {
     "In Order": "in_order"
 }
 
+# ELO history longer than this many days is plotted with weekly points
+ELO_HISTORY_MAX_DAILY_POINTS = 730
+
+# Number of prix shown per page in the History and Player Profiles views
+PRIX_HISTORY_PAGE_SIZE = 20
+
+# Number of queries listed in the query profile sidebar
+QUERY_PROFILE_TOP_N = 15
+
 st.set_page_config(page_title="Race Tracker", page_icon="🏎️", layout="wide")
 st.title("🏎️ Mario Kart Tracker")
 
-# Create tabs
-tab1, tab2, tab3, tab4 = st.tabs(["Home", "Player Profiles", "Create Prix", "History"])
-
-with tab1:
+def select_page(total_items, page_size, key):
+    """
+    Render a page selector for a paged list.
+
+    Args:
+        total_items: Number of items in the full list
+        page_size: Number of items per page
+        key: Session state key for the selector
+
+    Returns:
+        Selected page number, starting at 1
+    """
+    num_pages = max(1, -(-total_items // page_size))
+    # The list may have shrunk (or changed) since the page was picked
+    if st.session_state.get(key, 1) > num_pages:
+        st.session_state[key] = num_pages
+    page = st.number_input("Page", min_value=1, max_value=num_pages, step=1, key=key)
+    first_item = min((page - 1) * page_size + 1, total_items)
+    last_item = min(page * page_size, total_items)
+    st.caption(f"Showing prix {first_item}-{last_item} of {total_items}")
+    return page
+
+def render_home():
+    """Leaderboard, ELO history and track statistics."""
+    with profile_section("Leaderboard"):
+        render_leaderboard()
+    with profile_section("ELO History"):
+        render_elo_history()
+    with profile_section("Track Stats"):
+        render_track_stats()
+    with profile_section("Track Distribution"):
+        render_track_distribution()
+
+def render_leaderboard():
+    """Top players by ELO rating and the full standings table."""
     st.header("Player Leaderboard")
 
-    # Fetch player rankings from database
-    with get_db_context() as db:
-        # Get player rankings sorted by ELO rating
-        prix_results = (
-            db.query(
-                Race.prix_id,
-                Player.player_nickname,
-                Player.elo_rating,
-                func.sum(RaceResult.points_earned).label('total_points'),
-                func.count(distinct(Race.race_id)).label('total_races'),
-                func.count(distinct(Race.race_id)).filter(RaceResult.finish_position == 1).label('races_won')
-            )
-            .join(RaceResult, Player.player_id == RaceResult.player_id)
-            .join(Race, RaceResult.race_id == Race.race_id)
-            .group_by(Race.prix_id, Player.player_nickname, Player.elo_rating)
-            .subquery()
+    # Fetch player rankings sorted by ELO rating from the leaderboard snapshot
+    rankings = load_leaderboard(generation)
+
+    if rankings:
+        # Convert to DataFrame for easier manipulation
+        standings_df = pd.DataFrame([
+            {
+                'Player': r.player_nickname,
+                'ELO Rating': float(r.elo_rating),
+                'Total Races': int(r.total_races)
+            }
+            for r in rankings
+        ])
+
+        # Get top 10 players
+        top_10 = standings_df.head(10)
+
+        # Create horizontal bar chart
+        fig = px.bar(
+            top_10,
+            x='ELO Rating',
+            y='Player',
+            orientation='h',
+            title='Top Players by ELO Rating',
         )
 
-        prix_rankings = (
-            db.query(
-                prix_results.c.prix_id,
-                prix_results.c.player_nickname,
-                prix_results.c.elo_rating,
-                prix_results.c.total_races,
-                prix_results.c.races_won,
-                func.rank().over(
-                    partition_by=prix_results.c.prix_id,
-                    order_by=prix_results.c.total_points.desc()
-                ).label('prix_finish_position')
-            )
-            .subquery()
-        )
+        # Customize the bars
+        colors = ['gold', 'silver', '#CD7F32'] + ['#E8E8E8'] * 7  # Gold, Silver, Bronze + Gray for rest
+        medal_emojis = ['🥇', '🥈', '🥉']
 
-        rankings = (
-            db.query(
-                prix_rankings.c.player_nickname,
-                prix_rankings.c.elo_rating,
-                func.sum(prix_rankings.c.total_races).label('total_races'),
-                func.sum(prix_rankings.c.races_won).label('races_won'),
-                (func.sum(prix_rankings.c.races_won) / func.sum(prix_rankings.c.total_races)).label('race_win_rate'),
-                func.count(distinct(prix_rankings.c.prix_id)).label('total_prixs'),
-                func.count(distinct(prix_rankings.c.prix_id)).filter(prix_rankings.c.prix_finish_position == 1).label('prixs_won'),
-                (func.count(distinct(prix_rankings.c.prix_id)).filter(prix_rankings.c.prix_finish_position == 1) / func.count(distinct(prix_rankings.c.prix_id))).label('prix_win_rate')
-            )
-            .group_by(prix_rankings.c.player_nickname, prix_rankings.c.elo_rating)
-            .order_by(prix_rankings.c.elo_rating.desc())
-            .all()
+        # Update bar colors and add ELO rating labels
+        fig.update_traces(
+            marker_color=colors,
+            textposition='outside',
+            texttemplate='%{x:.0f}',  # Show ELO rating
+            textfont=dict(size=14)
         )
 
-        if rankings:
-            # Convert to DataFrame for easier manipulation
-            standings_df = pd.DataFrame([
-                {
-                    'Player': r.player_nickname,
-                    'ELO Rating': float(r.elo_rating),
-                    'Total Races': int(r.total_races)
-                }
-                for r in rankings
-            ])
-
-            # Get top 10 players
-            top_10 = standings_df.head(10)
-
-            # Create horizontal bar chart
-            fig = px.bar(
-                top_10,
-                x='ELO Rating',
-                y='Player',
-                orientation='h',
-                title='Top Players by ELO Rating',
-            )
-
-            # Customize the bars
-            colors = ['gold', 'silver', '#CD7F32'] + ['#E8E8E8'] * 7  # Gold, Silver, Bronze + Gray for rest
-            medal_emojis = ['🥇', '🥈', '🥉']
-
-            # Update bar colors and add ELO rating labels
-            fig.update_traces(
-                marker_color=colors,
-                textposition='outside',
-                texttemplate='%{x:.0f}',  # Show ELO rating
-                textfont=dict(size=14)
-            )
+        # Customize y-axis labels (player names) with medals for top 3
+        fig.update_layout(
+            yaxis=dict(
+                ticktext=[
+                    f"{medal_emojis[i]} {player}" if i < 3 else player
+                    for i, player in enumerate(top_10['Player'])
+                ],
+                tickvals=list(range(len(top_10))),
+                autorange="reversed",  # Put highest rated player at top
+                tickfont=dict(size=16)  # Make y-axis labels larger
+            ),
+            xaxis_title="ELO Rating",
+            yaxis_title="",
+            margin=dict(l=10, r=10, t=40, b=10),
+            height=400,
+            plot_bgcolor='rgba(0,0,0,0)',
+            title={
+                'text': 'Top Players by ELO Rating',
+                'x': 0.5,
+                'y': 0.95,
+                'xanchor': 'center',
+                'yanchor': 'top'
+            }
+        )
 
-            # Customize y-axis labels (player names) with medals for top 3
-            fig.update_layout(
-                yaxis=dict(
-                    ticktext=[
-                        f"{medal_emojis[i]} {player}" if i < 3 else player
-                        for i, player in enumerate(top_10['Player'])
-                    ],
-                    tickvals=list(range(len(top_10))),
-                    autorange="reversed",  # Put highest rated player at top
-                    tickfont=dict(size=16)  # Make y-axis labels larger
+        # Add gridlines
+        fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='LightGray')
+        fig.update_yaxes(showgrid=False)
+
+        # Display the chart
+        st.plotly_chart(fig, use_container_width=True)
+
+        # Create detailed standings table
+        table_data = pd.DataFrame([
+            {
+                'Player': r.player_nickname,
+                'ELO Rating': int(r.elo_rating),
+                'Total Races': int(r.total_races),
+                'Races Won': int(r.races_won),
+                'Win Rate': f"{r.races_won / r.total_races if r.total_races else 0:.1%}",
+                'Total Prix': int(r.total_prixs),
+                'Prix Won': int(r.prixs_won),
+                'Prix Win Rate': f"{r.prixs_won / r.total_prixs if r.total_prixs else 0:.1%}"
+            }
+            for r in rankings
+        ])
+        
+        # Add ranking column
+        table_data.index = range(1, len(table_data) + 1)
+        table_data.index.name = 'Rank'
+        
+        # Display the table
+        st.dataframe(
+            table_data,
+            use_container_width=True,
+            column_config={
+                'ELO Rating': st.column_config.NumberColumn(
+                    'ELO Rating',
+                    help='Player\'s current ELO rating'
                 ),
-                xaxis_title="ELO Rating",
-                yaxis_title="",
-                margin=dict(l=10, r=10, t=40, b=10),
-                height=400,
-                plot_bgcolor='rgba(0,0,0,0)',
-                title={
-                    'text': 'Top Players by ELO Rating',
-                    'x': 0.5,
-                    'y': 0.95,
-                    'xanchor': 'center',
-                    'yanchor': 'top'
-                }
-            )
-
-            # Add gridlines
-            fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='LightGray')
-            fig.update_yaxes(showgrid=False)
-
-            # Display the chart
-            st.plotly_chart(fig, use_container_width=True)
+                'Total Races': st.column_config.NumberColumn(
+                    'Total Races',
+                    help='Total number of races completed'
+                ),
+                'Races Won': st.column_config.NumberColumn(
+                    'Races Won',
+                    help='Number of races finished in 1st place'
+                ),
+                'Win Rate': st.column_config.TextColumn(
+                    'Win Rate',
+                    help='Percentage of races won'
+                ),
+                'Total Prixs': st.column_config.NumberColumn(
+                    'Total Prixs',
+                    help='Number of prix tournaments completed'
+                ),
+                'Prixs Won': st.column_config.NumberColumn(
+                    'Prixs Won',
+                    help='Number of prix tournaments won'
+                ),
+                'Prix Win Rate': st.column_config.TextColumn(
+                    'Prix Win Rate',
+                    help='Percentage of prix tournaments won'
+                )
+            },
+            hide_index=False
+        )
+    else:
+        st.info("No race data available yet. Create a Prix to get started!")
 
-            # Create detailed standings table
-            table_data = pd.DataFrame([
-                {
-                    'Player': r.player_nickname,
-                    'ELO Rating': int(r.elo_rating),
-                    'Total Races': int(r.total_races),
-                    'Races Won': int(r.races_won),
-                    'Win Rate': f"{float(r.race_win_rate):.1%}",
-                    'Total Prix': int(r.total_prixs),
-                    'Prix Won': int(r.prixs_won),
-                    'Prix Win Rate': f"{float(r.prix_win_rate):.1%}"
-                }
-                for r in rankings
-            ])
-            
-            # Add ranking column
-            table_data.index = range(1, len(table_data) + 1)
-            table_data.index.name = 'Rank'
-            
-            # Display the table
-            st.dataframe(
-                table_data,
-                use_container_width=True,
-                column_config={
-                    'ELO Rating': st.column_config.NumberColumn(
-                        'ELO Rating',
-                        help='Player\'s current ELO rating'
-                    ),
-                    'Total Races': st.column_config.NumberColumn(
-                        'Total Races',
-                        help='Total number of races completed'
-                    ),
-                    'Races Won': st.column_config.NumberColumn(
-                        'Races Won',
-                        help='Number of races finished in 1st place'
-                    ),
-                    'Win Rate': st.column_config.TextColumn(
-                        'Win Rate',
-                        help='Percentage of races won'
-                    ),
-                    'Total Prixs': st.column_config.NumberColumn(
-                        'Total Prixs',
-                        help='Number of prix tournaments completed'
-                    ),
-                    'Prixs Won': st.column_config.NumberColumn(
-                        'Prixs Won',
-                        help='Number of prix tournaments won'
-                    ),
-                    'Prix Win Rate': st.column_config.TextColumn(
-                        'Prix Win Rate',
-                        help='Percentage of prix tournaments won'
-                    )
-                },
-                hide_index=False
-            )
-        else:
-            st.info("No race data available yet. Create a Prix to get started!")
-    
+def render_elo_history():
+    """Every player's ELO rating over time."""
     st.header("ELO Rating History")
     
     # Get ELO rating history for each player
-    with get_db_context() as db:
-        # Get all prix results with dates
-        elo_history = (
-            db.query(
-                Player.player_nickname,
-                func.date(Prix.date_played).label('date'),
-                PrixResult.ending_elo
-            )
-            .join(PrixResult, Player.player_id == PrixResult.player_id)
-            .join(Prix, PrixResult.prix_id == Prix.prix_id)
-            .distinct(Player.player_nickname, func.date(Prix.date_played))
-            .order_by(
-                Player.player_nickname,
-                func.date(Prix.date_played),
-                Prix.date_played.desc()
-            )
-            .all()
+    # Get all prix results with dates
+    elo_history = load_elo_history(generation)
+
+    if elo_history:
+        # Convert to DataFrame; the query already keeps each player's last rating per day
+        df = pd.DataFrame(elo_history, columns=['Player', 'Date', 'ELO'])
+        df['Date'] = pd.to_datetime(df['Date'])
+
+        # One column per player, one row per day up to today, with ratings
+        # carried forward over days a player didn't play
+        max_date = pd.Timestamp(datetime.now().date())
+        elo_by_day = df.pivot(index='Date', columns='Player', values='ELO')
+        elo_by_day = elo_by_day.reindex(
+            pd.date_range(elo_by_day.index.min(), max_date, freq='D')
+        ).ffill()
+
+        # Plot long histories weekly to keep the chart payload bounded
+        if len(elo_by_day) > ELO_HISTORY_MAX_DAILY_POINTS:
+            elo_by_day = elo_by_day.resample('W').last()
+
+        # Back to long format; days before a player's first prix stay empty and are dropped
+        df_filled = (
+            elo_by_day.rename_axis('Date')
+            .reset_index()
+            .melt(id_vars='Date', var_name='Player', value_name='ELO')
+            .dropna(subset=['ELO'])
         )
 
-        if elo_history:
-            # Convert to DataFrame
-            df = pd.DataFrame([
-                {
-                    'Player': r[0],
-                    'Date': r[1],
-                    'ELO': r[2]
-                } for r in elo_history
-            ])
-
-            # Get min and max dates
-            min_date = df['Date'].min()
-            max_date = datetime.now().date()
-
-            # Create complete date range
-            date_range = pd.date_range(min_date, max_date, freq='D')
-
-            # Create list to store filled data
-            filled_data = []
-
-            # For each player
-            for player in df['Player'].unique():
-                player_data = df[df['Player'] == player]
-                
-                # Get player's first date
-                player_start = player_data['Date'].min()
-                
-                # Create date range from player's first date
-                player_dates = pd.date_range(player_start, max_date, freq='D')
-                
-                # Forward fill ELO ratings
-                player_elos = pd.Series(
-                    player_data.set_index('Date')['ELO']
-                ).reindex(player_dates).ffill()
-                
-                # Add to filled data
-                for date, elo in player_elos.items():
-                    filled_data.append({
-                        'Player': player,
-                        'Date': date,
-                        'ELO': elo
-                    })
-
-            # Create final DataFrame
-            df_filled = pd.DataFrame(filled_data)
-
-            # Add player selection
-            available_players = sorted(df_filled['Player'].unique())
-            selected_players = st.multiselect(
-                "Select players to display",
-                options=available_players,
-                default=available_players
-            )
+        # Add player selection
+        available_players = sorted(df_filled['Player'].unique())
+        selected_players = st.multiselect(
+            "Select players to display",
+            options=available_players,
+            default=available_players
+        )
 
-            # Filter data for selected players
-            df_filtered = df_filled[df_filled['Player'].isin(selected_players)]
+        # Filter data for selected players
+        df_filtered = df_filled[df_filled['Player'].isin(selected_players)]
 
-            # Create line chart
-            chart = alt.Chart(df_filtered).mark_line().encode(
-                x=alt.X('Date:T', title='Date'),
-                y=alt.Y('ELO:Q', title='ELO Rating', scale=alt.Scale(zero=False)),
-                color=alt.Color('Player:N', title='Player'),
-                tooltip=['Player', 'Date', 'ELO']
-            ).properties(
-                height=400
-            ).interactive()
+        # Create line chart
+        chart = alt.Chart(df_filtered).mark_line().encode(
+            x=alt.X('Date:T', title='Date'),
+            y=alt.Y('ELO:Q', title='ELO Rating', scale=alt.Scale(zero=False)),
+            color=alt.Color('Player:N', title='Player'),
+            tooltip=['Player', 'Date', 'ELO']
+        ).properties(
+            height=400
+        ).interactive()
 
-            st.altair_chart(chart, use_container_width=True)
-        else:
-            st.info("No ELO history available yet. Complete some Prix tournaments to see rating changes.")
+        st.altair_chart(chart, use_container_width=True)
+    else:
+        st.info("No ELO history available yet. Complete some Prix tournaments to see rating changes.")
 
+def render_track_stats():
+    """Player rankings on a selected track."""
     st.header("Track Stats")
     # Track selection dropdown
-    with get_db_context() as db:
-        available_tracks = [
-            track[0] for track in 
-            db.query(Track.track_name)
-            .distinct()
-            .order_by(Track.track_name)
-            .all()
-        ]
-        
-        if available_tracks:
-            selected_track = st.selectbox(
-                "Select a track to view player performance",
-                options=available_tracks
-            )
+    available_tracks = TRACK_LIST
+    
+    if available_tracks:
+        selected_track = st.selectbox(
+            "Select a track to view player performance",
+            options=available_tracks
+        )
+
+        # Get total races, top winner and top 10 players for selected track
+        track_race_count, track_winner, track_rankings = load_track_stats(generation, selected_track)
 
-            # Get total races for selected track
-            track_race_count = (
-                db.query(func.count(Race.race_id))
-                .join(Track, Race.track_id == Track.track_id)
-                .filter(Track.track_name == selected_track)
-                .scalar()
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric(
+                label="Total Times Raced",
+                value=track_race_count
             )
-            
-            # Get player with most wins on this track
-            track_winner = (
-                db.query(
-                    Player.player_nickname,
-                    func.count(RaceResult.result_id).label('wins')
+        
+        with col2:
+            if track_winner:
+                st.metric(
+                    label="Most Wins 🥇",
+                    value=f"{track_winner.player_nickname} ({track_winner.wins})"
                 )
-                .join(RaceResult, Player.player_id == RaceResult.player_id)
-                .join(Race, RaceResult.race_id == Race.race_id)
-                .join(Track, Race.track_id == Track.track_id)
-                .filter(Track.track_name == selected_track)
-                .filter(RaceResult.finish_position == 1)
-                .group_by(Player.player_nickname)
-                .order_by(desc('wins'))
-                .first()
-            )
-
-            col1, col2 = st.columns(2)
-            with col1:
+            else:
                 st.metric(
-                    label="Total Times Raced",
-                    value=track_race_count
+                    label="Most Wins 🥇", 
+                    value="No wins recorded"
                 )
-            
-            with col2:
-                if track_winner:
-                    st.metric(
-                        label="Most Wins 🥇",
-                        value=f"{track_winner.player_nickname} ({track_winner.wins})"
-                    )
-                else:
-                    st.metric(
-                        label="Most Wins 🥇", 
-                        value="No wins recorded"
-                    )
 
-            # Get top 10 players by average finish position for selected track
-            track_rankings = (
-                db.query(
-                    Player.player_nickname,
-                    func.avg(RaceResult.points_earned).label('avg_points'),
-                    func.count(RaceResult.result_id).label('total_races')
-                )
-                .join(RaceResult, Player.player_id == RaceResult.player_id)
-                .join(Race, RaceResult.race_id == Race.race_id)
-                .join(Track, Race.track_id == Track.track_id)
-                .filter(Track.track_name == selected_track)
-                .group_by(Player.player_nickname)
-                .having(func.count(RaceResult.result_id) >= 1)
-                .order_by(desc('avg_points'))
-                .limit(10)
-                .all()
+        if track_rankings:
+            # Convert to DataFrame
+            df = pd.DataFrame(
+                [(row.player_nickname, row.avg_points, row.races) for row in track_rankings],
+                columns=['Player', 'Average Points', 'Total Races']
             )
+            df['Average Points'] = df['Average Points'].round(2)
 
-            if track_rankings:
-                # Convert to DataFrame
-                df = pd.DataFrame(
-                    track_rankings,
-                    columns=['Player', 'Average Points', 'Total Races']
-                )
-                df['Average Points'] = df['Average Points'].round(2)
-
-                # Create horizontal bar chart for track rankings
-                fig = px.bar(
-                    df,
-                    x='Average Points',
-                    y='Player',
-                    orientation='h',
-                    text='Average Points',
-                )
-                
-                # Customize the bars
-                colors = ['gold', 'silver', '#CD7F32'] + ['#E8E8E8'] * 7
-                
-                # Update traces
-                fig.update_traces(
-                    marker_color=colors,
-                    textposition='outside',
-                    texttemplate='%{x:.2f}',
-                    cliponaxis=False
-                )
-                
-                # Customize layout
-                fig.update_layout(
-                    xaxis_range=[0, 15],
-                    xaxis_title="Average Points per Race",
-                    yaxis_title="",
-                    yaxis=dict(
-                        autorange="reversed",
-                        tickfont=dict(size=14)
-                    ),
-                    margin=dict(l=10, r=100, t=40, b=10),
-                    height=max(400, len(df) * 40),
-                    uniformtext=dict(
-                        mode='hide',
-                        minsize=10
-                    ),
-                    title={
-                        'text': f'Top Players on {selected_track}',
-                        'x': 0.5,
-                        'y': 0.95,
-                        'xanchor': 'center',
-                        'yanchor': 'top'
-                    }
-                )
-                
-                # Add gridlines
-                fig.update_xaxes(
-                    showgrid=True,
-                    gridwidth=1,
-                    gridcolor='LightGray',
-                    range=[0, 16]  # Give extra space for labels
-                )
-                fig.update_yaxes(showgrid=False)
-                
-                # Display chart
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info(f"No race data available for {selected_track}")
-        else:
-            st.info("No track data available yet. Create a Prix to get started!")
-
-    st.subheader("Track Distribution")
-
-    # Query database for track distribution
-    with get_db_context() as db:
-        track_counts = (
-            db.query(
-                Track.track_name,
-                func.count(Race.race_id).label('number_of_races')
-            )
-            .join(Race, Race.track_id == Track.track_id, isouter=True)
-            .group_by(Track.track_name)
-            .order_by(desc('number_of_races'))
-            .all()
-        )
-        
-        if track_counts:
-            # Convert to DataFrame
-            df = pd.DataFrame(track_counts, columns=['Track', 'Races'])
-            
-            # Calculate expected value if tracks were chosen equally
-            total_races = df['Races'].sum()
-            expected_races = total_races / len(TRACK_LIST)
-            
-            # Add missing tracks with 0 races
-            existing_tracks = df['Track'].tolist()
-            missing_tracks = [track for track in TRACK_LIST if track not in existing_tracks]
-            if missing_tracks:
-                df = pd.concat([
-                    df,
-                    pd.DataFrame({'Track': missing_tracks, 'Races': 0})
-                ])
-            
-            # Create horizontal bar chart
+            # Create horizontal bar chart for track rankings
             fig = px.bar(
                 df,
-                x='Races',
-                y='Track',
+                x='Average Points',
+                y='Player',
                 orientation='h',
-                text='Races'
+                text='Average Points',
             )
             
-            # Add expected value line
-            fig.add_vline(
-                x=expected_races,
-                line_dash="dash",
-                line_color="rgba(255, 0, 0, 0.5)",
-                annotation_text="Expected",
-                annotation_position="top"
-            )
-            
-            # Update layout with improved label visibility
-            fig.update_layout(
-                yaxis={'categoryorder': 'total ascending'},
-                showlegend=False,
-                margin=dict(l=10, r=10, t=40, b=10),
-                height=max(400, len(df) * 25),  # Dynamic height based on number of tracks
-                uniformtext=dict(mode='hide', minsize=8),  # Ensure consistent text size
-            )
+            # Customize the bars
+            colors = ['gold', 'silver', '#CD7F32'] + ['#E8E8E8'] * 7
             
-            # Update traces to show labels
+            # Update traces
             fig.update_traces(
+                marker_color=colors,
                 textposition='outside',
-                texttemplate='%{x}',  # Show the number of races
-                cliponaxis=False  # Prevent labels from being cut off
+                texttemplate='%{x:.2f}',
+                cliponaxis=False
+            )
+            
+            # Customize layout
+            fig.update_layout(
+                xaxis_range=[0, 15],
+                xaxis_title="Average Points per Race",
+                yaxis_title="",
+                yaxis=dict(
+                    autorange="reversed",
+                    tickfont=dict(size=14)
+                ),
+                margin=dict(l=10, r=100, t=40, b=10),
+                height=max(400, len(df) * 40),
+                uniformtext=dict(
+                    mode='hide',
+                    minsize=10
+                ),
+                title={
+                    'text': f'Top Players on {selected_track}',
+                    'x': 0.5,
+                    'y': 0.95,
+                    'xanchor': 'center',
+                    'yanchor': 'top'
+                }
             )
             
-            # Update axes
+            # Add gridlines
             fig.update_xaxes(
-                title='Races',
                 showgrid=True,
                 gridwidth=1,
-                gridcolor='LightGray'
-            )
-            fig.update_yaxes(
-                title='',
-                showgrid=False,
-                tickfont=dict(size=12)  # Adjust track name font size
+                gridcolor='LightGray',
+                range=[0, 16]  # Give extra space for labels
             )
+            fig.update_yaxes(showgrid=False)
             
+            # Display chart
             st.plotly_chart(fig, use_container_width=True)
         else:
-            st.info("No race data available yet to show track distribution.")
+            st.info(f"No race data available for {selected_track}")
+    else:
+        st.info("No track data available yet. Create a Prix to get started!")
 
-with tab2:
-    st.header("Player Profiles")
+def render_track_distribution():
+    """Races per track against an even spread."""
+    st.subheader("Track Distribution")
 
-    # Add player selection dropdown
-    with get_db_context() as db:
-        # Get all unique player nicknames
-        players = db.query(Player.player_nickname).distinct().order_by(Player.player_nickname).all()
-        player_list = [p[0] for p in players]
+    # Query database for track distribution
+    track_counts = load_track_distribution(generation)
+    
+    if track_counts:
+        # Convert to DataFrame
+        df = pd.DataFrame(track_counts, columns=['Track', 'Races'])
         
-        col1, _ = st.columns([1, 3])  # Create columns to constrain width
-        with col1:
-            selected_player = st.selectbox(
-                "Select Player",
-                player_list,
-                key="player_profile_select",
-                label_visibility="visible",
-                help="Choose a player to view their profile"
-            )        
+        # Calculate expected value if tracks were chosen equally
+        total_races = df['Races'].sum()
+        expected_races = total_races / len(TRACK_LIST)
         
-        if selected_player:
-            # Prix Statistics
-            all_prix_history = (
-                db.query(
-                    Prix.prix_id,
-                    Player.player_nickname,
-                    func.sum(RaceResult.points_earned).label('total_points'),
-                    func.rank().over(
-                        partition_by=Prix.prix_id,
-                        order_by=func.sum(RaceResult.points_earned).desc()
-                        ).label('finish_position')
-                )
-                .join(Race, Race.prix_id == Prix.prix_id)
-                .join(RaceResult, RaceResult.race_id == Race.race_id)
-                .join(Player, Player.player_id == RaceResult.player_id)
-                .group_by(Prix.prix_id, Player.player_nickname)
-                .subquery()
-            )
-
-            # Get total prix and prix wins
-            prix_stats = (
-                db.query(
-                    func.count(distinct(all_prix_history.c.prix_id)).label('total_prix'),
-                    func.count(distinct(all_prix_history.c.prix_id)).filter(
-                        all_prix_history.c.finish_position == 1
-                    ).label('prix_wins'),
-                    func.avg(all_prix_history.c.finish_position).label('average_finish_position')
-                )
-                .filter(all_prix_history.c.player_nickname == selected_player)
-                .first()
-            )
-
-            # Race Statistics 
-            race_stats = (
-                db.query(
-                    func.count(Race.race_id).label('total_races'),
-                    func.count(Race.race_id).filter(
-                        RaceResult.finish_position == 1
-                    ).label('race_wins'),
-                    func.avg(RaceResult.points_earned).label('average_points')
-                )
-                .join(RaceResult, RaceResult.race_id == Race.race_id)
-                .join(Player, Player.player_id == RaceResult.player_id)
-                .filter(Player.player_nickname == selected_player)
-                .first()
-            )
-
-            # Display Prix Stats
-            if prix_stats.total_prix > 0:
-                prix_col1, prix_col2, prix_col3, prix_col4 = st.columns(4)
-                with prix_col1:
-                    st.metric("Prixs Won", prix_stats.prix_wins)
-                with prix_col2:
-                    st.metric("Total Prixs", prix_stats.total_prix)
-                with prix_col3:
-                    prix_win_rate = (prix_stats.prix_wins / prix_stats.total_prix * 100) if prix_stats.total_prix > 0 else 0
-                    st.metric("Prix Win Rate", f"{prix_win_rate:.1f}%")
-                with prix_col4:
-                    st.metric("Average Finish Position", f"{prix_stats.average_finish_position:.1f}")
-            else:
-                st.info("No prix data available yet")
-
-            # Display Race Stats
-            if race_stats.total_races > 0:
-                race_col1, race_col2, race_col3, race_col4 = st.columns(4)
-                with race_col1:
-                    st.metric("Races Won", race_stats.race_wins)
-                with race_col2:
-                    st.metric("Total Races", race_stats.total_races)
-                with race_col3:
-                    race_win_rate = (race_stats.race_wins / race_stats.total_races * 100) if race_stats.total_races > 0 else 0
-                    st.metric("Race Win Rate", f"{race_win_rate:.1f}%")
-                with race_col4:
-                    st.metric("Average Points per Race", f"{race_stats.average_points:.1f}")
-            else:
-                st.info("No race data available yet")
-
-            st.subheader('Favourite Kart Combo')
-            favkart_combo = (
-                db.query(
-                    KartCombo.character_name,
-                    KartCombo.vehicle_name,
-                    KartCombo.tire_name,
-                    KartCombo.glider_name,
-                    func.count(distinct(Prix.prix_id)).label('total_prixs')
-                )
-                .join(Race, Race.prix_id == Prix.prix_id)
-                .join(RaceResult, RaceResult.race_id == Race.race_id)
-                .join(Player, Player.player_id == RaceResult.player_id)
-                .join(KartCombo, KartCombo.combo_id == RaceResult.combo_id)
-                .filter(Player.player_nickname == selected_player)
-                .group_by(KartCombo.character_name, KartCombo.vehicle_name, KartCombo.tire_name, KartCombo.glider_name)
-                .order_by(desc(func.count(distinct(Prix.prix_id))))
-                .first()
-            )
+        # Add missing tracks with 0 races
+        existing_tracks = df['Track'].tolist()
+        missing_tracks = [track for track in TRACK_LIST if track not in existing_tracks]
+        if missing_tracks:
+            df = pd.concat([
+                df,
+                pd.DataFrame({'Track': missing_tracks, 'Races': 0})
+            ])
+        
+        # Create horizontal bar chart
+        fig = px.bar(
+            df,
+            x='Races',
+            y='Track',
+            orientation='h',
+            text='Races'
+        )
+        
+        # Add expected value line
+        fig.add_vline(
+            x=expected_races,
+            line_dash="dash",
+            line_color="rgba(255, 0, 0, 0.5)",
+            annotation_text="Expected",
+            annotation_position="top"
+        )
+        
+        # Update layout with improved label visibility
+        fig.update_layout(
+            yaxis={'categoryorder': 'total ascending'},
+            showlegend=False,
+            margin=dict(l=10, r=10, t=40, b=10),
+            height=max(400, len(df) * 25),  # Dynamic height based on number of tracks
+            uniformtext=dict(mode='hide', minsize=8),  # Ensure consistent text size
+        )
+        
+        # Update traces to show labels
+        fig.update_traces(
+            textposition='outside',
+            texttemplate='%{x}',  # Show the number of races
+            cliponaxis=False  # Prevent labels from being cut off
+        )
+        
+        # Update axes
+        fig.update_xaxes(
+            title='Races',
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='LightGray'
+        )
+        fig.update_yaxes(
+            title='',
+            showgrid=False,
+            tickfont=dict(size=12)  # Adjust track name font size
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No race data available yet to show track distribution.")
 
-            if favkart_combo:
-                kart_col1, kart_col2, kart_col3, kart_col4= st.columns(4)
-                
-                # Load and resize images to consistent height of 100px while maintaining aspect ratio
-                from PIL import Image
-                
-                def resize_image(image_path, target_height=100):
-                    img = Image.open(image_path)
-                    aspect_ratio = img.width / img.height
-                    new_width = int(target_height * aspect_ratio)
-                    return img.resize((new_width, target_height))
-                
-                def get_file_path(name, image_type):
-                    return f"images/{image_type}/{name.replace(" ", "_").replace("-", "_").lower()}.png"
+def render_player_profiles():
+    """Statistics, favourite kart combo and prix history for one player."""
+    st.header("Player Profiles")
 
-                with kart_col1:
-                    img = resize_image(get_file_path(favkart_combo.character_name, "characters"))
-                    st.image(img, caption=favkart_combo.character_name)
-                
-                with kart_col2:
-                    img = resize_image(get_file_path(favkart_combo.vehicle_name, "vehicles"))
-                    st.image(img, caption=favkart_combo.vehicle_name)
-                
-                with kart_col3:
-                    img = resize_image(get_file_path(favkart_combo.tire_name, "tires"))
-                    st.image(img, caption=favkart_combo.tire_name)
-                
-                with kart_col4:
-                    img = resize_image(get_file_path(favkart_combo.glider_name, "gliders"))
-                    st.image(img, caption=favkart_combo.glider_name)
-            else:
-                st.info("No kart combo data available yet")
+    # Add player selection dropdown
+    # Get all unique player nicknames
+    player_list = load_player_names(generation)
+    
+    col1, _ = st.columns([1, 3])  # Create columns to constrain width
+    with col1:
+        selected_player = st.selectbox(
+            "Select Player",
+            player_list,
+            key="player_profile_select",
+            label_visibility="visible",
+            help="Choose a player to view their profile"
+        )        
+    
+    if selected_player:
+        # Prix and race statistics plus favourite kart combo
+        prix_stats, race_stats, favkart_combo = load_player_profile(generation, selected_player)
+
+        # Display Prix Stats
+        if prix_stats.total_prix > 0:
+            prix_col1, prix_col2, prix_col3, prix_col4 = st.columns(4)
+            with prix_col1:
+                st.metric("Prixs Won", prix_stats.prix_wins)
+            with prix_col2:
+                st.metric("Total Prixs", prix_stats.total_prix)
+            with prix_col3:
+                prix_win_rate = (prix_stats.prix_wins / prix_stats.total_prix * 100) if prix_stats.total_prix > 0 else 0
+                st.metric("Prix Win Rate", f"{prix_win_rate:.1f}%")
+            with prix_col4:
+                st.metric("Average Finish Position", f"{prix_stats.average_finish_position:.1f}")
+        else:
+            st.info("No prix data available yet")
+
+        # Display Race Stats
+        if race_stats.total_races > 0:
+            race_col1, race_col2, race_col3, race_col4 = st.columns(4)
+            with race_col1:
+                st.metric("Races Won", race_stats.race_wins)
+            with race_col2:
+                st.metric("Total Races", race_stats.total_races)
+            with race_col3:
+                race_win_rate = (race_stats.race_wins / race_stats.total_races * 100) if race_stats.total_races > 0 else 0
+                st.metric("Race Win Rate", f"{race_win_rate:.1f}%")
+            with race_col4:
+                st.metric("Average Points per Race", f"{race_stats.average_points:.1f}")
+        else:
+            st.info("No race data available yet")
 
-            st.subheader(f"Top 10 tracks by avg points per race")
+        st.subheader('Favourite Kart Combo')
+        if favkart_combo:
+            kart_col1, kart_col2, kart_col3, kart_col4= st.columns(4)
             
-            st.subheader(f"Track specific stats")
-            # Create track selection dropdown
-            selected_track = st.selectbox(
-                "Select Track",
-                options=TRACK_LIST,
-                key="track_stats_selector"
-            )
+            # Pre-sized thumbnails, decoded once per image and then served from cache
+            with kart_col1:
+                st.image(get_thumbnail(favkart_combo.character_name, "characters"), caption=favkart_combo.character_name)
             
-            st.subheader(f"Prix History for {selected_player}")
-
-            # Get all prix history for selected player
-            all_prix_history = (
-                db.query(
-                    Prix.prix_id,
-                    Prix.date_played,
-                    Player.player_nickname,
-                    Prix.number_of_players.label('num_players'),
-                    Prix.race_count.label('num_races'),
-                    func.sum(RaceResult.points_earned).label('total_points'),
-                    func.rank().over(
-                        partition_by=Prix.prix_id,
-                        order_by=func.sum(RaceResult.points_earned).desc()
-                        ).label('finish_position')
-                )
-                .join(Race, Race.prix_id == Prix.prix_id)
-                .join(RaceResult, RaceResult.race_id == Race.race_id)
-                .join(Player, Player.player_id == RaceResult.player_id)
-                .group_by(Prix.prix_id, Prix.date_played, Player.player_nickname)
-                .subquery()
+            with kart_col2:
+                st.image(get_thumbnail(favkart_combo.vehicle_name, "vehicles"), caption=favkart_combo.vehicle_name)
+            
+            with kart_col3:
+                st.image(get_thumbnail(favkart_combo.tire_name, "tires"), caption=favkart_combo.tire_name)
+            
+            with kart_col4:
+                st.image(get_thumbnail(favkart_combo.glider_name, "gliders"), caption=favkart_combo.glider_name)
+        else:
+            st.info("No kart combo data available yet")
+
+        # Every track the player has raced on, best average first
+        player_track_stats = load_player_track_stats(generation, player_nicknames=(selected_player,))
+
+        st.subheader(f"Top 10 tracks by avg points per race")
+        if player_track_stats:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        'Track': row.track_name,
+                        'Average Points': round(row.avg_points, 2),
+                        'Average Position': round(row.avg_position, 1),
+                        'Races': row.races,
+                        'Wins': row.wins
+                    }
+                    for row in player_track_stats[:10]
+                ]),
+                hide_index=True,
+                use_container_width=True
             )
+        else:
+            st.info("No track data available yet")
+        
+        st.subheader(f"Track specific stats")
+        # Create track selection dropdown
+        selected_track = st.selectbox(
+            "Select Track",
+            options=TRACK_LIST,
+            key="track_stats_selector"
+        )
+        track_row = next((row for row in player_track_stats if row.track_name == selected_track), None)
+        if track_row:
+            track_col1, track_col2, track_col3, track_col4 = st.columns(4)
+            with track_col1:
+                st.metric("Races", track_row.races)
+            with track_col2:
+                st.metric("Wins", track_row.wins)
+            with track_col3:
+                st.metric("Average Points per Race", f"{track_row.avg_points:.1f}")
+            with track_col4:
+                st.metric("Average Finish Position", f"{track_row.avg_position:.1f}")
+        else:
+            st.info(f"{selected_player} hasn't raced on {selected_track} yet")
+        
+        st.subheader(f"Prix History for {selected_player}")
 
-            # Get prix history for selected player 
-            prix_history_filtered = (
-                db.query(
-                    all_prix_history.c.prix_id,
-                    all_prix_history.c.date_played,
-                    all_prix_history.c.num_players,
-                    all_prix_history.c.num_races,
-                    all_prix_history.c.total_points,
-                    all_prix_history.c.finish_position
-                )
-                .filter(all_prix_history.c.player_nickname == selected_player)
-                .order_by(all_prix_history.c.date_played.desc())
-                .all()
+        # Get one page of prix history for selected player
+        page = select_page(
+            load_player_prix_count(generation, selected_player),
+            PRIX_HISTORY_PAGE_SIZE,
+            "player_prix_page"
+        )
+        prix_history_filtered = load_player_prix_history(
+            generation, selected_player, page, PRIX_HISTORY_PAGE_SIZE
+        )
+        
+        if prix_history_filtered:
+            # Get race details for every prix on this page in one go
+            race_details_by_prix = load_player_prix_races(
+                generation, selected_player, tuple(prix.prix_id for prix in prix_history_filtered)
             )
-            
-            if prix_history_filtered:
-                for prix in prix_history_filtered:
-                    # Create expander for each prix
-                    with st.expander(
-                        f"{prix.date_played.strftime('%Y-%m-%d')} - {prix.num_races} Races - "
-                        f"{prix.finish_position}{['st','nd','rd','th'][min(int(prix.finish_position)-1,3)]} Place"
-                    ):
-                        # Get detailed race results for this prix
-                        race_details = (
-                            db.query(
-                                Race.race_number,
-                                Track.track_name,
-                                RaceResult.finish_position,
-                                RaceResult.points_earned
-                            )
-                            .join(Track, Race.track_id == Track.track_id)
-                            .join(RaceResult, RaceResult.race_id == Race.race_id)
-                            .join(Player, RaceResult.player_id == Player.player_id)
-                            .filter(
-                                Race.prix_id == prix.prix_id,
-                                Player.player_nickname == selected_player
+
+            for prix in prix_history_filtered:
+                # Create expander for each prix
+                with st.expander(
+                    f"{prix.date_played.strftime('%Y-%m-%d')} - {prix.num_races} Races - "
+                    f"{prix.finish_position}{['st','nd','rd','th'][min(int(prix.finish_position)-1,3)]} Place"
+                ):
+                    race_details = race_details_by_prix[prix.prix_id]
+                    
+                    # Create DataFrame for race details
+                    races_df = pd.DataFrame([
+                        {
+                            'Race': f"Race {race.race_number}",
+                            'Track': race.track_name,
+                            'Position': f"{race.finish_position}{['st','nd','rd','th'][min(race.finish_position-1,3)]}",
+                            'Points': race.points_earned
+                        }
+                        for race in race_details
+                    ])
+                    
+                    # Show prix summary
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Total Points", prix.total_points)
+                    with col2:
+                        st.metric("Number of Races", prix.num_races)
+                    with col3:
+                        st.metric("Total Players", prix.num_players)
+                    
+                    # Show race details table
+                    st.dataframe(
+                        races_df,
+                        column_config={
+                            'Race': st.column_config.TextColumn(
+                                'Race',
+                                help='Race number in the prix'
+                            ),
+                            'Track': st.column_config.TextColumn(
+                                'Track',
+                                help='Track name'
+                            ),
+                            'Position': st.column_config.TextColumn(
+                                'Position',
+                                help='Finish position'
+                            ),
+                            'Points': st.column_config.NumberColumn(
+                                'Points',
+                                help='Points earned in this race'
                             )
-                            .order_by(Race.race_number)
-                            .all()
-                        )
-                        
-                        # Create DataFrame for race details
-                        races_df = pd.DataFrame([
-                            {
-                                'Race': f"Race {race.race_number}",
-                                'Track': race.track_name,
-                                'Position': f"{race.finish_position}{['st','nd','rd','th'][min(race.finish_position-1,3)]}",
-                                'Points': race.points_earned
-                            }
-                            for race in race_details
-                        ])
-                        
-                        # Show prix summary
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Total Points", prix.total_points)
-                        with col2:
-                            st.metric("Number of Races", prix.num_races)
-                        with col3:
-                            st.metric("Total Players", prix.num_players)
-                        
-                        # Show race details table
-                        st.dataframe(
-                            races_df,
-                            column_config={
-                                'Race': st.column_config.TextColumn(
-                                    'Race',
-                                    help='Race number in the prix'
-                                ),
-                                'Track': st.column_config.TextColumn(
-                                    'Track',
-                                    help='Track name'
-                                ),
-                                'Position': st.column_config.TextColumn(
-                                    'Position',
-                                    help='Finish position'
-                                ),
-                                'Points': st.column_config.NumberColumn(
-                                    'Points',
-                                    help='Points earned in this race'
-                                )
-                            },
-                            hide_index=True,
-                            use_container_width=True
-                        )
-            else:
-                st.info(f"No prix history found for {selected_player}")
+                        },
+                        hide_index=True,
+                        use_container_width=True
+                    )
+        else:
+            st.info(f"No prix history found for {selected_player}")
 
-with tab3:
+def render_create_prix():
+    """Player selection, prix setup and race result entry."""
     st.header("Create Prix")
 
     # Player selection section (outside the form)
     st.subheader("Select Players")
     
     with get_db_context() as db:
-        # Get players sorted by their most recent race
+        # Get players sorted by when they last played
         players = (
-            db.query(Player.player_nickname, func.max(Race.created_at).label('last_race'))
-            .outerjoin(RaceResult, Player.player_id == RaceResult.player_id)
-            .outerjoin(Race, RaceResult.race_id == Race.race_id)
-            .group_by(Player.player_nickname)
-            .order_by(func.max(Race.created_at).desc().nulls_last(), Player.player_nickname)
+            db.query(Player.player_nickname)
+            .order_by(Player.last_played_at.desc().nulls_last(), Player.player_nickname)
             .all()
         )
     existing_players = [
@@ -894,15 +743,7 @@ with tab3:
             recent_glider = None
             
             with get_db_context() as db:
-                most_recent_combo = (
-                    db.query(KartCombo)
-                    .join(RaceResult, RaceResult.combo_id == KartCombo.combo_id)
-                    .join(Race, Race.race_id == RaceResult.race_id)
-                    .join(Player, Player.player_id == RaceResult.player_id)
-                    .filter(Player.player_nickname == player_to_add)
-                    .order_by(Race.created_at.desc())
-                    .first()
-                )
+                most_recent_combo = get_last_combo(db, player_to_add)
                 
                 if most_recent_combo:
                     recent_character = most_recent_combo.character_name
@@ -917,225 +758,29 @@ with tab3:
             with col1:
                 character = st.selectbox(
                     "Character",
-                    options=[
-                        "Mario",
-                        "Luigi",
-                        "Peach",
-                        "Daisy",
-                        "Rosalina",
-                        "Tanooki Mario",
-                        "Cat Peach",
-                        "Yoshi",
-                        "Toad",
-                        "Koopa Troopa",
-                        "Shy Guy",
-                        "Lakitu",
-                        "Toadette",
-                        "King Boo",
-                        "Baby Mario",
-                        "Baby Luigi",
-                        "Baby Peach",
-                        "Baby Daisy",
-                        "Baby Rosalina",
-                        "Metal Mario",
-                        "Pink Gold Peach",
-                        "Wario",
-                        "Waluigi",
-                        "Donkey Kong",
-                        "Bowser",
-                        "Dry Bones",
-                        "Bowser Jr",
-                        "Dry Bowser",
-                        "Lemmy",
-                        "Larry",
-                        "Wendy",
-                        "Ludwig",
-                        "Iggy",
-                        "Roy",
-                        "Morton",
-                        "Inkling Girl",
-                        "Inkling Boy",
-                        "Link",
-                        "Villager (M)",
-                        "Villager (F)",
-                        "Isabelle",
-                        "Mii",
-                    ],
-                    index=([
-                        "Mario",
-                        "Luigi",
-                        "Peach",
-                        "Daisy",
-                        "Rosalina",
-                        "Tanooki Mario",
-                        "Cat Peach",
-                        "Yoshi",
-                        "Toad",
-                        "Koopa Troopa",
-                        "Shy Guy",
-                        "Lakitu",
-                        "Toadette",
-                        "King Boo",
-                        "Baby Mario",
-                        "Baby Luigi",
-                        "Baby Peach",
-                        "Baby Daisy",
-                        "Baby Rosalina",
-                        "Metal Mario",
-                        "Pink Gold Peach",
-                        "Wario",
-                        "Waluigi",
-                        "Donkey Kong",
-                        "Bowser",
-                        "Dry Bones",
-                        "Bowser Jr",
-                        "Dry Bowser",
-                        "Lemmy",
-                        "Larry",
-                        "Wendy",
-                        "Ludwig",
-                        "Iggy",
-                        "Roy",
-                        "Morton",
-                        "Inkling Girl",
-                        "Inkling Boy",
-                        "Link",
-                        "Villager (M)",
-                        "Villager (F)",
-                        "Isabelle",
-                        "Mii",
-                    ].index(recent_character) if recent_character else 0)
+                    options=KART_PARTS["characters"],
+                    index=KART_PART_INDEX["characters"].get(recent_character, 0)
                 )
 
             with col2:
                 kart = st.selectbox(
                     "Kart",
-                    options=[
-                        "Standard Kart",
-                        "Pipe Frame",
-                        "Mach 8",
-                        "Steel Driver",
-                        "Cat Cruiser",
-                        "Circuit Special",
-                        "Tri-Speeder", # 21 widmer go to the first parking lot two p signs first one in. go up to concierge 
-                        "Badwagon",
-                        "Prancer",
-                        "Biddybuggy",
-                        "Landship",
-                        "Sneeker",
-                        "Sports Coupe",
-                        "Gold Standard",
-                        "Standard Bike",
-                        "Comet",
-                        "Sport Bike",
-                        "The Duke",
-                        "Flame Rider",
-                        "Varmint",
-                        "Mr. Scooty",
-                        "Jet Bike",
-                        "Yoshi Bike",
-                    ],
-                    index=([
-                        "Standard Kart",
-                        "Pipe Frame",
-                        "Mach 8",
-                        "Steel Driver",
-                        "Cat Cruiser",
-                        "Circuit Special",
-                        "Tri-Speeder", # 21 widmer go to the first parking lot two p signs first one in. go up to concierge 
-                        "Badwagon",
-                        "Prancer",
-                        "Biddybuggy",
-                        "Landship",
-                        "Sneeker",
-                        "Sports Coupe",
-                        "Gold Standard",
-                        "Standard Bike",
-                        "Comet",
-                        "Sport Bike",
-                        "The Duke",
-                        "Flame Rider",
-                        "Varmint",
-                        "Mr. Scooty",
-                        "Jet Bike",
-                        "Yoshi Bike",
-                    ].index(recent_vehicle) if recent_vehicle else 0)
+                    options=KART_PARTS["vehicles"],
+                    index=KART_PART_INDEX["vehicles"].get(recent_vehicle, 0)
                 )
 
             with col3:
                 wheels = st.selectbox(
                     "Wheels",
-                    options=[
-                        "Standard",
-                        "Monster",
-                        "Roller",
-                        "Slim",
-                        "Slick",
-                        "Metal",
-                        "Button",
-                        "Off-Road",
-                        "Sponge",
-                        "Wood",
-                        "Cushion",
-                        "Blue Standard",
-                        "Hot Monster",
-                        "Azure Roller",
-                        "Crimson Slim",
-                        "Cyber Slick",
-                    ],
-                    index=([
-                        "Standard",
-                        "Monster",
-                        "Roller",
-                        "Slim",
-                        "Slick",
-                        "Metal",
-                        "Button",
-                        "Off-Road",
-                        "Sponge",
-                        "Wood",
-                        "Cushion",
-                        "Blue Standard",
-                        "Hot Monster",
-                        "Azure Roller",
-                        "Crimson Slim",
-                        "Cyber Slick",
-                    ].index(recent_tire) if recent_tire else 0)
+                    options=KART_PARTS["tires"],
+                    index=KART_PART_INDEX["tires"].get(recent_tire, 0)
                 )
 
             with col4:
                 glider = st.selectbox(
                     "Glider",
-                    options=[
-                        "Super Glider",
-                        "Cloud Glider",
-                        "Wario Wing",
-                        "Waddle Wing",
-                        "Peach Parasol",
-                        "Parachute",
-                        "Parafoil",
-                        "Flower Glider",
-                        "Bowser Kite",
-                        "Plane Glider",
-                        "MKTV Parafoil",
-                        "Gold Glider",
-                        "Paper Glider",
-                    ],
-                    index=([
-                        "Super Glider",
-                        "Cloud Glider",
-                        "Wario Wing",
-                        "Waddle Wing",
-                        "Peach Parasol",
-                        "Parachute",
-                        "Parafoil",
-                        "Flower Glider",
-                        "Bowser Kite",
-                        "Plane Glider",
-                        "MKTV Parafoil",
-                        "Gold Glider",
-                        "Paper Glider",
-                    ].index(recent_glider) if recent_glider else 0)
+                    options=KART_PARTS["gliders"],
+                    index=KART_PART_INDEX["gliders"].get(recent_glider, 0)
                 )
 
             if st.button("Add to Prix"):
@@ -1149,6 +794,7 @@ with tab3:
                     )
                     with get_db_context() as db:
                         db.add(new_player)
+                        bump_cache_generation(db)
                         db.commit()
                 
                 st.session_state.combo_selections[player_to_add] = {
@@ -1271,43 +917,41 @@ with tab3:
                 db.add(new_prix)
                 db.commit()
                 
-                # Store prix_id in session state for later use
+                # Store prix_id and player ids in session state for later use
+                player_ids = dict(
+                    db.query(Player.player_nickname, Player.player_id)
+                    .filter(Player.player_nickname.in_(st.session_state.selected_players_for_prix))
+                    .all()
+                )
                 st.session_state.current_prix = {
                     "prix_id": new_prix.prix_id,
                     "players": st.session_state.selected_players_for_prix,
+                    "player_ids": player_ids,
                     "races": [],
-                    "num_races": num_races
+                    "num_races": num_races,
+                    # Ratings and track records for the race predictions
+                    "track_matrix": load_track_matrix(db, st.session_state.selected_players_for_prix),
                 }
                 
                 # Store kart combo selections in database
-                for player_nickname in st.session_state.combo_selections:
-                    combo = st.session_state.combo_selections[player_nickname]
-                    player = db.query(Player).filter(Player.player_nickname == player_nickname).first()
-                    
-                    # Check if combo already exists
-                    existing_combo = db.query(KartCombo).filter(
-                        KartCombo.character_name == combo["character"],
-                        KartCombo.vehicle_name == combo["kart"], 
-                        KartCombo.tire_name == combo["wheels"],
-                        KartCombo.glider_name == combo["glider"]
-                    ).first()
-
-                    if existing_combo:
-                        kart_combo = existing_combo
-                    else:
-                        kart_combo = KartCombo(
-                            character_name=combo["character"],
-                            vehicle_name=combo["kart"],
-                            tire_name=combo["wheels"],
-                            glider_name=combo["glider"]
-                        )
-                        db.add(kart_combo)
-                        db.commit()
-                    
-                    # Store the combo_id in session state for later use with race results
-                    if "combo_ids" not in st.session_state:
-                        st.session_state.combo_ids = {}
-                    st.session_state.combo_ids[player_nickname] = kart_combo.combo_id
+                combo_parts = {
+                    player_nickname: (combo["character"], combo["kart"], combo["wheels"], combo["glider"])
+                    for player_nickname, combo in st.session_state.combo_selections.items()
+                }
+                combo_ids = get_or_create_combos(db, list(combo_parts.values()))
+
+                # Store the combo_ids in session state for later use with race results
+                st.session_state.combo_ids = {
+                    player_nickname: combo_ids[parts]
+                    for player_nickname, parts in combo_parts.items()
+                }
+                set_last_combos(db, {
+                    player_ids[player_nickname]: combo_id
+                    for player_nickname, combo_id in st.session_state.combo_ids.items()
+                    if player_nickname in player_ids
+                })
+
+                bump_cache_generation(db)
 
             # Clear the selected players list
             st.session_state.selected_players_for_prix = []
@@ -1322,53 +966,63 @@ with tab3:
 
         race_num = len(st.session_state.current_prix["races"]) + 1
         if race_num <= st.session_state.current_prix["num_races"]:            
-            # # Show track stats based on preview selection
-            # if preview_track:
-            #     current_players = st.session_state.current_prix["players"]
-                
-            #     with get_db_context() as db:
-            #         # First get all players
-            #         track_stats = []
-            #         for player in current_players:
-            #             result = (
-            #                 db.query(
-            #                     Player.player_nickname,
-            #                     func.avg(RaceResult.points_earned).label('avg_points')
-            #                 )
-            #                 .filter(Player.player_nickname == player)
-            #                 .outerjoin(RaceResult, Player.player_id == RaceResult.player_id)
-            #                 .outerjoin(Race, RaceResult.race_id == Race.race_id)
-            #                 .outerjoin(Track, Race.track_id == Track.track_id)
-            #                 .filter(or_(Track.track_name == preview_track, Track.track_name == None))
-            #                 .group_by(Player.player_nickname)
-            #                 .first()
-            #             )
-            #             # If no result found, add player with None avg_points
-            #             if not result:
-            #                 track_stats.append((player, None))
-            #             else:
-            #                 track_stats.append(result)
-                    
-            #         if track_stats:
-            #             # Create a simple table to display stats
-            #             stats_data = []
-            #             for player, avg_points in track_stats:
-            #                 if avg_points is not None:
-            #                     stats_data.append({"Player": player, "Avg Points": f"{avg_points:.1f}"})
-            #                 else:
-            #                     stats_data.append({"Player": player, "Avg Points": "N/A"})
-                        
-            #             stats_df = pd.DataFrame(stats_data)
-            #             st.dataframe(stats_df, hide_index=True)
-            #         else:
-            #             st.info("No previous stats for this track")
+            # Outside the form, so picking a track updates the prediction straight away
+            track = st.selectbox(
+                f"Select Track for Race {race_num}",
+                options=TRACK_LIST,
+                index=None,
+                placeholder="Choose a track",
+                key=f"race_track_{race_num}"
+            )
+
+            if track:
+                # Ratings and track records are loaded once per prix, so this is numpy only
+                if "track_matrix" not in st.session_state.current_prix:
+                    with get_db_context() as db:
+                        st.session_state.current_prix["track_matrix"] = load_track_matrix(
+                            db, st.session_state.current_prix["players"]
+                        )
+                predictions = predict_race(st.session_state.current_prix["track_matrix"], track)
+
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            'Player': p.player,
+                            'ELO': p.rating,
+                            'Track Races': p.track_races,
+                            'Track Avg Points': p.track_avg_points,
+                            'Expected Rank': p.expected_rank,
+                            'Win Probability': p.win_probability * 100,
+                        }
+                        for p in sorted(predictions, key=lambda p: p.expected_rank)
+                    ]),
+                    column_config={
+                        'Track Avg Points': st.column_config.NumberColumn(
+                            'Track Avg Points',
+                            help='Average points per race on this track',
+                            format='%.1f'
+                        ),
+                        'Expected Rank': st.column_config.NumberColumn(
+                            'Expected Rank',
+                            help='Expected finishing order among the players (CPUs ignored)',
+                            format='%.1f'
+                        ),
+                        'Win Probability': st.column_config.ProgressColumn(
+                            'Win Probability',
+                            help='Chance of finishing ahead of every other player, '
+                                 'from ELO ratings adjusted for track history',
+                            format='%.0f%%',
+                            min_value=0,
+                            max_value=100
+                        )
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
 
             with st.form(f"race_{race_num}"):
                 st.write(f"Race {race_num}")
 
-                # Add track selection
-                track = st.selectbox("Select Track", options=TRACK_LIST, index=None, placeholder="Choose a track")
-                
                 # Create columns for player names and their placements
                 col1, col2 = st.columns([2, 1])
 
@@ -1377,35 +1031,8 @@ with tab3:
                 # First pass to collect all placements
                 with col1:
                     st.write("Player")
-                    current_players = st.session_state.current_prix["players"]
-
-                    if track:
-
-                        with get_db_context() as db:
-                            # First get all players
-                            track_stats = []
-                            for player in current_players:
-                                result = (
-                                    db.query(
-                                        Player.player_nickname,
-                                        func.avg(RaceResult.points_earned).label('avg_points')
-                                    )
-                                    .filter(Player.player_nickname == player)
-                                    .outerjoin(RaceResult, Player.player_id == RaceResult.player_id)
-                                    .outerjoin(Race, RaceResult.race_id == Race.race_id)
-                                    .outerjoin(Track, Race.track_id == Track.track_id)
-                                    .filter(or_(Track.track_name == track, Track.track_name == None))
-                                    .group_by(Player.player_nickname)
-                                    .first()
-                                )
-
-                                if result:
-                                    st.write(f"{player} ({result.avg_points:.1f} pts)")
-                                else:
-                                    st.write(f"{player} (N/A)")
-                    else:
-                        for player in current_players:
-                            st.write(player)
+                    for player in st.session_state.current_prix["players"]:
+                        st.write(player)
 
                 with col2:
                     st.write("Position")
@@ -1419,54 +1046,43 @@ with tab3:
                         placements[player] = position
                         selected_positions.add(position)
 
-                col1_size= 0.115
-                col2_size = 0.101
-                cols = st.columns([col1_size, col2_size, 1 - col1_size - col2_size])
-                with cols[0]:
-                    submit_race = st.form_submit_button("Submit Race Results", type="primary")
-                with cols[1]:
-                    check_stats = st.form_submit_button("Check Track Stats", type="secondary")
+                submit_race = st.form_submit_button("Submit Race Results", type="primary")
 
                 if submit_race:
-                    # Validate that all positions are unique
-                    if len(selected_positions) != len(st.session_state.current_prix["players"]):
+                    # Validate that a track was picked and all positions are unique
+                    if not track:
+                        st.error("Please select a track!")
+                    elif len(selected_positions) != len(st.session_state.current_prix["players"]):
                         st.error("Each player must have a unique position!")
                     else:
+                        player_ids = st.session_state.current_prix["player_ids"]
                         with get_db_context() as db:
-                            # Get or create track
-                            db_track = db.query(Track).filter(Track.track_name == track).first()
-
-                            # Create new race
+                            # Insert the race and all of its results in one transaction
                             new_race = Race(
                                 prix_id=st.session_state.current_prix["prix_id"],
-                                track_id=db_track.track_id,
+                                track_id=get_tracks().ids[track],
                                 race_number=race_num
                             )
                             db.add(new_race)
-                            db.commit()
-
-                            # Add race results for each player
-                            for player_nickname, position in placements.items():
-                                # Get player
-                                player = db.query(Player).filter(Player.player_nickname == player_nickname).first()
-                                
-                                # Calculate points based on position
-                                points = 15 if position == 1 else (
-                                    12 if position == 2 else (
-                                        10 if position == 3 else (13 - position)
-                                    )
-                                )
-
-                                # Create race result
-                                race_result = RaceResult(
-                                    race_id=new_race.race_id,
-                                    player_id=player.player_id,
-                                    combo_id=st.session_state.combo_ids[player_nickname],
-                                    finish_position=position,
-                                    points_earned=points
-                                )
-                                db.add(race_result)
-                            db.commit()
+                            db.flush()
+
+                            db.execute(insert(RaceResult), [
+                                {
+                                    "race_id": new_race.race_id,
+                                    "player_id": player_ids[player_nickname],
+                                    "combo_id": st.session_state.combo_ids[player_nickname],
+                                    "finish_position": position,
+                                    # Calculate points based on position
+                                    "points_earned": 15 if position == 1 else (
+                                        12 if position == 2 else (
+                                            10 if position == 3 else (13 - position)
+                                        )
+                                    ),
+                                }
+                                for player_nickname, position in placements.items()
+                            ])
+                            record_race(db, new_race.race_id)
+                            bump_cache_generation(db)
 
                         # Store race results in session state (for display purposes)
                         st.session_state.current_prix["races"].append({
@@ -1483,65 +1099,8 @@ with tab3:
         ):
             if st.button("Submit Prix Results"):
                 with get_db_context() as db:
-                    # Get final standings for this prix
-                    prix_results = (
-                        db.query(
-                            Player.player_id,
-                            Player.player_nickname,
-                            Player.elo_rating,
-                            func.sum(RaceResult.points_earned).label('total_points')
-                        )
-                        .join(RaceResult, Player.player_id == RaceResult.player_id)
-                        .join(Race, RaceResult.race_id == Race.race_id)
-                        .filter(Race.prix_id == st.session_state.current_prix["prix_id"])
-                        .group_by(Player.player_id, Player.player_nickname, Player.elo_rating)
-                        .order_by(desc('total_points'))
-                        .all()
-                    )
-                    
-                    # Calculate new ELO ratings
-                    placements = []
-                    current_placement = 1
-                    current_high_score = prix_results[0].total_points
-                    for result in prix_results:
-                        if result.total_points < current_high_score:
-                            current_high_score = result.total_points
-                            current_placement = len(placements) + 1
-
-                        placements.append((result.player_nickname, current_placement))
-
-                    current_ratings = {result.player_nickname: result.elo_rating for result in prix_results}
-                    
-                    # Calculate ELO changes
-                    elo_adjustments = calculate_elo_adjustments(placements, current_ratings)
-                    updated_ratings = apply_elo_adjustments(current_ratings, elo_adjustments)
-                    
-                    # Store prix results in prix_results table
-                    for result in prix_results:
-                        player_nickname = result.player_nickname
-                        current_elo = result.elo_rating
-                        adjustment = elo_adjustments[player_nickname]
-                        new_elo = updated_ratings[player_nickname]
-                        
-                        # Get placement from placements list
-                        placement = next(p[1] for p in placements if p[0] == player_nickname)
-                        
-                        prix_result = PrixResult(
-                            prix_id=st.session_state.current_prix["prix_id"],
-                            player_id=result.player_id,
-                            placement=placement,
-                            starting_elo=current_elo,
-                            elo_adjustment=adjustment,
-                            ending_elo=new_elo
-                        )
-                        db.add(prix_result)
-
-                    # Update player ELO ratings
-                    for player_nickname, new_elo in updated_ratings.items():
-                        db.query(Player).filter(Player.player_nickname == player_nickname).update(
-                            {'elo_rating': new_elo}
-                        )
-                    db.commit()
+                    # Record placements, apply ELO changes and rebuild the leaderboard
+                    finalize_prix(db, st.session_state.current_prix["prix_id"])
 
                 # Clean up session state
                 del st.session_state.current_prix
@@ -1624,141 +1183,168 @@ with tab3:
                 },
             )
 
-with tab4:
+def render_history():
+    """Every prix with its full race results."""
     st.header("Prix History")
     
-    with get_db_context() as db:
-        # Get all prix with their winners
-        all_prix_history = (
-            db.query(
-                Prix.prix_id,
-                Prix.date_played,
-                Player.player_nickname,
-                Prix.number_of_players.label('num_players'),
-                Prix.race_count.label('num_races'),
-                func.sum(RaceResult.points_earned).label('total_points'),
-                func.rank().over(
-                    partition_by=Prix.prix_id,
-                    order_by=func.sum(RaceResult.points_earned).desc()
-                    ).label('finish_position')
-            )
-            .join(Race, Race.prix_id == Prix.prix_id)
-            .join(RaceResult, RaceResult.race_id == Race.race_id)
-            .join(Player, Player.player_id == RaceResult.player_id)
-            .group_by(Prix.prix_id, Prix.date_played, Player.player_nickname)
-            .subquery()
-        )
+    # Page through prix so only one page of results is ever loaded
+    page = select_page(load_prix_count(generation), PRIX_HISTORY_PAGE_SIZE, "history_page")
 
-        prix_list = (
-            db.query(
-                all_prix_history.c.prix_id,
-                all_prix_history.c.date_played,
-                all_prix_history.c.num_players,
-                all_prix_history.c.num_races,
-                all_prix_history.c.total_points.label('winning_points'),
-                func.string_agg(all_prix_history.c.player_nickname, ' and ').label('winners')
-            )
-            .filter(all_prix_history.c.finish_position == 1)
-            .group_by(all_prix_history.c.prix_id, all_prix_history.c.date_played, all_prix_history.c.num_players, all_prix_history.c.num_races, all_prix_history.c.total_points)
-            .order_by(all_prix_history.c.date_played.desc())
-            .all()
-        )
+    # Get the current page of prix with their winners
+    prix_list = load_prix_list(generation, page, PRIX_HISTORY_PAGE_SIZE)
 
-        if prix_list:
-            for prix in prix_list:
-                # Create expander for each prix
-                with st.expander(
-                    f"{prix.date_played.strftime('%Y-%m-%d')} - {prix.num_races} Races - "
-                    f"Winner: {prix.winners} ({prix.winning_points} pts)"
-                ):
-                    # Get all race results for this prix
-                    race_results = (
-                        db.query(
-                            Player.player_nickname,
-                            Race.race_number,
-                            Track.track_name,
-                            RaceResult.finish_position,
-                            RaceResult.points_earned,
-                            func.sum(RaceResult.points_earned).over(
-                                partition_by=Player.player_id
-                            ).label('total_points')
-                        )
-                        .join(RaceResult, Player.player_id == RaceResult.player_id)
-                        .join(Race, RaceResult.race_id == Race.race_id)
-                        .join(Track, Race.track_id == Track.track_id)
-                        .filter(Race.prix_id == prix.prix_id)
-                        .subquery()
-                    )
+    if prix_list:
+        # Get race results for every prix on this page in one go
+        race_results_by_prix = load_prix_race_results(
+            generation, tuple(prix.prix_id for prix in prix_list)
+        )
 
-                    race_results_ranked = (
-                        db.query(
-                            race_results.c.player_nickname,
-                            race_results.c.race_number,
-                            race_results.c.track_name,
-                            race_results.c.points_earned,
-                            race_results.c.finish_position,
-                            race_results.c.total_points,
-                            func.dense_rank().over(
-                                order_by=race_results.c.total_points.desc()
-                            ).label('prix_position')
-                        )
-                        .order_by(
-                            race_results.c.total_points.desc(),
-                            race_results.c.race_number
-                        )
-                        .all()
-                    )
+        for prix in prix_list:
+            # Create expander for each prix
+            with st.expander(
+                f"{prix.date_played.strftime('%Y-%m-%d')} - {prix.num_races} Races - "
+                f"Winner: {prix.winners} ({prix.winning_points} pts)"
+            ):
+                race_results_ranked = race_results_by_prix[prix.prix_id]
+
+                # Create DataFrame
+                data = {}
+                for r in race_results_ranked:
+                    if r.player_nickname not in data:
+                        data[r.player_nickname] = {
+                            'Position': f"{r.prix_position}",
+                            'Total': r.total_points
+                        }
+                    race_key = f"Race {r.race_number} ({r.track_name})"
+                    data[r.player_nickname][race_key] = f"{r.points_earned} ({r.finish_position})"
+
+                # Create DataFrame with player as index
+                df = pd.DataFrame.from_dict(data, orient='index')
+                
+                # Reset index to make player a column
+                df = df.reset_index().rename(columns={'index': 'Player'})
+                
+                # Ensure races are in correct order
+                race_cols = [col for col in df.columns if col.startswith('Race')]
+                race_cols.sort(key=lambda x: int(x.split()[1]))
+                
+                # Reorder columns: Position, Player, Races, Total
+                df = df[['Position', 'Player'] + race_cols + ['Total']]
 
-                    # Create DataFrame
-                    data = {}
-                    for r in race_results_ranked:
-                        if r.player_nickname not in data:
-                            data[r.player_nickname] = {
-                                'Position': f"{r.prix_position}",
-                                'Total': r.total_points
-                            }
-                        race_key = f"Race {r.race_number} ({r.track_name})"
-                        data[r.player_nickname][race_key] = f"{r.points_earned} ({r.finish_position})"
-
-                    # Create DataFrame with player as index
-                    df = pd.DataFrame.from_dict(data, orient='index')
-                    
-                    # Reset index to make player a column
-                    df = df.reset_index().rename(columns={'index': 'Player'})
-                    
-                    # Ensure races are in correct order
-                    race_cols = [col for col in df.columns if col.startswith('Race')]
-                    race_cols.sort(key=lambda x: int(x.split()[1]))
-                    
-                    # Reorder columns: Position, Player, Races, Total
-                    df = df[['Position', 'Player'] + race_cols + ['Total']]
+                # Display the table
+                st.dataframe(
+                    df,
+                    column_config={
+                        'Position': st.column_config.TextColumn(
+                            'Position',
+                            help='Final position in the prix'
+                        ),
+                        'Player': st.column_config.TextColumn(
+                            'Player',
+                            help='Player nickname'
+                        ),
+                        'Total': st.column_config.NumberColumn(
+                            'Total Points',
+                            help='Total points earned'
+                        ),
+                        **{
+                            col: st.column_config.TextColumn(
+                                col,
+                                help='Points earned (Finish position)'
+                            )
+                            for col in race_cols
+                        }
+                    },
+                    use_container_width=True,
+                    hide_index=True  # Hide the index since we now have position column
+                )
+    else:
+        st.info("No prix history available yet. Create a Prix to get started!")
+
+# Only the selected view is executed on each rerun
+VIEWS = {
+    "Home": render_home,
+    "Player Profiles": render_player_profiles,
+    "Create Prix": render_create_prix,
+    "History": render_history,
+}
 
-                    # Display the table
-                    st.dataframe(
-                        df,
-                        column_config={
-                            'Position': st.column_config.TextColumn(
-                                'Position',
-                                help='Final position in the prix'
-                            ),
-                            'Player': st.column_config.TextColumn(
-                                'Player',
-                                help='Player nickname'
-                            ),
-                            'Total': st.column_config.NumberColumn(
-                                'Total Points',
-                                help='Total points earned'
-                            ),
-                            **{
-                                col: st.column_config.TextColumn(
-                                    col,
-                                    help='Points earned (Finish position)'
-                                )
-                                for col in race_cols
-                            }
-                        },
-                        use_container_width=True,
-                        hide_index=True  # Hide the index since we now have position column
-                    )
-        else:
-            st.info("No prix history available yet. Create a Prix to get started!")
\ No newline at end of file
+def render_query_profile(queries):
+    """
+    List the costliest queries of this rerun in the sidebar.
+
+    Args:
+        queries: QueryRecords from profile_queries()
+    """
+    st.sidebar.subheader("Query Profile")
+    if not queries:
+        st.sidebar.caption("No queries ran against the database in this rerun.")
+        return
+
+    df = pd.DataFrame([
+        {
+            'Section': q.section or "Other",
+            'Query': q.fingerprint,
+            'ms': q.duration_ms,
+            'Rows': q.rowcount,
+        }
+        for q in queries
+    ])
+    st.sidebar.caption(f"{len(df)} queries, {df['ms'].sum():.1f} ms in total")
+    costliest = (
+        df.groupby(['Section', 'Query'], as_index=False)
+        .agg(Calls=('ms', 'size'), ms=('ms', 'sum'), Rows=('Rows', 'sum'))
+        .sort_values('ms', ascending=False)
+        .head(QUERY_PROFILE_TOP_N)
+    )
+    st.sidebar.dataframe(
+        costliest[['ms', 'Calls', 'Rows', 'Section', 'Query']],
+        column_config={'ms': st.column_config.NumberColumn("ms", format="%.1f")},
+        hide_index=True,
+        use_container_width=True
+    )
+
+def render_rerun_profile(profile):
+    """
+    Show this rerun's section timings in the sidebar.
+
+    Args:
+        profile: Finished RenderProfile from profile_rerun()
+    """
+    st.sidebar.subheader("Render Profile")
+    st.sidebar.caption(f"{profile.total_seconds * 1000:.1f} ms in total, report at {profile.report_path}")
+    st.sidebar.dataframe(
+        pd.DataFrame(
+            [(s.name, s.seconds * 1000) for s in sorted(profile.sections, key=lambda s: s.name)],
+            columns=['Section', 'ms']
+        ),
+        column_config={'ms': st.column_config.NumberColumn("ms", format="%.1f")},
+        hide_index=True,
+        use_container_width=True
+    )
+
+# Render profiling mode, from ?profile=sections or ?profile=functions, else APP_PROFILE
+profile_mode = st.query_params.get("profile", PROFILE_MODE)
+if profile_mode not in PROFILE_MODES:
+    profile_mode = "off"
+
+# Every query in this rerun shares one pooled connection
+with profile_rerun(profile_mode) as render_profile, shared_db_session(), profile_queries() as queries:
+    # Data generation keying the cached queries, advanced by every write
+    with profile_section("Cache generation"):
+        generation = get_cache_generation()
+
+    active_view = st.radio(
+        "View",
+        options=list(VIEWS),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="active_view"
+    )
+    with profile_section(active_view):
+        VIEWS[active_view]()
+
+if config.profile_queries:
+    render_query_profile(queries)
+if render_profile is not None:
+    render_rerun_profile(render_profile)
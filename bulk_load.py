@@ -0,0 +1,216 @@
+import csv
+import io
+from contextlib import contextmanager
+from itertools import islice
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+# Rows sent per COPY or executemany batch
+BULK_BATCH_SIZE = 10000
+
+
+def _column_defaults(table, columns) -> dict:
+    """
+    Evaluate the Python-side defaults of the columns a load leaves out.
+
+    Defaults such as created_at=datetime.utcnow only run for ORM and Core
+    inserts, so COPY would otherwise store NULL. They are evaluated once per
+    load, so every row of a load shares the same created_at.
+    """
+    defaults = {}
+    for column in table.columns:
+        if column.name in columns or column.default is None or column.primary_key:
+            continue
+        if column.default.is_scalar:
+            defaults[column.name] = column.default.arg
+        elif column.default.is_callable:
+            defaults[column.name] = column.default.arg(None)
+    return defaults
+
+
+def copy_from_csv(db: Session, table, columns: list[str], file, header: bool = False) -> int:
+    """
+    Load a CSV file into a PostgreSQL table with COPY ... FROM STDIN.
+
+    The file uses \\N for NULL, as written by copy_to_csv.
+
+    Args:
+        db: Database session on PostgreSQL
+        table: Table to load into
+        columns: Columns in file order
+        file: Readable file object, read in chunks by the driver
+        header: Skip the file's first line
+
+    Returns:
+        Number of rows loaded
+    """
+    options = "FORMAT csv, NULL '\\N'" + (", HEADER" if header else "")
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH ({options})", file)
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def copy_to_csv(db: Session, table, file) -> int:
+    """
+    Dump a PostgreSQL table to CSV with COPY ... TO STDOUT.
+
+    Rows are ordered by primary key and written with a header line and
+    \\N for NULL.
+
+    Args:
+        db: Database session on PostgreSQL
+        table: Table to dump
+        file: Writable file object
+
+    Returns:
+        Number of rows written
+    """
+    columns = ', '.join(column.name for column in table.columns)
+    order_by = ', '.join(column.name for column in table.primary_key.columns)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY (SELECT {columns} FROM {table.name} ORDER BY {order_by}) "
+            f"TO STDOUT WITH (FORMAT csv, HEADER, NULL '\\N')",
+            file
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def _copy_batch(db: Session, table, columns: list[str], rows: list[dict]) -> None:
+    """Send one batch of rows to PostgreSQL with COPY ... FROM STDIN."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([r'\N' if row[name] is None else row[name] for name in columns])
+    buffer.seek(0)
+    copy_from_csv(db, table, columns, buffer)
+
+
+def load_rows(db: Session, table, rows, batch_size: int = BULK_BATCH_SIZE) -> int:
+    """
+    Stream rows into a table in batches.
+
+    PostgreSQL gets one COPY per batch; other databases get one executemany
+    INSERT per batch. Rows are consumed lazily, so rows can be a generator
+    producing millions of them. Every row must have the same keys, and any
+    foreign keys must already be loaded.
+
+    Args:
+        db: Database session; rows are written in its transaction
+        table: Table or mapped class to load into
+        rows: Iterable of dicts mapping column name to value
+        batch_size: Rows per batch
+
+    Returns:
+        Number of rows loaded
+    """
+    table = getattr(table, '__table__', table)
+    use_copy = db.get_bind().dialect.name == 'postgresql'
+    rows = iter(rows)
+    loaded = 0
+
+    batch = list(islice(rows, batch_size))
+    if not batch:
+        return 0
+    defaults = _column_defaults(table, batch[0].keys())
+    columns = list(batch[0].keys()) + list(defaults)
+
+    while batch:
+        if defaults:
+            batch = [{**defaults, **row} for row in batch]
+        if use_copy:
+            _copy_batch(db, table, columns, batch)
+        else:
+            db.execute(insert(table), batch)
+        loaded += len(batch)
+        batch = list(islice(rows, batch_size))
+
+    return loaded
+
+
+def reset_sequences(db: Session, tables) -> None:
+    """
+    Move PostgreSQL SERIAL sequences past ids loaded explicitly.
+
+    Loading rows with their ids doesn't advance the sequences, so the next
+    row the app inserts would collide. SQLite picks max(id) + 1 by itself,
+    so this is a no-op there.
+
+    Args:
+        db: Database session
+        tables: Tables or mapped classes with a single integer primary key
+    """
+    if db.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in tables:
+        table = getattr(table, '__table__', table)
+        primary_key = table.primary_key.columns.values()[0]
+        max_id = db.execute(select(func.max(primary_key))).scalar()
+        db.execute(
+            text("SELECT setval(pg_get_serial_sequence(:table, :column), :value, :is_called)"),
+            {
+                "table": table.name,
+                "column": primary_key.name,
+                "value": max_id or 1,
+                "is_called": max_id is not None,
+            }
+        )
+
+
+@contextmanager
+def deferred_constraints(db: Session, tables):
+    """
+    Check foreign keys and build secondary indexes after a bulk load, not per row.
+
+    On PostgreSQL the tables' foreign keys and non-unique indexes are dropped
+    and then recreated from their exact definitions once the block finishes,
+    which validates each constraint in one pass, as pg_restore does. The DDL
+    is transactional, so a failed load leaves them in place. On SQLite
+    foreign key checks are deferred to the commit instead.
+
+    Args:
+        db: Database session
+        tables: Tables or mapped classes about to be loaded
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == 'sqlite':
+        db.execute(text("PRAGMA defer_foreign_keys = ON"))
+        yield
+        return
+    if dialect != 'postgresql':
+        yield
+        return
+
+    names = [getattr(table, '__table__', table).name for table in tables]
+    foreign_keys = db.execute(text("""
+        SELECT conrelid::regclass::text AS table_name, conname AS name,
+               pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE contype = 'f' AND conrelid::regclass::text = ANY(:names)
+    """), {"names": names}).all()
+    indexes = db.execute(text("""
+        SELECT indexrelid::regclass::text AS name, pg_get_indexdef(indexrelid) AS definition
+        FROM pg_index
+        WHERE indrelid::regclass::text = ANY(:names)
+          AND NOT indisunique
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = indexrelid)
+    """), {"names": names}).all()
+
+    for fk in foreign_keys:
+        db.execute(text(f'ALTER TABLE {fk.table_name} DROP CONSTRAINT "{fk.name}"'))
+    for index in indexes:
+        db.execute(text(f'DROP INDEX {index.name}'))
+
+    yield
+
+    for index in indexes:
+        db.execute(text(index.definition))
+    for fk in foreign_keys:
+        db.execute(text(f'ALTER TABLE {fk.table_name} ADD CONSTRAINT "{fk.name}" {fk.definition}'))
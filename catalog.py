@@ -0,0 +1,77 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from database import get_db_context
+from models import Track
+
+# Bundled reference data: cups and their tracks in game order, and every
+# kart part by type (the same types as image_assets.IMAGE_TYPES)
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.json")
+
+with open(CATALOG_PATH, encoding="utf-8") as f:
+    _catalog = json.load(f)
+
+# Cup name -> track names in cup order
+CUPS: dict[str, list[str]] = _catalog["cups"]
+# Track name -> cup name
+TRACK_CUPS: dict[str, str] = {track: cup for cup, tracks in CUPS.items() for track in tracks}
+# Part type -> part names in the order the game lists them
+KART_PARTS: dict[str, list[str]] = {
+    part_type: _catalog[part_type] for part_type in ("characters", "vehicles", "tires", "gliders")
+}
+# Part type -> part name -> position in KART_PARTS, e.g. for a selectbox index
+KART_PART_INDEX: dict[str, dict[str, int]] = {
+    part_type: {name: i for i, name in enumerate(names)} for part_type, names in KART_PARTS.items()
+}
+
+
+@dataclass(frozen=True)
+class TrackCatalog:
+    """The tracks table, indexed both ways."""
+    # Track name -> track_id
+    ids: dict[str, int]
+    # track_id -> track name
+    names: dict[int, str]
+
+    @property
+    def sorted_names(self) -> list[str]:
+        """Track names in alphabetical order."""
+        return sorted(self.ids)
+
+
+_tracks: TrackCatalog = None
+_tracks_lock = threading.Lock()
+
+
+def get_tracks() -> TrackCatalog:
+    """
+    Get every track's id and name, loaded from the database once per process.
+
+    Tracks only change when scripts/populate_tracks.py adds new ones, which
+    takes an app restart (or reload_tracks) to show up. An empty tracks
+    table isn't cached, so a fresh database picks up its tracks as soon as
+    they are populated.
+
+    Returns:
+        TrackCatalog shared by every caller in the process
+    """
+    global _tracks
+    if _tracks is None or not _tracks.ids:
+        with _tracks_lock:
+            if _tracks is None or not _tracks.ids:
+                with get_db_context() as db:
+                    rows = db.query(Track.track_id, Track.track_name).all()
+                _tracks = TrackCatalog(
+                    ids={row.track_name: row.track_id for row in rows},
+                    names={row.track_id: row.track_name for row in rows},
+                )
+    return _tracks
+
+
+def reload_tracks() -> TrackCatalog:
+    """Drop the cached tracks and load them again."""
+    global _tracks
+    with _tracks_lock:
+        _tracks = None
+    return get_tracks()
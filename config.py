@@ -1,16 +1,60 @@
 from dataclasses import dataclass
 from os import environ
+from sqlalchemy.pool import StaticPool
 
 @dataclass
 class DatabaseConfig:
+    # 'postgresql' or 'sqlite'
+    backend: str = environ.get('DB_BACKEND', 'postgresql')
+    # SQLite database file, or ':memory:' for a throwaway in-memory database
+    sqlite_path: str = environ.get('DB_SQLITE_PATH', 'mario_kart.db')
     username: str = environ.get('DB_USERNAME', 'postgres')
     password: str = environ.get('DB_PASSWORD', 'postgres')
     host: str = environ.get('DB_HOST', 'localhost')
     port: str = environ.get('DB_PORT', '5432')
     database: str = environ.get('DB_NAME', 'mario_kart')
+    # Connection pool sizing and health
+    pool_size: int = int(environ.get('DB_POOL_SIZE', '5'))
+    max_overflow: int = int(environ.get('DB_MAX_OVERFLOW', '10'))
+    pool_timeout: int = int(environ.get('DB_POOL_TIMEOUT', '30'))
+    pool_recycle: int = int(environ.get('DB_POOL_RECYCLE', '1800'))
+    pool_pre_ping: bool = environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    # Per-statement timeout in milliseconds for the app's shared_db_session(), 0 disables it
+    statement_timeout_ms: int = int(environ.get('DB_STATEMENT_TIMEOUT_MS', '30000'))
+    # Time every statement and show each rerun's costliest queries in the app sidebar
+    profile_queries: bool = environ.get('DB_PROFILE_QUERIES', 'false').lower() in ('1', 'true', 'yes')
+    # Log the plan of statements slower than this many milliseconds, 0 disables it
+    slow_query_ms: int = int(environ.get('DB_SLOW_QUERY_MS', '0'))
+
+    @property
+    def is_sqlite(self) -> bool:
+        return self.backend == 'sqlite'
 
     @property
     def database_url(self) -> str:
+        if self.is_sqlite:
+            return f"sqlite:///{self.sqlite_path}"
+        if self.backend != 'postgresql':
+            raise ValueError(f"Unsupported DB_BACKEND {self.backend!r}, expected 'postgresql' or 'sqlite'")
         return f"postgresql://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}"
 
-config = DatabaseConfig() 
\ No newline at end of file
+    @property
+    def engine_options(self) -> dict:
+        """Keyword arguments for create_engine."""
+        if self.is_sqlite and self.sqlite_path == ':memory:':
+            # One connection shared by every thread, or each would see its own empty database
+            return {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+
+        options = {
+            'pool_size': self.pool_size,
+            'max_overflow': self.max_overflow,
+            'pool_timeout': self.pool_timeout,
+            'pool_recycle': self.pool_recycle,
+            'pool_pre_ping': self.pool_pre_ping,
+        }
+        if self.is_sqlite:
+            # Streamlit reruns run on different threads
+            options['connect_args'] = {'check_same_thread': False}
+        return options
+
+config = DatabaseConfig() 
@@ -1,19 +1,167 @@
+import logging
+import re
+import threading
+import time
 from contextlib import contextmanager
-from sqlalchemy import create_engine
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from config import config
-from models import Base
+from config import config, DatabaseConfig
+from models import Base, CacheGeneration
+
+logger = logging.getLogger(__name__)
+
+# Statements recorded and section labels for profile_queries(), per thread
+_profile = threading.local()
+
+# Bound parameters, quoted strings and numbers, which vary between calls of one query
+_PARAMETERS = re.compile(r"%\(\w+\)s|\?|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# Expanded IN lists, whose length varies too
+_PARAMETER_LISTS = re.compile(r"\(\?(?:, \?)+\)")
+# Queries safe to run a second time under EXPLAIN ANALYZE
+_READ_STATEMENT = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+@dataclass
+class QueryRecord:
+    """One statement executed inside profile_queries()."""
+    # Statement with its parameters and literals replaced by ?, grouping repeat calls
+    fingerprint: str
+    duration_ms: float
+    # None when the driver doesn't report it, e.g. SQLite SELECTs
+    rowcount: int
+    # Innermost query_section() label, or None outside of one
+    section: str
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so every call of the same query looks alike."""
+    normalized = _PARAMETERS.sub("?", " ".join(statement.split()))
+    return _PARAMETER_LISTS.sub("(...)", normalized)
+
+@contextmanager
+def profile_queries():
+    """Record every statement this thread executes while inside the block.
+    
+    Only takes effect on engines created with profile_queries enabled.
+    
+    Yields:
+        List of QueryRecord, filled in as statements run
+    """
+    previous = getattr(_profile, 'records', None)
+    _profile.records = []
+    try:
+        yield _profile.records
+    finally:
+        _profile.records = previous
+
+@contextmanager
+def query_section(name: str):
+    """Label the statements executed inside the block for the query profile."""
+    previous = getattr(_profile, 'section', None)
+    _profile.section = name
+    try:
+        yield
+    finally:
+        _profile.section = previous
+
+def explain(cursor, statement: str, parameters, is_sqlite: bool) -> str:
+    """
+    Get the plan of a statement that has just run on the cursor's connection.
+    
+    PostgreSQL runs the statement again under EXPLAIN ANALYZE inside a
+    savepoint, so a failing EXPLAIN can't abort the caller's transaction.
+    SQLite only has EXPLAIN QUERY PLAN, which doesn't execute anything.
+    
+    Args:
+        cursor: DBAPI cursor the statement ran on
+        statement: SQL as sent to the driver
+        parameters: Parameters as sent to the driver
+        is_sqlite: Whether the connection is SQLite
+    
+    Returns:
+        Plan text, one line per plan node
+    """
+    explain_cursor = cursor.connection.cursor()
+    try:
+        if is_sqlite:
+            explain_cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return "\n".join(row[3] for row in explain_cursor.fetchall())
+        explain_cursor.execute("SAVEPOINT explain_slow_query")
+        try:
+            explain_cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            return "\n".join(row[0] for row in explain_cursor.fetchall())
+        finally:
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT explain_slow_query")
+            explain_cursor.execute("RELEASE SAVEPOINT explain_slow_query")
+    finally:
+        explain_cursor.close()
+
+def install_query_profiler(db_engine, db_config: DatabaseConfig):
+    """
+    Time every statement on the engine.
+    
+    Statements run inside profile_queries() are recorded there, and queries
+    slower than db_config.slow_query_ms have their plan logged as a warning.
+    """
+    # The start time lives on the statement's execution context, so a
+    # statement that raises leaves nothing behind on the pooled connection
+    @event.listens_for(db_engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(db_engine, 'after_cursor_execute')
+    def record_query(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - context._query_start) * 1000
+
+        records = getattr(_profile, 'records', None)
+        if records is not None and db_config.profile_queries:
+            records.append(QueryRecord(
+                fingerprint=fingerprint(statement),
+                duration_ms=duration_ms,
+                rowcount=cursor.rowcount if cursor.rowcount >= 0 else None,
+                section=getattr(_profile, 'section', None),
+            ))
+
+        if (db_config.slow_query_ms and duration_ms >= db_config.slow_query_ms
+                and not executemany and _READ_STATEMENT.match(statement)):
+            try:
+                plan = explain(cursor, statement, parameters, db_config.is_sqlite)
+            except Exception:
+                logger.exception("Could not explain slow query")
+                return
+            logger.warning(
+                "Slow query (%.0f ms) in section %s:\n%s\n%s",
+                duration_ms, getattr(_profile, 'section', None), statement, plan
+            )
+
+def create_db_engine(db_config: DatabaseConfig):
+    """Create an engine for the configured backend."""
+    db_engine = create_engine(db_config.database_url, **db_config.engine_options)
+    if db_config.is_sqlite:
+        @event.listens_for(db_engine, 'connect')
+        def enable_foreign_keys(dbapi_connection, connection_record):
+            dbapi_connection.execute('PRAGMA foreign_keys=ON')
+    if db_config.profile_queries or db_config.slow_query_ms:
+        install_query_profiler(db_engine, db_config)
+    return db_engine
 
 # Create engine
-engine = create_engine(config.database_url)
+engine = create_db_engine(config)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Session shared by get_db_context() calls inside shared_db_session()
+_shared = threading.local()
+
 def init_db():
     """Initialize the database, creating all tables."""
     Base.metadata.create_all(bind=engine)
 
+# Alembic migrations target PostgreSQL; SQLite databases get their schema here
+if config.is_sqlite:
+    init_db()
+
 def get_db() -> Session:
     """Get a new database session."""
     db = SessionLocal()
@@ -25,8 +173,13 @@ def get_db() -> Session:
 
 @contextmanager
 def get_db_context():
-    """Context manager for database sessions."""
-    db = get_db()
+    """Context manager for database sessions.
+    
+    Inside shared_db_session() this reuses the shared session, still
+    committing or rolling back its own work but leaving it open.
+    """
+    shared = getattr(_shared, 'session', None)
+    db = shared if shared is not None else get_db()
     try:
         yield db
         db.commit()
@@ -34,4 +187,61 @@ def get_db_context():
         db.rollback()
         raise e
     finally:
-        db.close()
\ No newline at end of file
+        if shared is None:
+            db.close()
+
+@contextmanager
+def shared_db_session():
+    """Share one connection and session across get_db_context() calls.
+    
+    Wrap a Streamlit rerun in this so its queries cost a single pool
+    checkout instead of one per section. Sessions are shared per thread,
+    matching Streamlit's one script thread per rerun.
+    
+    The connection is capped at config.statement_timeout_ms for the
+    duration, so one runaway dashboard query can't hold up the app.
+    Scripts don't use shared sessions and run without a timeout.
+    """
+    if getattr(_shared, 'session', None) is not None:
+        yield _shared.session
+        return
+    connection = engine.connect()
+    timeout = config.statement_timeout_ms and not config.is_sqlite
+    if timeout:
+        connection.exec_driver_sql(f"SET statement_timeout = {int(config.statement_timeout_ms)}")
+        connection.commit()
+    _shared.session = SessionLocal(bind=connection)
+    try:
+        yield _shared.session
+    finally:
+        _shared.session.close()
+        _shared.session = None
+        try:
+            if timeout:
+                # Don't hand the cap back to the pool with the connection
+                connection.rollback()
+                connection.exec_driver_sql("RESET statement_timeout")
+                connection.commit()
+        finally:
+            connection.close()
+
+def get_cache_generation() -> int:
+    """Get the current data generation used to key cached queries."""
+    with get_db_context() as db:
+        generation = db.query(CacheGeneration.generation).filter(
+            CacheGeneration.generation_id == 1
+        ).scalar()
+    return generation or 0
+
+def bump_cache_generation(db: Session):
+    """Invalidate cached queries by advancing the data generation.
+    
+    Call this from every write path, inside the same transaction as the
+    write, so the new generation becomes visible exactly when the data does.
+    """
+    updated = db.query(CacheGeneration).filter(CacheGeneration.generation_id == 1).update({
+        CacheGeneration.generation: CacheGeneration.generation + 1,
+        CacheGeneration.updated_at: datetime.utcnow()
+    })
+    if not updated:
+        db.add(CacheGeneration(generation_id=1, generation=1))
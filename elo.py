@@ -1,6 +1,8 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import math
 
+import numpy as np
+
 
 def calculate_elo_adjustments(
     placements: List[Tuple[str, int]],  # List of (player_name, finish_position) tuples
@@ -77,4 +79,125 @@ def apply_elo_adjustments(
     return {
         player: max(min_rating, current_ratings[player] + adjustment)
         for player, adjustment in adjustments.items()
-    }
\ No newline at end of file
+    }
+
+
+def get_rating_change_description(adjustment: int) -> str:
+    """
+    Format an ELO adjustment for display, e.g. "+15", "-10" or "0".
+    
+    Args:
+        adjustment: ELO rating change
+    
+    Returns:
+        Signed string representation of the adjustment
+    """
+    return f"+{adjustment}" if adjustment > 0 else str(adjustment)
+
+
+def calculate_elo_adjustments_vectorized(
+    ratings: np.ndarray,    # Array of current ELO ratings, one per player
+    positions: np.ndarray,  # Array of finish positions, aligned with ratings
+    k_factor: int = 32,
+) -> np.ndarray:
+    """
+    Vectorized equivalent of calculate_elo_adjustments for a single prix.
+    
+    Args:
+        ratings: 1-D array of current ELO ratings
+        positions: 1-D array of finish positions (ties share a position)
+        k_factor: How much ratings can change (default: 32)
+    
+    Returns:
+        1-D integer array of ELO rating changes, rounded exactly as
+        calculate_elo_adjustments rounds them
+    
+    Example:
+        adjustments = calculate_elo_adjustments_vectorized(
+            np.array([1500, 1600, 1400]), np.array([1, 2, 3])
+        )
+    """
+    ratings = np.asarray(ratings)
+    positions = np.asarray(positions)
+    return calculate_elo_adjustments_batch(
+        ratings[np.newaxis, :], positions[np.newaxis, :], k_factor=k_factor
+    )[0]
+
+
+def calculate_elo_adjustments_batch(
+    ratings: np.ndarray,              # (num_prix, max_players) array of ratings
+    positions: np.ndarray,            # (num_prix, max_players) array of finish positions
+    mask: Optional[np.ndarray] = None,  # (num_prix, max_players) bool array of occupied slots
+    k_factor: int = 32,
+) -> np.ndarray:
+    """
+    Calculate ELO rating adjustments for many independent prix in one call.
+    
+    Each row is one prix. Prix with fewer players than max_players are
+    padded, and the padding slots are excluded through mask. The pairwise
+    expected-score matrix for every prix is built in a single broadcast.
+    
+    Args:
+        ratings: 2-D array of current ELO ratings
+        positions: 2-D array of finish positions
+        mask: 2-D boolean array, True where a slot holds a real player
+              (default: every slot is occupied)
+        k_factor: How much ratings can change (default: 32)
+    
+    Returns:
+        2-D integer array of ELO rating changes, 0 for padding slots and
+        for prix with a single player
+    """
+    ratings = np.asarray(ratings, dtype=np.float64)
+    positions = np.asarray(positions)
+    if mask is None:
+        mask = np.ones(ratings.shape, dtype=bool)
+    else:
+        mask = np.asarray(mask, dtype=bool)
+
+    num_slots = ratings.shape[1]
+
+    # expected[p, i, j] is player i's expected score against player j. The
+    # upper triangle is computed directly and the lower triangle as its
+    # complement, mirroring the pair order of calculate_elo_adjustments.
+    rating_diff = (ratings[:, np.newaxis, :] - ratings[:, :, np.newaxis]) / 400.0
+    upper = 1 / (1 + np.power(10, rating_diff))
+    upper_mask = np.triu(np.ones((num_slots, num_slots), dtype=bool), k=1)
+    expected = np.where(upper_mask, upper, 1 - np.swapaxes(upper, 1, 2))
+
+    # Actual scores: 1 for win, 0.5 for tie, 0 for loss
+    actual = (np.sign(positions[:, np.newaxis, :] - positions[:, :, np.newaxis]) + 1) / 2
+
+    pair_mask = mask[:, :, np.newaxis] & mask[:, np.newaxis, :]
+    pair_mask &= ~np.eye(num_slots, dtype=bool)
+    pair_adjustments = np.where(pair_mask, k_factor * (actual - expected), 0.0)
+
+    # Accumulate opponent by opponent rather than with .sum(axis=2) so the
+    # floating point additions happen in the same order as the scalar loop,
+    # which keeps the rounded results identical.
+    totals = np.zeros(ratings.shape, dtype=np.float64)
+    for opponent in range(num_slots):
+        totals += pair_adjustments[:, :, opponent]
+
+    num_players = mask.sum(axis=1, keepdims=True)
+    divisor = np.maximum(num_players - 1, 1)
+    return np.where(mask, np.rint(totals / divisor), 0).astype(np.int64)
+
+
+def apply_elo_adjustments_vectorized(
+    ratings: np.ndarray,
+    adjustments: np.ndarray,
+    min_rating: int = 0
+) -> np.ndarray:
+    """
+    Vectorized equivalent of apply_elo_adjustments.
+    
+    Args:
+        ratings: Array of current ELO ratings
+        adjustments: Array of ELO adjustments, aligned with ratings
+        min_rating: Minimum allowed rating (default: 0)
+    
+    Returns:
+        Array of new ELO ratings
+    """
+    return np.maximum(min_rating, np.asarray(ratings) + np.asarray(adjustments))
@@ -0,0 +1,97 @@
+import io
+import os
+from functools import lru_cache
+from pathlib import Path
+from PIL import Image
+
+IMAGE_DIR = Path(__file__).parent / "images"
+THUMBNAIL_DIR = IMAGE_DIR / "thumbnails"
+IMAGE_TYPES = ("characters", "vehicles", "tires", "gliders")
+
+# Kart combo images are shown at a consistent height, keeping aspect ratio
+THUMBNAIL_HEIGHT = 100
+THUMBNAIL_QUALITY = 90
+
+# Encoded thumbnails kept in memory; the full kart part catalog is ~100 images
+THUMBNAIL_CACHE_SIZE = 256
+
+
+def image_path(name: str, image_type: str) -> Path:
+    """
+    Get the source image for a kart part, e.g. ("Baby Mario", "characters").
+
+    Args:
+        name: Character, vehicle, tire or glider name
+        image_type: One of IMAGE_TYPES
+
+    Returns:
+        Path to the PNG under images/
+    """
+    file_name = name.replace(" ", "_").replace("-", "_").lower()
+    return IMAGE_DIR / image_type / f"{file_name}.png"
+
+
+def thumbnail_path(source: Path, mtime_ns: int, height: int) -> Path:
+    """Get the on-disk thumbnail for a version of a source image."""
+    return THUMBNAIL_DIR / source.parent.name / f"{source.stem}_{height}_{mtime_ns}.webp"
+
+
+def render_thumbnail(source: Path, height: int) -> bytes:
+    """Decode, resize and re-encode a source image as WebP."""
+    with Image.open(source) as img:
+        width = max(1, round(height * img.width / img.height))
+        thumbnail = img.resize((width, height), Image.LANCZOS)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, format="WEBP", quality=THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=THUMBNAIL_CACHE_SIZE)
+def _thumbnail_bytes(source: Path, mtime_ns: int, height: int) -> bytes:
+    # The mtime is part of the key, so editing a source image misses here and
+    # on disk, and the stale thumbnail is simply never read again
+    cached = thumbnail_path(source, mtime_ns, height)
+    if cached.exists():
+        return cached.read_bytes()
+
+    data = render_thumbnail(source, height)
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename so concurrent reruns never read a partial file
+    partial = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+    partial.write_bytes(data)
+    partial.replace(cached)
+    return data
+
+
+def get_thumbnail(name: str, image_type: str, height: int = THUMBNAIL_HEIGHT) -> bytes:
+    """
+    Get a kart part thumbnail as encoded WebP bytes.
+
+    Served from memory after the first use, from images/thumbnails/ after a
+    restart, and only decoded from the source PNG when neither has it.
+
+    Args:
+        name: Character, vehicle, tire or glider name
+        image_type: One of IMAGE_TYPES
+        height: Thumbnail height in pixels
+
+    Returns:
+        WebP image bytes, ready for st.image
+    """
+    source = image_path(name, image_type)
+    return _thumbnail_bytes(source, source.stat().st_mtime_ns, height)
+
+
+def build_thumbnails(height: int = THUMBNAIL_HEIGHT) -> int:
+    """
+    Generate thumbnails for every image under IMAGE_TYPES ahead of time.
+
+    Returns:
+        Number of images processed
+    """
+    count = 0
+    for image_type in IMAGE_TYPES:
+        for source in sorted((IMAGE_DIR / image_type).glob("*.png")):
+            _thumbnail_bytes(source, source.stat().st_mtime_ns, height)
+            count += 1
+    return count
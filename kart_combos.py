@@ -0,0 +1,98 @@
+from datetime import datetime
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from models import KartCombo, Player
+from sql_compat import bulk_update, upsert
+
+# (character, vehicle, tire, glider) -> combo_id for every combo this
+# process has seen committed. Combos are never edited or deleted, so
+# entries stay valid for the life of the process.
+_combo_ids: dict[tuple, int] = {}
+
+# Session.info key holding combos created in a transaction that has not
+# committed yet; they only join the cache once the commit succeeds.
+_PENDING_KEY = 'pending_combo_ids'
+
+
+@event.listens_for(Session, 'after_commit')
+def _cache_committed_combos(session):
+    _combo_ids.update(session.info.pop(_PENDING_KEY, {}))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_combos(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def get_or_create_combos(db: Session, combos: list[tuple]) -> dict[tuple, int]:
+    """
+    Look up kart combos by their parts, creating any that don't exist yet.
+
+    Cached combos cost nothing; the rest are resolved with a single
+    INSERT ... ON CONFLICT ... RETURNING, so this is one query at most.
+
+    Args:
+        db: Database session
+        combos: List of (character, vehicle, tire, glider) tuples
+
+    Returns:
+        Dict mapping each combo tuple to its combo_id
+    """
+    combo_ids = {combo: _combo_ids[combo] for combo in combos if combo in _combo_ids}
+    missing = list(dict.fromkeys(combo for combo in combos if combo not in combo_ids))
+
+    if missing:
+        stmt = upsert(db, KartCombo).values([
+            {
+                "character_name": character,
+                "vehicle_name": vehicle,
+                "tire_name": tire,
+                "glider_name": glider,
+            }
+            for character, vehicle, tire, glider in missing
+        ])
+        # A no-op update (rather than DO NOTHING) makes existing rows come back too
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['character_name', 'vehicle_name', 'tire_name', 'glider_name'],
+            set_={"character_name": stmt.excluded.character_name}
+        ).returning(
+            KartCombo.combo_id,
+            KartCombo.character_name,
+            KartCombo.vehicle_name,
+            KartCombo.tire_name,
+            KartCombo.glider_name
+        )
+        created = {
+            (row.character_name, row.vehicle_name, row.tire_name, row.glider_name): row.combo_id
+            for row in db.execute(stmt)
+        }
+        db.info.setdefault(_PENDING_KEY, {}).update(created)
+        combo_ids.update(created)
+
+    return combo_ids
+
+
+def set_last_combos(db: Session, last_combo_ids: dict[int, int], played_at: datetime = None) -> None:
+    """
+    Record each player's most recently used kart combo and when they played.
+
+    last_played_at orders the player picker without scanning the race history.
+
+    Args:
+        db: Database session
+        last_combo_ids: Dict mapping player_id to combo_id
+        played_at: When the players started playing, defaults to now
+    """
+    bulk_update(db, Player.player_id, Player.last_combo_id, last_combo_ids)
+    db.query(Player).filter(Player.player_id.in_(list(last_combo_ids))).update(
+        {Player.last_played_at: played_at or datetime.utcnow()}, synchronize_session=False
+    )
+
+
+def get_last_combo(db: Session, player_nickname: str):
+    """Get a player's most recently used kart combo, or None."""
+    return db.execute(
+        select(KartCombo)
+        .join(Player, Player.last_combo_id == KartCombo.combo_id)
+        .where(Player.player_nickname == player_nickname)
+    ).scalar_one_or_none()
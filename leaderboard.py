@@ -0,0 +1,112 @@
+from datetime import datetime
+from sqlalchemy import func, distinct, insert, literal, select
+from sqlalchemy.orm import Session
+from models import LeaderboardEntry, Player, Race, RaceResult
+
+
+def refresh_leaderboard(db: Session) -> None:
+    """
+    Rebuild the leaderboard snapshot from race_results.
+    
+    Runs inside the caller's transaction, so the snapshot is replaced
+    atomically with whatever write triggered the refresh (e.g. submitting
+    a prix or recalculating ELO ratings).
+    
+    Args:
+        db: Database session
+    """
+    # Per-prix points, races and wins for each player
+    prix_results = (
+        select(
+            Race.prix_id,
+            Player.player_id,
+            func.sum(RaceResult.points_earned).label('total_points'),
+            func.count(distinct(Race.race_id)).label('total_races'),
+            func.count(distinct(Race.race_id)).filter(RaceResult.finish_position == 1).label('races_won')
+        )
+        .join(RaceResult, Player.player_id == RaceResult.player_id)
+        .join(Race, RaceResult.race_id == Race.race_id)
+        .group_by(Race.prix_id, Player.player_id)
+        .subquery()
+    )
+
+    # Finish position of each player within each prix
+    prix_rankings = (
+        select(
+            prix_results.c.prix_id,
+            prix_results.c.player_id,
+            prix_results.c.total_races,
+            prix_results.c.races_won,
+            func.rank().over(
+                partition_by=prix_results.c.prix_id,
+                order_by=prix_results.c.total_points.desc()
+            ).label('prix_finish_position')
+        )
+        .subquery()
+    )
+
+    rankings = (
+        select(
+            Player.player_id,
+            Player.player_nickname,
+            Player.elo_rating,
+            func.sum(prix_rankings.c.total_races),
+            func.sum(prix_rankings.c.races_won),
+            func.count(distinct(prix_rankings.c.prix_id)),
+            func.count(distinct(prix_rankings.c.prix_id)).filter(prix_rankings.c.prix_finish_position == 1),
+            literal(datetime.utcnow(), LeaderboardEntry.refreshed_at.type)
+        )
+        .join(prix_rankings, prix_rankings.c.player_id == Player.player_id)
+        .group_by(Player.player_id, Player.player_nickname, Player.elo_rating)
+    )
+
+    db.query(LeaderboardEntry).delete()
+    db.execute(
+        insert(LeaderboardEntry).from_select(
+            [
+                LeaderboardEntry.player_id,
+                LeaderboardEntry.player_nickname,
+                LeaderboardEntry.elo_rating,
+                LeaderboardEntry.total_races,
+                LeaderboardEntry.races_won,
+                LeaderboardEntry.total_prixs,
+                LeaderboardEntry.prixs_won,
+                LeaderboardEntry.refreshed_at,
+            ],
+            rankings
+        )
+    )
+
+
+def get_leaderboard(db: Session) -> list:
+    """
+    Read the leaderboard snapshot, highest ELO rating first.
+    
+    The snapshot is built on first use if it has never been populated.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        List of rows with player_nickname, elo_rating, total_races,
+        races_won, total_prixs and prixs_won
+    """
+    query = (
+        db.query(
+            LeaderboardEntry.player_nickname,
+            LeaderboardEntry.elo_rating,
+            LeaderboardEntry.total_races,
+            LeaderboardEntry.races_won,
+            LeaderboardEntry.total_prixs,
+            LeaderboardEntry.prixs_won
+        )
+        .order_by(
+            LeaderboardEntry.elo_rating.desc(),
+            LeaderboardEntry.player_nickname
+        )
+    )
+    entries = query.all()
+    if not entries:
+        refresh_leaderboard(db)
+        entries = query.all()
+    return entries
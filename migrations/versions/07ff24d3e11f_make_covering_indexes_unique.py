@@ -0,0 +1,33 @@
+"""make covering indexes unique
+
+Revision ID: 07ff24d3e11f
+Revises: e5c2a8b4f917
+Create Date: 2026-10-17 01:34:06.524942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '07ff24d3e11f'
+down_revision: Union[str, None] = 'e5c2a8b4f917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The covering indexes double as the uniqueness constraints, rather
+    # than paying for a second index on the same columns
+    op.drop_index('ix_race_results_race_id_player_id', table_name='race_results')
+    op.create_index('uq_race_player', 'race_results', ['race_id', 'player_id'], unique=True, postgresql_include=['finish_position', 'points_earned'])
+    op.drop_index('ix_races_prix_id_race_number', table_name='races')
+    op.create_index('uq_prix_race_number', 'races', ['prix_id', 'race_number'], unique=True, postgresql_include=['track_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('uq_prix_race_number', table_name='races')
+    op.create_index('ix_races_prix_id_race_number', 'races', ['prix_id', 'race_number'], unique=False, postgresql_include=['track_id'])
+    op.drop_index('uq_race_player', table_name='race_results')
+    op.create_index('ix_race_results_race_id_player_id', 'race_results', ['race_id', 'player_id'], unique=False, postgresql_include=['finish_position', 'points_earned'])
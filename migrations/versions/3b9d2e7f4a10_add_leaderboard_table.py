@@ -0,0 +1,39 @@
+"""add leaderboard table
+
+Revision ID: 3b9d2e7f4a10
+Revises: 58172627e1ca
+Create Date: 2026-10-17 09:12:31.482116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d2e7f4a10'
+down_revision: Union[str, None] = '58172627e1ca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('leaderboard',
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('player_nickname', sa.String(length=50), nullable=False),
+    sa.Column('elo_rating', sa.Integer(), nullable=False),
+    sa.Column('total_races', sa.Integer(), nullable=False),
+    sa.Column('races_won', sa.Integer(), nullable=False),
+    sa.Column('total_prixs', sa.Integer(), nullable=False),
+    sa.Column('prixs_won', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['player_id'], ['players.player_id'], ),
+    sa.PrimaryKeyConstraint('player_id')
+    )
+    op.create_index('ix_leaderboard_elo_rating', 'leaderboard', ['elo_rating'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_leaderboard_elo_rating', table_name='leaderboard')
+    op.drop_table('leaderboard')
@@ -0,0 +1,38 @@
+"""add players last_played_at
+
+Revision ID: 66f9352c1430
+Revises: 07ff24d3e11f
+Create Date: 2026-10-17 01:41:14.330192
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '66f9352c1430'
+down_revision: Union[str, None] = '07ff24d3e11f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('players', sa.Column('last_played_at', sa.DateTime(), nullable=True))
+    # Backfill from each player's most recent race
+    op.execute("""
+        UPDATE players
+        SET last_played_at = latest.last_played_at
+        FROM (
+            SELECT race_results.player_id, max(races.created_at) AS last_played_at
+            FROM race_results
+            JOIN races ON races.race_id = race_results.race_id
+            GROUP BY race_results.player_id
+        ) AS latest
+        WHERE players.player_id = latest.player_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('players', 'last_played_at')
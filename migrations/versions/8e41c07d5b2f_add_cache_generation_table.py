@@ -0,0 +1,32 @@
+"""add cache generation table
+
+Revision ID: 8e41c07d5b2f
+Revises: 3b9d2e7f4a10
+Create Date: 2026-10-17 11:04:52.913370
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41c07d5b2f'
+down_revision: Union[str, None] = '3b9d2e7f4a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    cache_generation = op.create_table('cache_generation',
+    sa.Column('generation_id', sa.Integer(), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('generation_id')
+    )
+    op.bulk_insert(cache_generation, [{'generation_id': 1, 'generation': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('cache_generation')
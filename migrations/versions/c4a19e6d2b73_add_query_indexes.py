@@ -0,0 +1,37 @@
+"""add query indexes
+
+Revision ID: c4a19e6d2b73
+Revises: 8e41c07d5b2f
+Create Date: 2026-10-17 14:27:09.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a19e6d2b73'
+down_revision: Union[str, None] = '8e41c07d5b2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_prixs_date_played', 'prixs', ['date_played'], unique=False)
+    op.create_index('ix_races_prix_id_race_number', 'races', ['prix_id', 'race_number'], unique=False, postgresql_include=['track_id'])
+    op.create_index('ix_races_track_id', 'races', ['track_id'], unique=False)
+    op.create_index('ix_race_results_race_id_player_id', 'race_results', ['race_id', 'player_id'], unique=False, postgresql_include=['finish_position', 'points_earned'])
+    op.create_index('ix_race_results_player_id_race_id', 'race_results', ['player_id', 'race_id'], unique=False, postgresql_include=['finish_position', 'points_earned', 'combo_id'])
+    op.create_index('ix_race_results_combo_id', 'race_results', ['combo_id'], unique=False)
+    op.create_index('ix_prix_results_player_id_prix_id', 'prix_results', ['player_id', 'prix_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_prix_results_player_id_prix_id', table_name='prix_results')
+    op.drop_index('ix_race_results_combo_id', table_name='race_results')
+    op.drop_index('ix_race_results_player_id_race_id', table_name='race_results')
+    op.drop_index('ix_race_results_race_id_player_id', table_name='race_results')
+    op.drop_index('ix_races_track_id', table_name='races')
+    op.drop_index('ix_races_prix_id_race_number', table_name='races')
+    op.drop_index('ix_prixs_date_played', table_name='prixs')
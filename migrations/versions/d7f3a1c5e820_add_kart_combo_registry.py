@@ -0,0 +1,68 @@
+"""add kart combo registry
+
+Revision ID: d7f3a1c5e820
+Revises: c4a19e6d2b73
+Create Date: 2026-10-17 16:02:44.137985
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f3a1c5e820'
+down_revision: Union[str, None] = 'c4a19e6d2b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Point results at the oldest copy of any duplicated combo, then drop the copies
+    op.execute("""
+        WITH canonical AS (
+            SELECT combo_id,
+                   min(combo_id) OVER (
+                       PARTITION BY character_name, vehicle_name, tire_name, glider_name
+                   ) AS keep_id
+            FROM kart_combos
+        )
+        UPDATE race_results
+        SET combo_id = canonical.keep_id
+        FROM canonical
+        WHERE race_results.combo_id = canonical.combo_id
+          AND canonical.combo_id <> canonical.keep_id
+    """)
+    op.execute("""
+        DELETE FROM kart_combos
+        WHERE combo_id NOT IN (
+            SELECT min(combo_id)
+            FROM kart_combos
+            GROUP BY character_name, vehicle_name, tire_name, glider_name
+        )
+    """)
+    op.create_unique_constraint('uq_kart_combo', 'kart_combos', ['character_name', 'vehicle_name', 'tire_name', 'glider_name'])
+
+    op.add_column('players', sa.Column('last_combo_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('players_last_combo_id_fkey', 'players', 'kart_combos', ['last_combo_id'], ['combo_id'])
+    # Backfill from each player's most recent race
+    op.execute("""
+        UPDATE players
+        SET last_combo_id = latest.combo_id
+        FROM (
+            SELECT DISTINCT ON (race_results.player_id)
+                   race_results.player_id, race_results.combo_id
+            FROM race_results
+            JOIN races ON races.race_id = race_results.race_id
+            WHERE race_results.combo_id IS NOT NULL
+            ORDER BY race_results.player_id, races.created_at DESC, races.race_id DESC
+        ) AS latest
+        WHERE players.player_id = latest.player_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_constraint('players_last_combo_id_fkey', 'players', type_='foreignkey')
+    op.drop_column('players', 'last_combo_id')
+    op.drop_constraint('uq_kart_combo', 'kart_combos', type_='unique')
@@ -0,0 +1,52 @@
+"""add player track stats rollup
+
+Revision ID: e5c2a8b4f917
+Revises: d7f3a1c5e820
+Create Date: 2026-10-17 18:21:09.604311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c2a8b4f917'
+down_revision: Union[str, None] = 'd7f3a1c5e820'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('player_track_stats',
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('track_id', sa.Integer(), nullable=False),
+    sa.Column('races', sa.Integer(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.Column('points_sum', sa.Integer(), nullable=False),
+    sa.Column('position_sum', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['player_id'], ['players.player_id'], ),
+    sa.ForeignKeyConstraint(['track_id'], ['tracks.track_id'], ),
+    sa.PrimaryKeyConstraint('player_id', 'track_id')
+    )
+    op.create_index('ix_player_track_stats_track_id', 'player_track_stats', ['track_id'], unique=False)
+
+    # Backfill from the existing race history
+    op.execute("""
+        INSERT INTO player_track_stats (player_id, track_id, races, wins, points_sum, position_sum)
+        SELECT race_results.player_id, races.track_id,
+               count(race_results.result_id),
+               count(race_results.result_id) FILTER (WHERE race_results.finish_position = 1),
+               sum(race_results.points_earned),
+               sum(race_results.finish_position)
+        FROM race_results
+        JOIN races ON races.race_id = race_results.race_id
+        WHERE race_results.player_id IS NOT NULL AND races.track_id IS NOT NULL
+        GROUP BY race_results.player_id, races.track_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_player_track_stats_track_id', table_name='player_track_stats')
+    op.drop_table('player_track_stats')
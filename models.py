@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, CheckConstraint, UniqueConstraint
+from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -29,6 +29,10 @@ class Prix(Base):
     races = relationship("Race", back_populates="prix")
     prix_results = relationship("PrixResult", back_populates="prix")
 
+    __table_args__ = (
+        Index('ix_prixs_date_played', 'date_played'),
+    )
+
 class Player(Base):
     __tablename__ = 'players'
 
@@ -37,6 +41,8 @@ class Player(Base):
     player_last_name = Column(String(50), nullable=False)
     player_nickname = Column(String(50), nullable=False, unique=True)
     elo_rating = Column(Integer, nullable=False, default=1500)
+    last_combo_id = Column(Integer, ForeignKey('kart_combos.combo_id'))
+    last_played_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     race_results = relationship("RaceResult", back_populates="player")
@@ -54,6 +60,10 @@ class KartCombo(Base):
 
     race_results = relationship("RaceResult", back_populates="kart_combo")
 
+    __table_args__ = (
+        UniqueConstraint('character_name', 'vehicle_name', 'tire_name', 'glider_name', name='uq_kart_combo'),
+    )
+
 class Track(Base):
     __tablename__ = 'tracks'
 
@@ -79,6 +89,8 @@ class Race(Base):
 
     __table_args__ = (
         CheckConstraint('race_number > 0'),
+        Index('uq_prix_race_number', 'prix_id', 'race_number', unique=True, postgresql_include=['track_id']),
+        Index('ix_races_track_id', 'track_id'),
     )
 
 class RaceResult(Base):
@@ -99,6 +111,11 @@ class RaceResult(Base):
     __table_args__ = (
         CheckConstraint('finish_position BETWEEN 1 AND 12'),
         CheckConstraint('points_earned BETWEEN 1 AND 15'),
+        Index('uq_race_player', 'race_id', 'player_id', unique=True,
+              postgresql_include=['finish_position', 'points_earned']),
+        Index('ix_race_results_player_id_race_id', 'player_id', 'race_id',
+              postgresql_include=['finish_position', 'points_earned', 'combo_id']),
+        Index('ix_race_results_combo_id', 'combo_id'),
     )
 
 class PrixResult(Base):
@@ -118,4 +135,42 @@ class PrixResult(Base):
 
     __table_args__ = (
         UniqueConstraint('prix_id', 'player_id', name='uq_prix_player'),
-    )
\ No newline at end of file
+        Index('ix_prix_results_player_id_prix_id', 'player_id', 'prix_id'),
+    )
+
+class LeaderboardEntry(Base):
+    __tablename__ = 'leaderboard'
+
+    player_id = Column(Integer, ForeignKey('players.player_id'), primary_key=True)
+    player_nickname = Column(String(50), nullable=False)
+    elo_rating = Column(Integer, nullable=False)
+    total_races = Column(Integer, nullable=False, default=0)
+    races_won = Column(Integer, nullable=False, default=0)
+    total_prixs = Column(Integer, nullable=False, default=0)
+    prixs_won = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_leaderboard_elo_rating', 'elo_rating'),
+    )
+
+class PlayerTrackStats(Base):
+    __tablename__ = 'player_track_stats'
+
+    player_id = Column(Integer, ForeignKey('players.player_id'), primary_key=True)
+    track_id = Column(Integer, ForeignKey('tracks.track_id'), primary_key=True)
+    races = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    points_sum = Column(Integer, nullable=False, default=0)
+    position_sum = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_player_track_stats_track_id', 'track_id'),
+    )
+
+class CacheGeneration(Base):
+    __tablename__ = 'cache_generation'
+
+    generation_id = Column(Integer, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,137 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from database import bump_cache_generation
+from elo import calculate_elo_adjustments, apply_elo_adjustments
+from leaderboard import refresh_leaderboard
+from models import Player, PrixResult, Race, RaceResult
+from sql_compat import bulk_update, upsert
+
+
+def calculate_placements(totals: list[tuple]) -> list[tuple]:
+    """
+    Rank (key, total_points) pairs, giving tied totals the same placement.
+
+    Args:
+        totals: List of (key, total_points) tuples
+
+    Returns:
+        List of (key, placement) tuples ordered from first to last
+    """
+    sorted_totals = sorted(totals, key=lambda x: x[1], reverse=True)
+
+    placements = []
+    current_placement = 1
+    current_points = sorted_totals[0][1] if sorted_totals else None
+
+    for key, points in sorted_totals:
+        if points < current_points:
+            current_points = points
+            current_placement = len(placements) + 1
+        placements.append((key, current_placement))
+
+    return placements
+
+
+def score_prix(prix_id: int, totals: list[tuple], ratings: dict[int, int]) -> tuple[list[dict], dict[int, int]]:
+    """
+    Compute placements and ELO changes for one prix.
+
+    Args:
+        prix_id: Prix being scored
+        totals: List of (player_id, total_points) tuples
+        ratings: Dict mapping player_id to rating going into the prix
+
+    Returns:
+        Tuple of (prix_results rows, new ratings of the prix's players)
+    """
+    placements = calculate_placements(totals)
+
+    current_ratings = {player_id: ratings[player_id] for player_id, _ in placements}
+    elo_adjustments = calculate_elo_adjustments(placements, current_ratings)
+    new_ratings = apply_elo_adjustments(current_ratings, elo_adjustments)
+
+    prix_result_rows = [
+        {
+            "prix_id": prix_id,
+            "player_id": player_id,
+            "placement": placement,
+            "starting_elo": current_ratings[player_id],
+            "elo_adjustment": elo_adjustments[player_id],
+            "ending_elo": new_ratings[player_id],
+        }
+        for player_id, placement in placements
+    ]
+    return prix_result_rows, new_ratings
+
+
+def write_elo_ratings(db: Session, prix_result_rows: list[dict], ratings: dict[int, int]) -> None:
+    """
+    Bulk upsert prix_results rows and bulk update players' ELO ratings.
+
+    Issues one multi-row INSERT ... ON CONFLICT and one bulk UPDATE
+    (UPDATE ... FROM (VALUES ...) on PostgreSQL), however many players
+    are involved.
+
+    Args:
+        db: Database session
+        prix_result_rows: Rows as returned by score_prix
+        ratings: Dict mapping player_id to new rating
+    """
+    if prix_result_rows:
+        stmt = upsert(db, PrixResult)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['prix_id', 'player_id'],
+            set_={
+                "placement": stmt.excluded.placement,
+                "starting_elo": stmt.excluded.starting_elo,
+                "elo_adjustment": stmt.excluded.elo_adjustment,
+                "ending_elo": stmt.excluded.ending_elo,
+            }
+        )
+        db.execute(stmt, prix_result_rows)
+
+    bulk_update(db, Player.player_id, Player.elo_rating, ratings)
+
+
+def finalize_prix(db: Session, prix_id: int, refresh: bool = True) -> list[dict]:
+    """
+    Record a finished prix's placements and apply its ELO changes.
+
+    Totals and current ratings come from one aggregate query and are
+    written back with write_elo_ratings, all inside the caller's transaction.
+
+    Args:
+        db: Database session
+        prix_id: Prix to finalize
+        refresh: Rebuild the leaderboard and invalidate cached queries
+                 afterwards. Callers finalizing many prix in a row can
+                 pass False and do this once at the end.
+
+    Returns:
+        The prix_results rows written, ordered by placement
+    """
+    totals = (
+        db.query(
+            Player.player_id,
+            Player.elo_rating,
+            func.sum(RaceResult.points_earned).label('total_points')
+        )
+        .join(RaceResult, Player.player_id == RaceResult.player_id)
+        .join(Race, RaceResult.race_id == Race.race_id)
+        .filter(Race.prix_id == prix_id)
+        .group_by(Player.player_id, Player.elo_rating)
+        .all()
+    )
+
+    prix_result_rows, new_ratings = score_prix(
+        prix_id,
+        [(t.player_id, t.total_points) for t in totals],
+        {t.player_id: t.elo_rating for t in totals}
+    )
+    write_elo_ratings(db, prix_result_rows, new_ratings)
+
+    if refresh:
+        refresh_leaderboard(db)
+        bump_cache_generation(db)
+
+    return prix_result_rows
@@ -0,0 +1,426 @@
+import streamlit as st
+from sqlalchemy import func, desc, distinct
+from database import get_db_context
+from leaderboard import get_leaderboard
+from models import Prix, Race, RaceResult, Player, Track, KartCombo, PrixResult
+from sql_compat import string_agg
+from track_stats import get_player_track_stats
+
+# Cached results are keyed by the data generation (see
+# database.get_cache_generation), so writes are visible on the very next
+# rerun. The TTL only bounds how long superseded generations stay in memory.
+CACHE_TTL_SECONDS = 600
+CACHE_MAX_ENTRIES = 256
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_leaderboard(generation: int):
+    """Get leaderboard rows sorted by ELO rating."""
+    with get_db_context() as db:
+        return get_leaderboard(db)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_elo_history(generation: int):
+    """Get each player's last ending ELO rating per day played."""
+    with get_db_context() as db:
+        # Number each player's prix within a day, latest first
+        daily_elo = (
+            db.query(
+                Player.player_nickname,
+                func.date(Prix.date_played).label('date'),
+                PrixResult.ending_elo,
+                func.row_number().over(
+                    partition_by=(Player.player_nickname, func.date(Prix.date_played)),
+                    order_by=(Prix.date_played.desc(), Prix.prix_id.desc())
+                ).label('row_number')
+            )
+            .join(PrixResult, Player.player_id == PrixResult.player_id)
+            .join(Prix, PrixResult.prix_id == Prix.prix_id)
+            .subquery()
+        )
+
+        return (
+            db.query(daily_elo.c.player_nickname, daily_elo.c.date, daily_elo.c.ending_elo)
+            .filter(daily_elo.c.row_number == 1)
+            .order_by(daily_elo.c.player_nickname, daily_elo.c.date)
+            .all()
+        )
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_track_stats(generation: int, track_name: str):
+    """
+    Get race count, top winner and top 10 players by average points for a track.
+
+    Player figures come from the player_track_stats rollup.
+
+    Returns:
+        Tuple of (race count, winner row or None, ranking rows); rows come
+        from track_stats.get_player_track_stats
+    """
+    with get_db_context() as db:
+        # Get total races for selected track
+        track_race_count = (
+            db.query(func.count(Race.race_id))
+            .join(Track, Race.track_id == Track.track_id)
+            .filter(Track.track_name == track_name)
+            .scalar()
+        )
+        player_stats = get_player_track_stats(db, track_name=track_name)
+
+    # Player with most wins on this track
+    track_winner = max((row for row in player_stats if row.wins), key=lambda row: row.wins, default=None)
+
+    return track_race_count, track_winner, player_stats[:10]
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_player_track_stats(generation: int, track_name: str = None, player_nicknames: tuple = None):
+    """
+    Get per-player, per-track stats for any track and set of players.
+
+    Args:
+        generation: Data generation the result is cached under
+        track_name: Only this track, or None for every track
+        player_nicknames: Only these players, or None for every player
+
+    Returns:
+        Rows from track_stats.get_player_track_stats, highest avg_points first
+    """
+    with get_db_context() as db:
+        return get_player_track_stats(db, track_name, player_nicknames)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_track_distribution(generation: int):
+    """Get the number of races played on every track, most played first."""
+    with get_db_context() as db:
+        return (
+            db.query(
+                Track.track_name,
+                func.count(Race.race_id).label('number_of_races')
+            )
+            .join(Race, Race.track_id == Track.track_id, isouter=True)
+            .group_by(Track.track_name)
+            .order_by(desc('number_of_races'))
+            .all()
+        )
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_player_names(generation: int):
+    """Get all player nicknames in alphabetical order."""
+    with get_db_context() as db:
+        players = db.query(Player.player_nickname).distinct().order_by(Player.player_nickname).all()
+        return [p[0] for p in players]
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_player_profile(generation: int, player_nickname: str):
+    """
+    Get a player's prix statistics, race statistics and favourite kart combo.
+
+    Returns:
+        Tuple of (prix stats row, race stats row, kart combo row or None)
+    """
+    with get_db_context() as db:
+        # Prix Statistics
+        all_prix_history = (
+            db.query(
+                Prix.prix_id,
+                Player.player_nickname,
+                func.sum(RaceResult.points_earned).label('total_points'),
+                func.rank().over(
+                    partition_by=Prix.prix_id,
+                    order_by=func.sum(RaceResult.points_earned).desc()
+                    ).label('finish_position')
+            )
+            .join(Race, Race.prix_id == Prix.prix_id)
+            .join(RaceResult, RaceResult.race_id == Race.race_id)
+            .join(Player, Player.player_id == RaceResult.player_id)
+            .group_by(Prix.prix_id, Player.player_nickname)
+            .subquery()
+        )
+
+        # Get total prix and prix wins
+        prix_stats = (
+            db.query(
+                func.count(distinct(all_prix_history.c.prix_id)).label('total_prix'),
+                func.count(distinct(all_prix_history.c.prix_id)).filter(
+                    all_prix_history.c.finish_position == 1
+                ).label('prix_wins'),
+                func.avg(all_prix_history.c.finish_position).label('average_finish_position')
+            )
+            .filter(all_prix_history.c.player_nickname == player_nickname)
+            .first()
+        )
+
+        # Race Statistics
+        race_stats = (
+            db.query(
+                func.count(Race.race_id).label('total_races'),
+                func.count(Race.race_id).filter(
+                    RaceResult.finish_position == 1
+                ).label('race_wins'),
+                func.avg(RaceResult.points_earned).label('average_points')
+            )
+            .join(RaceResult, RaceResult.race_id == Race.race_id)
+            .join(Player, Player.player_id == RaceResult.player_id)
+            .filter(Player.player_nickname == player_nickname)
+            .first()
+        )
+
+        favkart_combo = (
+            db.query(
+                KartCombo.character_name,
+                KartCombo.vehicle_name,
+                KartCombo.tire_name,
+                KartCombo.glider_name,
+                func.count(distinct(Prix.prix_id)).label('total_prixs')
+            )
+            .join(Race, Race.prix_id == Prix.prix_id)
+            .join(RaceResult, RaceResult.race_id == Race.race_id)
+            .join(Player, Player.player_id == RaceResult.player_id)
+            .join(KartCombo, KartCombo.combo_id == RaceResult.combo_id)
+            .filter(Player.player_nickname == player_nickname)
+            .group_by(KartCombo.character_name, KartCombo.vehicle_name, KartCombo.tire_name, KartCombo.glider_name)
+            .order_by(desc(func.count(distinct(Prix.prix_id))))
+            .first()
+        )
+
+    return prix_stats, race_stats, favkart_combo
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_player_prix_count(generation: int, player_nickname: str):
+    """Get the number of prix a player took part in."""
+    with get_db_context() as db:
+        return (
+            db.query(func.count(distinct(Race.prix_id)))
+            .join(RaceResult, RaceResult.race_id == Race.race_id)
+            .join(Player, Player.player_id == RaceResult.player_id)
+            .filter(Player.player_nickname == player_nickname)
+            .scalar()
+        )
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_player_prix_history(generation: int, player_nickname: str, page: int, page_size: int):
+    """
+    Get one page of the prix a player took part in, newest first.
+
+    Finish positions are only ranked within the player's own prix, so the
+    cost follows the page size rather than the size of the whole history.
+
+    Args:
+        generation: Data generation the result is cached under
+        player_nickname: Player to get the history for
+        page: Page number, starting at 1
+        page_size: Number of prix per page
+
+    Returns:
+        Prix rows with the player's total points and finish position
+    """
+    with get_db_context() as db:
+        # Page of prix the player took part in
+        player_prix = (
+            db.query(Prix.prix_id, Prix.date_played)
+            .join(Race, Race.prix_id == Prix.prix_id)
+            .join(RaceResult, RaceResult.race_id == Race.race_id)
+            .join(Player, Player.player_id == RaceResult.player_id)
+            .filter(Player.player_nickname == player_nickname)
+            .distinct()
+            .order_by(Prix.date_played.desc(), Prix.prix_id.desc())
+            .limit(page_size)
+            .offset((page - 1) * page_size)
+            .subquery()
+        )
+
+        # Rank every player within those prix only
+        prix_history = (
+            db.query(
+                Prix.prix_id,
+                Prix.date_played,
+                Player.player_nickname,
+                Prix.number_of_players.label('num_players'),
+                Prix.race_count.label('num_races'),
+                func.sum(RaceResult.points_earned).label('total_points'),
+                func.rank().over(
+                    partition_by=Prix.prix_id,
+                    order_by=func.sum(RaceResult.points_earned).desc()
+                    ).label('finish_position')
+            )
+            .join(player_prix, player_prix.c.prix_id == Prix.prix_id)
+            .join(Race, Race.prix_id == Prix.prix_id)
+            .join(RaceResult, RaceResult.race_id == Race.race_id)
+            .join(Player, Player.player_id == RaceResult.player_id)
+            .group_by(Prix.prix_id, Prix.date_played, Player.player_nickname)
+            .subquery()
+        )
+
+        # Keep the selected player's row for each prix
+        return (
+            db.query(
+                prix_history.c.prix_id,
+                prix_history.c.date_played,
+                prix_history.c.num_players,
+                prix_history.c.num_races,
+                prix_history.c.total_points,
+                prix_history.c.finish_position
+            )
+            .filter(prix_history.c.player_nickname == player_nickname)
+            .order_by(prix_history.c.date_played.desc(), prix_history.c.prix_id.desc())
+            .all()
+        )
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_player_prix_races(generation: int, player_nickname: str, prix_ids: tuple):
+    """
+    Get a player's result in every race of a set of prix in a single query.
+
+    Returns:
+        Dict mapping prix_id to the player's race rows, in race order
+    """
+    with get_db_context() as db:
+        race_details = (
+            db.query(
+                Race.prix_id,
+                Race.race_number,
+                Track.track_name,
+                RaceResult.finish_position,
+                RaceResult.points_earned
+            )
+            .join(Track, Race.track_id == Track.track_id)
+            .join(RaceResult, RaceResult.race_id == Race.race_id)
+            .join(Player, RaceResult.player_id == Player.player_id)
+            .filter(
+                Race.prix_id.in_(prix_ids),
+                Player.player_nickname == player_nickname
+            )
+            .order_by(Race.prix_id, Race.race_number)
+            .all()
+        )
+
+    races_by_prix = {prix_id: [] for prix_id in prix_ids}
+    for race in race_details:
+        races_by_prix[race.prix_id].append(race)
+    return races_by_prix
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_prix_count(generation: int):
+    """Get the number of prix with recorded race results."""
+    with get_db_context() as db:
+        return db.query(func.count(distinct(Race.prix_id))).join(RaceResult).scalar()
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_prix_list(generation: int, page: int, page_size: int):
+    """
+    Get one page of prix with their winners, newest first.
+
+    Args:
+        generation: Data generation the result is cached under
+        page: Page number, starting at 1
+        page_size: Number of prix per page
+
+    Returns:
+        Prix rows for the page
+    """
+    with get_db_context() as db:
+
+        # Get all prix with their winners
+        all_prix_history = (
+            db.query(
+                Prix.prix_id,
+                Prix.date_played,
+                Player.player_nickname,
+                Prix.number_of_players.label('num_players'),
+                Prix.race_count.label('num_races'),
+                func.sum(RaceResult.points_earned).label('total_points'),
+                func.rank().over(
+                    partition_by=Prix.prix_id,
+                    order_by=func.sum(RaceResult.points_earned).desc()
+                    ).label('finish_position')
+            )
+            .join(Race, Race.prix_id == Prix.prix_id)
+            .join(RaceResult, RaceResult.race_id == Race.race_id)
+            .join(Player, Player.player_id == RaceResult.player_id)
+            .group_by(Prix.prix_id, Prix.date_played, Player.player_nickname)
+            .subquery()
+        )
+
+        return (
+            db.query(
+                all_prix_history.c.prix_id,
+                all_prix_history.c.date_played,
+                all_prix_history.c.num_players,
+                all_prix_history.c.num_races,
+                all_prix_history.c.total_points.label('winning_points'),
+                string_agg(all_prix_history.c.player_nickname, ' and ').label('winners')
+            )
+            .filter(all_prix_history.c.finish_position == 1)
+            .group_by(all_prix_history.c.prix_id, all_prix_history.c.date_played, all_prix_history.c.num_players, all_prix_history.c.num_races, all_prix_history.c.total_points)
+            .order_by(all_prix_history.c.date_played.desc(), all_prix_history.c.prix_id.desc())
+            .limit(page_size)
+            .offset((page - 1) * page_size)
+            .all()
+        )
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_prix_race_results(generation: int, prix_ids: tuple):
+    """
+    Get every player's race results for a set of prix in a single query.
+
+    Returns:
+        Dict mapping prix_id to its rows, ranked by total points
+    """
+    with get_db_context() as db:
+        race_results = (
+            db.query(
+                Race.prix_id,
+                Player.player_nickname,
+                Race.race_number,
+                Track.track_name,
+                RaceResult.finish_position,
+                RaceResult.points_earned,
+                func.sum(RaceResult.points_earned).over(
+                    partition_by=(Race.prix_id, Player.player_id)
+                ).label('total_points')
+            )
+            .join(RaceResult, Player.player_id == RaceResult.player_id)
+            .join(Race, RaceResult.race_id == Race.race_id)
+            .join(Track, Race.track_id == Track.track_id)
+            .filter(Race.prix_id.in_(prix_ids))
+            .subquery()
+        )
+
+        race_results_ranked = (
+            db.query(
+                race_results.c.prix_id,
+                race_results.c.player_nickname,
+                race_results.c.race_number,
+                race_results.c.track_name,
+                race_results.c.points_earned,
+                race_results.c.finish_position,
+                race_results.c.total_points,
+                func.dense_rank().over(
+                    partition_by=race_results.c.prix_id,
+                    order_by=race_results.c.total_points.desc()
+                ).label('prix_position')
+            )
+            .order_by(
+                race_results.c.prix_id,
+                race_results.c.total_points.desc(),
+                race_results.c.race_number
+            )
+            .all()
+        )
+
+    results_by_prix = {prix_id: [] for prix_id in prix_ids}
+    for row in race_results_ranked:
+        results_by_prix[row.prix_id].append(row)
+    return results_by_prix
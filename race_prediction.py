@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy.orm import Session
+from models import Player, PlayerTrackStats, Track
+
+# Races on a track before a player's track record counts at full weight;
+# with fewer, their track average is pulled towards their overall average.
+TRACK_PRIOR_RACES = 5
+
+# Rating points per point of average race score above the player's norm,
+# i.e. scoring 4 points a race better than usual on a track is worth 100 ELO
+ELO_PER_POINT = 25
+
+
+@dataclass
+class TrackMatrix:
+    """Ratings and per-track race totals for the players in a prix."""
+    players: list[str]
+    # (players,) current ELO ratings
+    ratings: np.ndarray
+    # Track name -> column in races and points
+    track_index: dict
+    # (players, tracks) races played and points scored
+    races: np.ndarray
+    points: np.ndarray
+
+
+@dataclass
+class RacePrediction:
+    """One player's outlook for the next race."""
+    player: str
+    rating: int
+    track_races: int
+    # None if the player has never raced on the track
+    track_avg_points: float
+    # Expected finishing order among the players, 1 = ahead of everyone
+    expected_rank: float
+    # Chance of finishing ahead of every other player
+    win_probability: float
+
+
+def load_track_matrix(db: Session, player_nicknames: list[str]) -> TrackMatrix:
+    """
+    Load the players' ratings and per-track totals in one query.
+
+    Args:
+        db: Database session
+        player_nicknames: Players in the prix, in display order
+
+    Returns:
+        TrackMatrix with a row per player and a column per track any of
+        them has raced on
+    """
+    rows = (
+        db.query(
+            Player.player_nickname,
+            Player.elo_rating,
+            Track.track_name,
+            PlayerTrackStats.races,
+            PlayerTrackStats.points_sum
+        )
+        .outerjoin(PlayerTrackStats, PlayerTrackStats.player_id == Player.player_id)
+        .outerjoin(Track, Track.track_id == PlayerTrackStats.track_id)
+        .filter(Player.player_nickname.in_(player_nicknames))
+        .all()
+    )
+
+    player_index = {nickname: i for i, nickname in enumerate(player_nicknames)}
+    track_index = {}
+    for row in rows:
+        if row.track_name is not None:
+            track_index.setdefault(row.track_name, len(track_index))
+
+    ratings = np.zeros(len(player_nicknames))
+    races = np.zeros((len(player_nicknames), len(track_index)))
+    points = np.zeros((len(player_nicknames), len(track_index)))
+    for row in rows:
+        i = player_index[row.player_nickname]
+        ratings[i] = row.elo_rating
+        if row.track_name is not None:
+            races[i, track_index[row.track_name]] = row.races
+            points[i, track_index[row.track_name]] = row.points_sum
+
+    return TrackMatrix(list(player_nicknames), ratings, track_index, races, points)
+
+
+def predict_race(matrix: TrackMatrix, track_name: str) -> list[RacePrediction]:
+    """
+    Predict each player's finish among the other players on a track.
+
+    Each player's rating is shifted by how much better or worse than their
+    overall average they score on this track, shrunk towards zero for
+    players with few races there. The shifted ratings give Plackett-Luce
+    strengths 10^(rating / 400), which reduce to the ELO expected score for
+    any pair of players. CPU racers are ignored.
+
+    Args:
+        matrix: Matrix from load_track_matrix
+        track_name: Selected track
+
+    Returns:
+        One RacePrediction per player, in matrix order
+    """
+    total_races = matrix.races.sum(axis=1)
+    overall_avg = np.divide(
+        matrix.points.sum(axis=1), total_races,
+        out=np.zeros_like(total_races), where=total_races > 0
+    )
+
+    column = matrix.track_index.get(track_name)
+    if column is None:
+        track_races = np.zeros_like(total_races)
+        track_avg = overall_avg
+    else:
+        track_races = matrix.races[:, column]
+        track_avg = np.divide(
+            matrix.points[:, column], track_races,
+            out=overall_avg.copy(), where=track_races > 0
+        )
+
+    weight = track_races / (track_races + TRACK_PRIOR_RACES)
+    effective = matrix.ratings + weight * (track_avg - overall_avg) * ELO_PER_POINT
+
+    # Subtracting the max keeps the powers of ten in range
+    strengths = np.power(10, (effective - effective.max()) / 400)
+    win_probability = strengths / strengths.sum()
+
+    # beats[i, j] is the chance player j finishes ahead of player i
+    beats = strengths[np.newaxis, :] / (strengths[:, np.newaxis] + strengths[np.newaxis, :])
+    np.fill_diagonal(beats, 0)
+    expected_rank = 1 + beats.sum(axis=1)
+
+    return [
+        RacePrediction(
+            player=player,
+            rating=int(matrix.ratings[i]),
+            track_races=int(track_races[i]),
+            track_avg_points=float(track_avg[i]) if track_races[i] else None,
+            expected_rank=float(expected_rank[i]),
+            win_probability=float(win_probability[i]),
+        )
+        for i, player in enumerate(matrix.players)
+    ]
@@ -0,0 +1,154 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from database import query_section
+
+# 'off', 'sections' to time each profile_section(), or 'functions' to also run
+# cProfile over the whole rerun. The app's ?profile= query parameter overrides it.
+PROFILE_MODES = ("off", "sections", "functions")
+PROFILE_MODE = os.environ.get('APP_PROFILE', 'off')
+# Directory the per-rerun reports are written to
+PROFILE_DIR = os.environ.get('APP_PROFILE_DIR', 'profiles')
+
+# Number of functions listed in a report, by cumulative time
+REPORT_TOP_FUNCTIONS = 30
+
+# Profile of the rerun running on this thread, and the open section names
+_profile = threading.local()
+
+
+@dataclass
+class SectionTiming:
+    """Wall time spent inside one profile_section()."""
+    # Names of the enclosing sections and this one, e.g. "Home / Leaderboard"
+    name: str
+    seconds: float
+
+
+@dataclass
+class RenderProfile:
+    """Timings collected over one rerun."""
+    mode: str
+    # In the order the sections finished, so nested sections come first
+    sections: list[SectionTiming] = field(default_factory=list)
+    total_seconds: float = 0.0
+    # cProfile of the whole rerun in 'functions' mode
+    profiler: cProfile.Profile = None
+    # Where the report was written, once the rerun has finished
+    report_path: str = None
+
+
+@contextmanager
+def profile_section(name: str):
+    """
+    Time the block as a section of the current rerun's profile.
+
+    The section also labels the block's SQL in the query profile, so both
+    profiles break a rerun down the same way. Costs next to nothing when
+    no rerun is being profiled.
+
+    Args:
+        name: Section name, nested under any enclosing sections
+    """
+    stack = getattr(_profile, 'stack', None)
+    if stack is None:
+        stack = _profile.stack = []
+    stack.append(name)
+    full_name = " / ".join(stack)
+    profile = getattr(_profile, 'current', None)
+    start = time.perf_counter()
+    try:
+        with query_section(full_name):
+            yield
+    finally:
+        if profile is not None:
+            profile.sections.append(SectionTiming(full_name, time.perf_counter() - start))
+        stack.pop()
+
+
+@contextmanager
+def profile_rerun(mode: str, directory: str = PROFILE_DIR):
+    """
+    Profile a rerun and write its report to disk when it ends.
+
+    The report is written even if the rerun is cut short, e.g. by st.rerun().
+
+    Args:
+        mode: One of PROFILE_MODES
+        directory: Directory for the report, created if missing
+
+    Yields:
+        RenderProfile filled in as the rerun runs, or None in 'off' mode
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {mode!r}, expected one of {PROFILE_MODES}")
+    if mode == "off":
+        yield None
+        return
+
+    profile = RenderProfile(mode=mode)
+    if mode == "functions":
+        profile.profiler = cProfile.Profile()
+    _profile.current = profile
+    start = time.perf_counter()
+    if profile.profiler is not None:
+        profile.profiler.enable()
+    try:
+        yield profile
+    finally:
+        if profile.profiler is not None:
+            profile.profiler.disable()
+        profile.total_seconds = time.perf_counter() - start
+        _profile.current = None
+        profile.report_path = write_report(profile, directory)
+
+
+def format_report(profile: RenderProfile) -> str:
+    """
+    Format a rerun's section timings and, if collected, its top functions.
+
+    Args:
+        profile: Finished RenderProfile
+
+    Returns:
+        Plain text report
+    """
+    lines = [
+        f"Rerun profile ({profile.mode}), {datetime.now():%Y-%m-%d %H:%M:%S}",
+        f"Total {profile.total_seconds * 1000:.1f} ms",
+        "",
+        f"{'Section':<48} {'ms':>10}",
+    ]
+    for section in sorted(profile.sections, key=lambda s: s.name):
+        lines.append(f"{section.name:<48} {section.seconds * 1000:>10.1f}")
+
+    if profile.profiler is not None:
+        stream = io.StringIO()
+        stats = pstats.Stats(profile.profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_TOP_FUNCTIONS)
+        lines += ["", f"Top {REPORT_TOP_FUNCTIONS} functions by cumulative time", stream.getvalue()]
+    return "\n".join(lines) + "\n"
+
+
+def write_report(profile: RenderProfile, directory: str) -> str:
+    """
+    Write a rerun's report to a new timestamped file.
+
+    Args:
+        profile: Finished RenderProfile
+        directory: Directory for the report, created if missing
+
+    Returns:
+        Path of the report
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"rerun-{datetime.now():%Y%m%d-%H%M%S-%f}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(format_report(profile))
+    return path
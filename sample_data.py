@@ -1,123 +1,91 @@
+from bulk_load import load_rows, reset_sequences
 from database import get_db_context, init_db
 from models import Player, Track, Prix, Race, RaceResult, KartCombo
+from track_stats import refresh_player_track_stats
 from datetime import datetime
 
 def create_sample_data():
     with get_db_context() as db:
         # Create players
         players = [
-            Player(
-                player_first_name="Mario",
-                player_last_name="Mario",
-                player_nickname="Super Mario"
-            ),
-            Player(
-                player_first_name="Luigi",
-                player_last_name="Mario",
-                player_nickname="Green Mario"
-            ),
-            Player(
-                player_first_name="Princess",
-                player_last_name="Peach",
-                player_nickname="Peach"
-            ),
-            Player(
-                player_first_name="Yoshi",
-                player_last_name="Dinosaur",
-                player_nickname="Yoshi"
-            ),
+            {"player_id": 1, "player_first_name": "Mario", "player_last_name": "Mario", "player_nickname": "Super Mario"},
+            {"player_id": 2, "player_first_name": "Luigi", "player_last_name": "Mario", "player_nickname": "Green Mario"},
+            {"player_id": 3, "player_first_name": "Princess", "player_last_name": "Peach", "player_nickname": "Peach"},
+            {"player_id": 4, "player_first_name": "Yoshi", "player_last_name": "Dinosaur", "player_nickname": "Yoshi"},
         ]
-        db.add_all(players)
+        load_rows(db, Player, players)
 
         # Create tracks with their cups
         tracks = [
-            Track(track_name="Mario Kart Stadium", cup_name="Mushroom Cup"),
-            Track(track_name="Water Park", cup_name="Mushroom Cup"),
-            Track(track_name="Sweet Sweet Canyon", cup_name="Mushroom Cup"),
-            Track(track_name="Thwomp Ruins", cup_name="Mushroom Cup"),
-            Track(track_name="Mario Circuit", cup_name="Flower Cup"),
-            Track(track_name="Toad Harbor", cup_name="Flower Cup"),
-            Track(track_name="Twisted Mansion", cup_name="Flower Cup"),
-            Track(track_name="Shy Guy Falls", cup_name="Flower Cup"),
+            {"track_id": 1, "track_name": "Mario Kart Stadium", "cup_name": "Mushroom Cup"},
+            {"track_id": 2, "track_name": "Water Park", "cup_name": "Mushroom Cup"},
+            {"track_id": 3, "track_name": "Sweet Sweet Canyon", "cup_name": "Mushroom Cup"},
+            {"track_id": 4, "track_name": "Thwomp Ruins", "cup_name": "Mushroom Cup"},
+            {"track_id": 5, "track_name": "Mario Circuit", "cup_name": "Flower Cup"},
+            {"track_id": 6, "track_name": "Toad Harbor", "cup_name": "Flower Cup"},
+            {"track_id": 7, "track_name": "Twisted Mansion", "cup_name": "Flower Cup"},
+            {"track_id": 8, "track_name": "Shy Guy Falls", "cup_name": "Flower Cup"},
         ]
-        db.add_all(tracks)
+        load_rows(db, Track, tracks)
 
         # Create kart combinations
         kart_combos = [
-            KartCombo(
-                character_name="Mario",
-                vehicle_name="Standard Kart",
-                tire_name="Standard",
-                glider_name="Super Glider"
-            ),
-            KartCombo(
-                character_name="Luigi",
-                vehicle_name="Pipe Frame",
-                tire_name="Monster",
-                glider_name="Parafoil"
-            ),
-            KartCombo(
-                character_name="Peach",
-                vehicle_name="Cat Cruiser",
-                tire_name="Roller",
-                glider_name="Flower Glider"
-            ),
-            KartCombo(
-                character_name="Yoshi",
-                vehicle_name="Sport Bike",
-                tire_name="Slick",
-                glider_name="Cloud Glider"
-            ),
+            {"combo_id": 1, "character_name": "Mario", "vehicle_name": "Standard Kart", "tire_name": "Standard", "glider_name": "Super Glider"},
+            {"combo_id": 2, "character_name": "Luigi", "vehicle_name": "Pipe Frame", "tire_name": "Monster", "glider_name": "Parafoil"},
+            {"combo_id": 3, "character_name": "Peach", "vehicle_name": "Cat Cruiser", "tire_name": "Roller", "glider_name": "Flower Glider"},
+            {"combo_id": 4, "character_name": "Yoshi", "vehicle_name": "Sport Bike", "tire_name": "Slick", "glider_name": "Cloud Glider"},
         ]
-        db.add_all(kart_combos)
+        load_rows(db, KartCombo, kart_combos)
 
         # Create a Grand Prix
-        mushroom_cup_prix = Prix(
-            prix_type="grand_prix",
-            cup_name="Mushroom Cup",
-            number_of_players=4,
-            cc_class=150,
-            is_mirror_mode=False,
-            is_teams_mode=False,
-            items_setting="normal",
-            com_level="normal",
-            com_vehicles="all",
-            courses_setting="in_order",
-            race_count=4,
-            date_played=datetime.utcnow()
-        )
-        db.add(mushroom_cup_prix)
-        db.flush()  # Flush to get the prix_id
+        load_rows(db, Prix, [{
+            "prix_id": 1,
+            "prix_type": "grand_prix",
+            "cup_name": "Mushroom Cup",
+            "number_of_players": 4,
+            "cc_class": 150,
+            "is_mirror_mode": False,
+            "is_teams_mode": False,
+            "items_setting": "normal",
+            "com_level": "normal",
+            "com_vehicles": "all",
+            "courses_setting": "in_order",
+            "race_count": 4,
+            "date_played": datetime.utcnow(),
+        }])
 
-        # Create races for the Grand Prix
-        for i, track in enumerate(tracks[:4], 1):  # First 4 tracks (Mushroom Cup)
-            race = Race(
-                prix_id=mushroom_cup_prix.prix_id,
-                track_id=track.track_id,
-                race_number=i
-            )
-            db.add(race)
-            db.flush()  # Flush to get the race_id
+        # Create races for the Grand Prix on the first 4 tracks (Mushroom Cup)
+        races = [
+            {"race_id": i, "prix_id": 1, "track_id": track["track_id"], "race_number": i}
+            for i, track in enumerate(tracks[:4], 1)
+        ]
+        load_rows(db, Race, races)
+
+        # Add race results for each player
+        load_rows(db, RaceResult, (
+            {
+                "race_id": race["race_id"],
+                "player_id": player["player_id"],
+                "combo_id": combo["combo_id"],
+                "finish_position": j,
+                "points_earned": 16 - j  # Simple point calculation
+            }
+            for race in races
+            for j, (player, combo) in enumerate(zip(players, kart_combos), 1)
+        ))
 
-            # Add race results for each player
-            for j, (player, combo) in enumerate(zip(players, kart_combos), 1):
-                result = RaceResult(
-                    race_id=race.race_id,
-                    player_id=player.player_id,
-                    combo_id=combo.combo_id,
-                    finish_position=j,
-                    points_earned=16 - j  # Simple point calculation
-                )
-                db.add(result)
+        # Ids were given explicitly, so move the PostgreSQL sequences past them
+        reset_sequences(db, [Player, Track, KartCombo, Prix, Race])
+        refresh_player_track_stats(db)
 
 def main():
     print("Initializing database...")
     init_db()
-    
+
     print("Creating sample data...")
     create_sample_data()
-    
+
     print("Sample data created successfully!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from itertools import count
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from elo import calculate_elo_adjustments, calculate_elo_adjustments_batch, calculate_elo_adjustments_vectorized
+from scripts.recalculate_elo import replay_elo_ratings
+from scripts.synthetic_history import PLAYER_COUNTS, generate_history
+
+PrixTotal = namedtuple("PrixTotal", ["prix_id", "player_id", "total_points"])
+
+PAGE_SIZE = 20
+
+def measure(name: str, func, repeat: int, **params) -> dict:
+    """Time repeated calls of func.
+
+    Args:
+        name: Benchmark name
+        func: Zero-argument callable to time
+        repeat: Number of timed calls
+        params: Parameters recorded alongside the timings
+
+    Returns:
+        Result dict with min, median and mean call time in milliseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "name": name,
+        "params": params,
+        "repeat": repeat,
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+    }
+
+def prix_totals(history: dict) -> list[PrixTotal]:
+    """Sum each player's points per prix, ordered the way load_prix_totals returns them."""
+    prix_of_race = {race["race_id"]: race["prix_id"] for race in history["races"]}
+    totals = defaultdict(int)
+    for result in history["race_results"]:
+        totals[(prix_of_race[result["race_id"]], result["player_id"])] += result["points_earned"]
+    return sorted(
+        (PrixTotal(prix_id, player_id, total) for (prix_id, player_id), total in totals.items()),
+        key=lambda t: (t.prix_id, -t.total_points, t.player_id)
+    )
+
+def bench_elo_adjustments(repeat: int, seed: int) -> list[dict]:
+    """Time scalar, vectorized and batched ELO adjustments for every prix size."""
+    rng = random.Random(seed)
+    results = []
+    for num_players in [n for n in PLAYER_COUNTS if n > 1]:
+        ratings = {player: rng.randint(1200, 1800) for player in range(num_players)}
+        placements = [(player, player + 1) for player in range(num_players)]
+        rating_array = np.array(list(ratings.values()))
+        position_array = np.arange(1, num_players + 1)
+
+        results.append(measure(
+            "calculate_elo_adjustments",
+            lambda: calculate_elo_adjustments(placements, ratings),
+            repeat, players=num_players
+        ))
+        results.append(measure(
+            "calculate_elo_adjustments_vectorized",
+            lambda: calculate_elo_adjustments_vectorized(rating_array, position_array),
+            repeat, players=num_players
+        ))
+
+    batch_size = 1000
+    max_players = max(PLAYER_COUNTS)
+    batch_ratings = np.array([[rng.randint(1200, 1800) for _ in range(max_players)] for _ in range(batch_size)])
+    batch_positions = np.tile(np.arange(1, max_players + 1), (batch_size, 1))
+    results.append(measure(
+        "calculate_elo_adjustments_batch",
+        lambda: calculate_elo_adjustments_batch(batch_ratings, batch_positions),
+        repeat, prix=batch_size, players=max_players
+    ))
+    return results
+
+def bench_replay(history: dict, repeat: int) -> list[dict]:
+    """Time the in-memory ELO replay used by recalculate_elo.py."""
+    totals = prix_totals(history)
+    ratings = {player["player_id"]: player["elo_rating"] for player in history["players"]}
+    return [measure(
+        "replay_elo_ratings",
+        lambda: replay_elo_ratings(totals, ratings),
+        repeat, prix=len(history["prixs"]), rows=len(totals)
+    )]
+
+def bench_queries(history: dict, repeat: int) -> list[dict]:
+    """Time the dashboard queries and the database-backed replay against the configured database."""
+    import query_cache
+    from database import get_db_context, init_db
+    from scripts.load_fixtures import load_history
+    from scripts.recalculate_elo import load_prix_totals
+
+    init_db()
+    with get_db_context() as db:
+        load_history(db, [history])
+
+    # Cached loaders are keyed by generation, so a fresh one per call always runs the query
+    generations = count(-1, -1)
+    nickname = history["players"][0]["player_nickname"]
+    track_name = history["tracks"][0]["track_name"]
+    prix_page = tuple(prix["prix_id"] for prix in history["prixs"][-PAGE_SIZE:])
+
+    queries = {
+        "load_leaderboard": lambda: query_cache.load_leaderboard(next(generations)),
+        "load_elo_history": lambda: query_cache.load_elo_history(next(generations)),
+        "load_track_stats": lambda: query_cache.load_track_stats(next(generations), track_name),
+        "load_track_distribution": lambda: query_cache.load_track_distribution(next(generations)),
+        "load_player_profile": lambda: query_cache.load_player_profile(next(generations), nickname),
+        "load_player_prix_history": lambda: query_cache.load_player_prix_history(next(generations), nickname, 1, PAGE_SIZE),
+        "load_prix_list": lambda: query_cache.load_prix_list(next(generations), 1, PAGE_SIZE),
+        "load_prix_race_results": lambda: query_cache.load_prix_race_results(next(generations), prix_page),
+    }
+    results = [measure(name, query, repeat, prix=len(history["prixs"])) for name, query in queries.items()]
+
+    def replay_from_database():
+        with get_db_context() as db:
+            replay_elo_ratings(load_prix_totals(db), {p["player_id"]: p["elo_rating"] for p in history["players"]})
+
+    results.append(measure("load_and_replay_elo_ratings", replay_from_database, repeat, prix=len(history["prixs"])))
+    return results
+
+def run_benchmarks(
+    num_players: int = 8,
+    num_prix: int = 1000,
+    races_per_prix: int = None,
+    repeat: int = 20,
+    seed: int = 0,
+    database: bool = False
+) -> dict:
+    """Run the benchmark suite.
+
+    Args:
+        num_players: Players in the synthetic history
+        num_prix: Prix in the synthetic history
+        races_per_prix: Races per prix, or None to vary them
+        repeat: Timed calls per benchmark
+        seed: Random seed for the synthetic history
+        database: Also load the history into the configured database and
+                  time the dashboard queries
+
+    Returns:
+        Report dict ready to be written as JSON
+    """
+    history = generate_history(num_players, num_prix, races_per_prix, seed)
+
+    results = bench_elo_adjustments(repeat, seed) + bench_replay(history, repeat)
+    if database:
+        results += bench_queries(history, repeat)
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "history": {
+            "players": num_players,
+            "prix": num_prix,
+            "races": len(history["races"]),
+            "race_results": len(history["race_results"]),
+            "races_per_prix": races_per_prix,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ELO calculation, replay and dashboard queries.")
+    parser.add_argument("--players", type=int, default=8, help="Players in the synthetic history")
+    parser.add_argument("--prix", type=int, default=1000, help="Prix in the synthetic history")
+    parser.add_argument("--races-per-prix", type=int, help="Races per prix (default: varies)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--database", action="store_true",
+                        help="Also benchmark the dashboard queries; loads the history into the configured (empty) database, e.g. DB_BACKEND=sqlite DB_SQLITE_PATH=:memory:")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    try:
+        report = run_benchmarks(args.players, args.prix, args.races_per_prix, args.repeat, args.seed, args.database)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import sys
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db
+from models import Prix, Race, RaceResult, PrixResult
+from sqlalchemy import text
+
+# Secondary indexes declared on the tables the dashboard joins and filters on,
+# as (table name, index name)
+QUERY_INDEXES = [
+    (model.__tablename__, index.name)
+    for model in (Prix, Race, RaceResult, PrixResult)
+    for index in model.__table__.indexes
+]
+
+# Representative dashboard queries, one per access path
+BENCHMARK_QUERIES = {
+    "player race stats": """
+        SELECT count(*), sum(CASE WHEN finish_position = 1 THEN 1 ELSE 0 END), avg(points_earned)
+        FROM race_results
+        WHERE player_id = :player_id
+    """,
+    "player prix history": """
+        SELECT p.prix_id, p.date_played, pr.placement, pr.ending_elo
+        FROM prix_results pr
+        JOIN prixs p ON p.prix_id = pr.prix_id
+        WHERE pr.player_id = :player_id
+        ORDER BY p.date_played DESC
+        LIMIT 20
+    """,
+    "history page results": """
+        SELECT r.prix_id, r.race_number, rr.player_id, rr.finish_position, rr.points_earned
+        FROM races r
+        JOIN race_results rr ON rr.race_id = r.race_id
+        WHERE r.prix_id IN (SELECT prix_id FROM prixs ORDER BY date_played DESC LIMIT 20)
+    """,
+    "track stats": """
+        SELECT rr.player_id, count(*), avg(rr.points_earned)
+        FROM races r
+        JOIN race_results rr ON rr.race_id = r.race_id
+        WHERE r.track_id = :track_id
+        GROUP BY rr.player_id
+    """,
+    "kart combo usage": """
+        SELECT count(*)
+        FROM race_results
+        WHERE combo_id = :combo_id
+    """,
+}
+
+# Copies of the existing history, offset past the current primary keys
+SCALE_STATEMENTS = [
+    """
+    INSERT INTO prixs (prix_id, prix_type, cup_name, number_of_players, cc_class, is_mirror_mode,
+                       is_teams_mode, items_setting, com_level, com_vehicles, courses_setting,
+                       race_count, date_played)
+    SELECT prix_id + copy * :max_prix_id, prix_type, cup_name, number_of_players, cc_class,
+           is_mirror_mode, is_teams_mode, items_setting, com_level, com_vehicles, courses_setting,
+           race_count, date_played - copy * interval '1 day'
+    FROM prixs, generate_series(1, :copies) AS copy
+    """,
+    """
+    INSERT INTO races (race_id, prix_id, track_id, race_number)
+    SELECT race_id + copy * :max_race_id, prix_id + copy * :max_prix_id, track_id, race_number
+    FROM races, generate_series(1, :copies) AS copy
+    """,
+    """
+    INSERT INTO race_results (result_id, race_id, player_id, combo_id, finish_position, points_earned)
+    SELECT result_id + copy * :max_race_result_id, race_id + copy * :max_race_id, player_id,
+           combo_id, finish_position, points_earned
+    FROM race_results, generate_series(1, :copies) AS copy
+    """,
+    """
+    INSERT INTO prix_results (result_id, prix_id, player_id, placement, starting_elo,
+                              elo_adjustment, ending_elo)
+    SELECT result_id + copy * :max_prix_result_id, prix_id + copy * :max_prix_id, player_id,
+           placement, starting_elo, elo_adjustment, ending_elo
+    FROM prix_results, generate_series(1, :copies) AS copy
+    """,
+]
+
+def scale_history(db, copies: int):
+    """Grow the history tables by inserting copies of the existing rows.
+
+    Args:
+        db: Session whose transaction will be rolled back afterwards
+        copies: Number of copies of the history to add
+    """
+    max_ids = db.execute(text("""
+        SELECT (SELECT coalesce(max(prix_id), 0) FROM prixs) AS max_prix_id,
+               (SELECT coalesce(max(race_id), 0) FROM races) AS max_race_id,
+               (SELECT coalesce(max(result_id), 0) FROM race_results) AS max_race_result_id,
+               (SELECT coalesce(max(result_id), 0) FROM prix_results) AS max_prix_result_id
+    """)).mappings().one()
+    for statement in SCALE_STATEMENTS:
+        db.execute(text(statement), {"copies": copies, **max_ids})
+
+def benchmark_parameters(db) -> dict:
+    """Pick the most common player, track and kart combo to query for."""
+    return {
+        "player_id": db.execute(text(
+            "SELECT player_id FROM race_results GROUP BY player_id ORDER BY count(*) DESC LIMIT 1"
+        )).scalar(),
+        "track_id": db.execute(text(
+            "SELECT track_id FROM races GROUP BY track_id ORDER BY count(*) DESC LIMIT 1"
+        )).scalar(),
+        "combo_id": db.execute(text(
+            "SELECT combo_id FROM race_results GROUP BY combo_id ORDER BY count(*) DESC LIMIT 1"
+        )).scalar(),
+    }
+
+def plan_scans(plan: dict) -> list[str]:
+    """List the scan nodes of an EXPLAIN plan, e.g. 'Index Scan on races'."""
+    scans = []
+    if "Scan" in plan["Node Type"] and "Relation Name" in plan:
+        scan = f"{plan['Node Type']} on {plan['Relation Name']}"
+        if "Index Name" in plan:
+            scan += f" using {plan['Index Name']}"
+        scans.append(scan)
+    for child in plan.get("Plans", []):
+        scans.extend(plan_scans(child))
+    return scans
+
+def explain_queries(db, params: dict) -> dict:
+    """Run EXPLAIN ANALYZE on every benchmark query.
+
+    Returns:
+        Dict mapping query name to its execution time in ms and scan nodes
+    """
+    results = {}
+    for name, query in BENCHMARK_QUERIES.items():
+        explained = db.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}"), params).scalar()
+        results[name] = {
+            "execution_ms": round(explained[0]["Execution Time"], 3),
+            "scans": plan_scans(explained[0]["Plan"]),
+        }
+    return results
+
+def drop_index(db, table_name: str, index_name: str):
+    """Drop an index, or the unique constraint it belongs to.
+
+    Databases built from tables/*.sql declare the unique indexes as named
+    constraints, which can't be dropped with DROP INDEX. A missing index is
+    an error, so a renamed index can't quietly stay in the "before" plans.
+
+    Raises:
+        ValueError: If the table has no index of that name
+    """
+    constraint = db.execute(text("""
+        SELECT 1 FROM pg_constraint
+        WHERE conname = :index_name AND conrelid = CAST(:table_name AS regclass)
+    """), {"table_name": table_name, "index_name": index_name}).scalar()
+    if constraint:
+        db.execute(text(f"ALTER TABLE {table_name} DROP CONSTRAINT {index_name}"))
+        return
+    exists = db.execute(text(
+        "SELECT 1 FROM pg_indexes WHERE tablename = :table_name AND indexname = :index_name"
+    ), {"table_name": table_name, "index_name": index_name}).scalar()
+    if not exists:
+        raise ValueError(f"Index {index_name} not found on {table_name}; is the schema up to date?")
+    db.execute(text(f"DROP INDEX {index_name}"))
+
+def explain_without_indexes(db, params: dict) -> dict:
+    """Run explain_queries with the secondary indexes dropped.
+
+    The indexes are dropped inside a savepoint and restored by rolling it back.
+    """
+    savepoint = db.begin_nested()
+    try:
+        for table_name, index_name in QUERY_INDEXES:
+            drop_index(db, table_name, index_name)
+        return explain_queries(db, params)
+    finally:
+        savepoint.rollback()
+
+def run_benchmark(copies: int = 0) -> dict:
+    """Compare query plans with and without the secondary indexes.
+
+    Everything runs in a single transaction that is rolled back, so the
+    scaled-up rows and the dropped indexes never become visible. Dropping
+    an index locks its table until then, so run this against a copy of the
+    database or while the dashboard is idle.
+
+    Args:
+        copies: Number of copies of the history to add before measuring
+
+    Returns:
+        Dict with 'before' (no indexes) and 'after' (indexes) results
+    """
+    db = get_db()
+    try:
+        if copies:
+            scale_history(db, copies)
+        db.execute(text("ANALYZE prixs, races, race_results, prix_results"))
+        params = benchmark_parameters(db)
+
+        # Run every query both ways once first, so neither measured run pays
+        # for reading the tables and indexes into the cache
+        explain_without_indexes(db, params)
+        explain_queries(db, params)
+
+        before = explain_without_indexes(db, params)
+        after = explain_queries(db, params)
+    finally:
+        db.rollback()
+        db.close()
+
+    return {"copies": copies, "parameters": params, "before": before, "after": after}
+
+def print_report(report: dict):
+    """Print a before/after comparison of every benchmark query."""
+    print(f"History copies added: {report['copies']}")
+    for name in BENCHMARK_QUERIES:
+        before = report["before"][name]
+        after = report["after"][name]
+        print(f"\n{name}: {before['execution_ms']} ms -> {after['execution_ms']} ms")
+        print(f"  before: {', '.join(before['scans'])}")
+        print(f"  after:  {', '.join(after['scans'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dashboard query plans with and without indexes.")
+    parser.add_argument("--copies", type=int, default=0,
+                        help="Copies of the history to add first, to see plans as tables grow")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.copies)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
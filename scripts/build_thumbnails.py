@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_assets import THUMBNAIL_DIR, build_thumbnails
+
+if __name__ == "__main__":
+    count = build_thumbnails()
+    print(f"Built thumbnails for {count} images in {THUMBNAIL_DIR}")
@@ -8,7 +8,9 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from models import Prix, Race, RaceResult, PrixResult
-from database import get_db_context
+from database import get_db_context, bump_cache_generation
+from leaderboard import refresh_leaderboard
+from track_stats import refresh_player_track_stats
 
 def delete_prix(prix_id: int) -> bool:
     """
@@ -55,6 +57,11 @@ def delete_prix(prix_id: int) -> bool:
             
             # Finally delete the prix
             db.query(Prix).filter(Prix.prix_id == prix_id).delete()
+
+            # Drop the deleted prix from the leaderboard snapshot and track stats
+            refresh_leaderboard(db)
+            refresh_player_track_stats(db)
+            bump_cache_generation(db)
             
             # Commit the transaction
             db.commit()
@@ -1,35 +1,129 @@
+import hashlib
+import json
 import os
-import requests
-from urllib.parse import urlparse
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-def download_image(url, save_path):
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_assets import IMAGE_DIR
+
+MAX_WORKERS = 8
+REQUEST_TIMEOUT = 15
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+MANIFEST_NAME = "manifest.json"
+
+def create_session(max_workers=MAX_WORKERS, max_retries=MAX_RETRIES, backoff_factor=RETRY_BACKOFF):
+    """
+    Create an HTTP session shared by all download threads
+    
+    Connections are pooled per host and failed requests (connection errors
+    and 429/5xx responses) are retried with exponential backoff.
+    
+    Args:
+        max_workers (int): Number of threads that will share the session
+        max_retries (int): Retries per request
+        backoff_factor (float): Base delay in seconds between retries
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def file_sha256(path):
+    """Get the hex SHA-256 digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_path):
+    """Load the manifest of previous downloads, or an empty one"""
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_manifest(manifest, manifest_path):
+    """Write the manifest atomically so an interrupted run never corrupts it"""
+    partial = Path(f"{manifest_path}.tmp")
+    partial.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    partial.replace(manifest_path)
+
+def download_image(session, url, save_path, entry=None):
     """
     Download an image from a URL and save it to the specified path
     
+    A file that is already present and matches its manifest entry is
+    fetched conditionally (ETag / Last-Modified), or skipped outright when
+    the server gave no validators.
+    
     Args:
+        session (requests.Session): Session from create_session
         url (str): URL of the image to download
-        save_path (str): Path where the image should be saved
+        save_path (Path): Path where the image should be saved
+        entry (dict): Manifest entry from the previous download, if any
+    
+    Returns:
+        tuple: ("downloaded" | "unchanged", manifest entry)
     """
-    try:
-        response = requests.get(url, stream=True)
+    headers = {}
+    if entry and entry.get("url") == url and save_path.exists() and file_sha256(save_path) == entry.get("sha256"):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        if not headers:
+            return "unchanged", entry
+
+    with session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        if response.status_code == 304:
+            return "unchanged", entry
         response.raise_for_status()  # Raise an exception for bad status codes
-        
+
         # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        
-        # Save the image
-        with open(save_path, 'wb') as f:
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Save the image next to its final path, then swap it in
+        digest = hashlib.sha256()
+        partial = save_path.with_name(f"{save_path.name}.part")
+        with open(partial, "wb") as f:
             for chunk in response.iter_content(chunk_size=8192):
+                digest.update(chunk)
                 f.write(chunk)
-        
-        print(f"Successfully downloaded: {save_path}")
-    except Exception as e:
-        print(f"Error downloading {url}: {str(e)}")
+        partial.replace(save_path)
+
+        return "downloaded", {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": digest.hexdigest(),
+            "size": save_path.stat().st_size,
+        }
 
-def download_images(url_dict):
+def download_images(url_dict, base_path=IMAGE_DIR, manifest_path=None, max_workers=MAX_WORKERS, session=None):
     """
-    Download images from a dictionary of URLs
+    Download images from a dictionary of URLs concurrently
+    
+    Progress is recorded in a manifest after every file, so an interrupted
+    run resumes where it left off and a repeat run only re-fetches images
+    that changed on the server.
     
     Args:
         url_dict (dict): Dictionary with categories as keys and lists of (filename, url) tuples as values
@@ -38,13 +132,45 @@ def download_images(url_dict):
                 'vehicles': [('standard_kart.png', 'http://example.com/kart.png'), ...],
                 ...
             }
-    """
-    base_path = Path("../images")
+        base_path (Path): Directory the category folders are created in
+        manifest_path (Path): Manifest file, defaults to manifest.json in base_path
+        max_workers (int): Number of concurrent downloads
+        session (requests.Session): Session to use, defaults to create_session()
     
-    for category, images in url_dict.items():
-        for filename, url in images:
-            save_path = base_path / category / filename
-            download_image(url, str(save_path))
+    Returns:
+        dict: Counts of "downloaded", "unchanged" and "failed" images
+    """
+    base_path = Path(base_path)
+    manifest_path = Path(manifest_path or base_path / MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    session = session or create_session(max_workers)
+    summary = {"downloaded": 0, "unchanged": 0, "failed": 0}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for category, images in url_dict.items():
+            for filename, url in images:
+                key = f"{category}/{filename}"
+                future = executor.submit(download_image, session, url, base_path / category / filename, manifest.get(key))
+                futures[future] = (key, url)
+
+        for future in as_completed(futures):
+            key, url = futures[future]
+            try:
+                status, entry = future.result()
+            except Exception as e:
+                print(f"Error downloading {url}: {str(e)}")
+                summary["failed"] += 1
+                continue
+
+            summary[status] += 1
+            if status == "downloaded":
+                manifest[key] = entry
+                save_manifest(manifest, manifest_path)
+                print(f"Successfully downloaded: {key}")
+
+    print(f"Downloaded {summary['downloaded']}, unchanged {summary['unchanged']}, failed {summary['failed']}")
+    return summary
 
 if __name__ == "__main__":
     images_to_download = {
@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+import time
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_load import deferred_constraints, load_rows, reset_sequences
+from database import get_db_context, init_db, bump_cache_generation
+from leaderboard import refresh_leaderboard
+from models import Base, Player, Prix, PrixResult
+from sql_compat import bulk_update
+from track_stats import refresh_player_track_stats
+from scripts.recalculate_elo import load_prix_totals, replay_elo_ratings
+from scripts.synthetic_history import HISTORY_TABLES, iter_history
+
+def load_history(db, chunks, score: bool = True) -> dict[str, int]:
+    """Bulk load a history into an empty database.
+
+    Chunks are loaded one at a time with bulk_load.load_rows, so a history
+    streamed from iter_history never has to fit in memory. Foreign keys and
+    secondary indexes are checked and built once at the end.
+
+    Args:
+        db: Database session; everything is loaded in its transaction
+        chunks: Iterable of dicts mapping table name to rows, as yielded by
+                iter_history. A whole generate_history dict is a single chunk.
+        score: Also replay ELO ratings into prix_results and players, so
+               the dashboard shows the history as if it had been played
+
+    Returns:
+        Dict mapping table name to number of rows loaded
+
+    Raises:
+        ValueError: If the database already has prix
+    """
+    if db.query(Prix).first() is not None:
+        raise ValueError("The configured database already has prix; point DB_NAME (or DB_SQLITE_PATH) at an empty database")
+
+    counts = dict.fromkeys(HISTORY_TABLES, 0)
+    tables = [Base.metadata.tables[table] for table in HISTORY_TABLES]
+    with deferred_constraints(db, tables):
+        for chunk in chunks:
+            for table in tables:
+                if table.name in chunk:
+                    counts[table.name] += load_rows(db, table, chunk[table.name])
+
+    if score:
+        ratings = dict(db.query(Player.player_id, Player.elo_rating).all())
+        prix_result_rows, final_ratings = replay_elo_ratings(load_prix_totals(db), ratings)
+        counts["prix_results"] = load_rows(db, PrixResult, prix_result_rows)
+        bulk_update(db, Player.player_id, Player.elo_rating, final_ratings)
+
+    reset_sequences(db, [Base.metadata.tables[table] for table in counts])
+    refresh_player_track_stats(db)
+    refresh_leaderboard(db)
+    bump_cache_generation(db)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a large synthetic prix history into the configured (empty) database.")
+    parser.add_argument("--players", type=int, default=8, help="Players in the history")
+    parser.add_argument("--prix", type=int, default=10000, help="Prix in the history")
+    parser.add_argument("--races-per-prix", type=int, help="Races per prix (default: varies)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Prix generated and loaded at a time")
+    parser.add_argument("--no-elo", action="store_true", help="Skip replaying ELO ratings into prix_results")
+    args = parser.parse_args()
+
+    init_db()
+    start = time.perf_counter()
+    try:
+        with get_db_context() as db:
+            counts = load_history(
+                db,
+                iter_history(args.players, args.prix, args.races_per_prix, args.seed, args.chunk_size),
+                score=not args.no_elo
+            )
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    print(f"Loaded {sum(counts.values())} rows in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
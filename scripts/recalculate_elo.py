@@ -1,145 +1,219 @@
+import argparse
 import os
 import sys
 from datetime import datetime
+from itertools import groupby
 
 # Add the project root directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db_context
+from database import get_db_context, bump_cache_generation
 from models import Player, Prix, Race, RaceResult, PrixResult
-from sqlalchemy import func
-from elo import calculate_elo_adjustments, apply_elo_adjustments
+from sqlalchemy import and_, func, desc, not_, or_
+from leaderboard import refresh_leaderboard
+from prix_finalization import score_prix, write_elo_ratings
 
-DEFAULT_ELO = 1500
+STREAM_BATCH_SIZE = 1000
 
-def reset_elo_ratings(player_ratings: dict[str, int] = None):
-    """Reset players' ELO ratings to specified values.
+def prix_start_filter(db, from_prix_id: int = None, from_date: datetime = None):
+    """Build a filter selecting the prix at or after a starting point.
+    
+    Prix are ordered by (date_played, prix_id), the same order they are
+    replayed in.
     
     Args:
-        player_ratings: Dict mapping player nicknames to their new ratings.
-                       If None, resets all players to DEFAULT_ELO.
+        from_prix_id: Replay this prix and every prix after it
+        from_date: Replay every prix played on or after this date
+    
+    Returns:
+        SQLAlchemy filter expression, or None to replay the full history
     """
-    with get_db_context() as db:
-        if player_ratings is None:
-            # Reset all players to default
-            db.query(Player).update({"elo_rating": DEFAULT_ELO})
-            print(f"Reset all players to {DEFAULT_ELO} ELO")
-        else:
-            # Update each player's rating individually
-            for nickname, rating in player_ratings.items():
-                player = db.query(Player).filter(Player.player_nickname == nickname).first()
-                if player:
-                    player.elo_rating = rating
-                    print(f"Reset {nickname} to {rating} ELO")
-                else:
-                    print(f"Warning: Player {nickname} not found")
-        db.commit()
-
-def recalculate_elo_ratings():
-    """Recalculate ELO ratings by processing all prix in chronological order."""
-    with get_db_context() as db:
-        # Get all prix ordered by date
-        prix_list = (
-            db.query(Prix)
-            .order_by(Prix.date_played)
-            .all()
+    if from_prix_id is not None:
+        start = db.query(Prix.date_played).filter(Prix.prix_id == from_prix_id).scalar()
+        if start is None:
+            raise ValueError(f"No prix found with ID {from_prix_id}")
+        return or_(
+            Prix.date_played > start,
+            and_(Prix.date_played == start, Prix.prix_id >= from_prix_id)
         )
+    if from_date is not None:
+        return Prix.date_played >= from_date
+    return None
 
-        print(f"Found {len(prix_list)} prix to process")
-
-        for prix in prix_list:
-            print(f"\nProcessing prix {prix.prix_id} from {prix.date_played}")
-
-            # Get prix results
-            prix_results = (
-                db.query(
-                    Player.player_nickname,
-                    Player.elo_rating,
-                    func.sum(RaceResult.points_earned).label('total_points')
-                )
-                .join(RaceResult, Player.player_id == RaceResult.player_id)
-                .join(Race, RaceResult.race_id == Race.race_id)
-                .filter(Race.prix_id == prix.prix_id)
-                .group_by(Player.player_nickname, Player.elo_rating)
-                .all()
+def load_seed_ratings(db, start_filter) -> dict[int, int]:
+    """Get each player's rating going into the first replayed prix.
+    
+    This is the stored ending_elo of the player's last prix before the
+    starting point. Players whose first prix is inside the replayed range
+    start from that prix's stored starting_elo.
+    
+    Returns:
+        Dict mapping player_id to seed rating
+    """
+    def ranked_results(elo_column, in_range, order_by):
+        return (
+            db.query(
+                PrixResult.player_id,
+                elo_column.label('elo'),
+                func.row_number().over(
+                    partition_by=PrixResult.player_id,
+                    order_by=order_by
+                ).label('row_number')
             )
+            .join(Prix, Prix.prix_id == PrixResult.prix_id)
+            .filter(start_filter if in_range else not_(start_filter))
+            .subquery()
+        )
+
+    first_in_range = ranked_results(
+        PrixResult.starting_elo, True, (Prix.date_played, Prix.prix_id)
+    )
+    last_before = ranked_results(
+        PrixResult.ending_elo, False, (Prix.date_played.desc(), Prix.prix_id.desc())
+    )
+
+    seeds = {}
+    for ranked in (first_in_range, last_before):
+        seeds.update(
+            (row.player_id, row.elo)
+            for row in db.query(ranked.c.player_id, ranked.c.elo).filter(ranked.c.row_number == 1)
+        )
+    return seeds
 
-            if not prix_results:
-                print(f"No results found for prix {prix.prix_id}, skipping...")
+def load_prix_totals(db, start_filter=None):
+    """Stream every player's total points per prix in chronological order.
+    
+    One aggregate query over race_results joined to races and prixs,
+    fetched in batches of STREAM_BATCH_SIZE rows.
+    
+    Args:
+        start_filter: Optional filter from prix_start_filter restricting the
+                      replay to a suffix of the history
+    """
+    query = (
+        db.query(
+            Prix.prix_id,
+            RaceResult.player_id,
+            func.sum(RaceResult.points_earned).label('total_points')
+        )
+        .join(Race, Race.prix_id == Prix.prix_id)
+        .join(RaceResult, RaceResult.race_id == Race.race_id)
+        .group_by(Prix.prix_id, Prix.date_played, RaceResult.player_id)
+        .order_by(Prix.date_played, Prix.prix_id, desc('total_points'), RaceResult.player_id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    if start_filter is not None:
+        query = query.filter(start_filter)
+    return query
+
+def replay_elo_ratings(prix_totals, ratings: dict[int, int]) -> tuple[list[dict], dict[int, int]]:
+    """Replay ELO ratings over prix totals entirely in memory.
+    
+    Args:
+        prix_totals: Rows with prix_id, player_id and total_points, grouped
+                     by prix and ordered chronologically
+        ratings: Dict mapping player_id to the rating before the first prix
+    
+    Returns:
+        Tuple of (prix_results rows, final ratings by player_id)
+    """
+    ratings = dict(ratings)
+    prix_result_rows = []
+
+    for prix_id, rows in groupby(prix_totals, key=lambda r: r.prix_id):
+        rows, new_ratings = score_prix(
+            prix_id, [(r.player_id, r.total_points) for r in rows], ratings
+        )
+        prix_result_rows.extend(rows)
+        ratings.update(new_ratings)
+
+    return prix_result_rows, ratings
+
+def recalculate_elo_ratings(
+    initial_ratings: dict[str, int] = None,
+    from_prix_id: int = None,
+    from_date: datetime = None
+):
+    """Recalculate ELO ratings by replaying prix in chronological order.
+    
+    Race results are read with a single streaming query, every prix is
+    scored in memory, and all prix_results rows and final player ratings
+    are written back in one transaction.
+    
+    When from_prix_id or from_date is given only that suffix of the history
+    is replayed, seeded from the ratings stored in prix_results for the
+    prix before it.
+    
+    Args:
+        initial_ratings: Dict mapping player nicknames to their rating before
+                         the first replayed prix. Players not listed start
+                         from their current (or seeded) rating.
+        from_prix_id: Replay starting at this prix
+        from_date: Replay starting at the first prix played on or after this date
+    """
+    with get_db_context() as db:
+        players = db.query(Player.player_id, Player.player_nickname, Player.elo_rating).all()
+        nicknames = {p.player_id: p.player_nickname for p in players}
+        player_ids = {p.player_nickname: p.player_id for p in players}
+        ratings = {p.player_id: p.elo_rating for p in players}
+
+        start_filter = prix_start_filter(db, from_prix_id, from_date)
+        if start_filter is not None:
+            ratings.update(load_seed_ratings(db, start_filter))
+
+        for nickname, rating in (initial_ratings or {}).items():
+            if nickname not in player_ids:
+                print(f"Warning: Player {nickname} not found")
                 continue
+            ratings[player_ids[nickname]] = rating
 
-            # Calculate placements
-            sorted_results = sorted(
-                prix_results,
-                key=lambda x: x.total_points,
-                reverse=True
-            )
+        prix_result_rows, final_ratings = replay_elo_ratings(
+            load_prix_totals(db, start_filter), ratings
+        )
 
-            # Create placements list and current ratings dict
-            placements = []
-            current_ratings = {}
-            current_placement = 1
-            current_points = sorted_results[0].total_points
-
-            for result in sorted_results:
-                if result.total_points < current_points:
-                    current_points = result.total_points
-                    current_placement = len(placements) + 1
-
-                placements.append((result.player_nickname, current_placement))
-                current_ratings[result.player_nickname] = result.elo_rating
-
-            # Calculate and apply ELO adjustments
-            elo_adjustments = calculate_elo_adjustments(placements, current_ratings)
-            new_ratings = apply_elo_adjustments(current_ratings, elo_adjustments)
-
-            # Update database with new ratings
-            for player_nickname, new_rating in new_ratings.items():
-                db.query(Player).filter(
-                    Player.player_nickname == player_nickname
-                ).update({"elo_rating": new_rating})
-
-            # After calculating new ratings, store the prix results
-            for player_nickname, placement in placements:
-                player = db.query(Player).filter(Player.player_nickname == player_nickname).first()
-                
-                # Create or update prix result
-                prix_result = (
-                    db.query(PrixResult)
-                    .filter(
-                        PrixResult.prix_id == prix.prix_id,
-                        PrixResult.player_id == player.player_id
-                    )
-                    .first()
-                )
-                
-                if not prix_result:
-                    prix_result = PrixResult(
-                        prix_id=prix.prix_id,
-                        player_id=player.player_id
-                    )
-                    db.add(prix_result)
-                
-                prix_result.placement = placement
-                prix_result.starting_elo = current_ratings[player_nickname]
-                prix_result.elo_adjustment = elo_adjustments[player_nickname]
-                prix_result.ending_elo = new_ratings[player_nickname]
-            
-            db.commit()
-
-            # Print results for this prix
-            print(f"Prix {prix.prix_id} results:")
-            for player_nickname, placement in placements:
-                adjustment = elo_adjustments[player_nickname]
-                new_rating = new_ratings[player_nickname]
-                print(f"  {player_nickname}: {placement}th place, "
-                      f"ELO {current_ratings[player_nickname]} → {new_rating} "
+        if start_filter is not None:
+            # Players who sat out the replayed prix keep their stored rating
+            replayed_players = {row["player_id"] for row in prix_result_rows}
+            final_ratings = {
+                player_id: rating
+                for player_id, rating in final_ratings.items()
+                if player_id in replayed_players
+            }
+
+        print(f"Processed {len({row['prix_id'] for row in prix_result_rows})} prix")
+
+        # Print results for each prix
+        for prix_id, rows in groupby(prix_result_rows, key=lambda r: r["prix_id"]):
+            print(f"Prix {prix_id} results:")
+            for row in rows:
+                adjustment = row["elo_adjustment"]
+                print(f"  {nicknames[row['player_id']]}: {row['placement']}th place, "
+                      f"ELO {row['starting_elo']} → {row['ending_elo']} "
                       f"({'+'if adjustment > 0 else ''}{adjustment})")
 
+        write_elo_ratings(db, prix_result_rows, final_ratings)
+        refresh_leaderboard(db)
+        bump_cache_generation(db)
+
         print("\nELO recalculation complete!")
 
 def main():
     """Main function to run the ELO recalculation."""
+    parser = argparse.ArgumentParser(description="Recalculate ELO ratings from prix history")
+    start = parser.add_mutually_exclusive_group()
+    start.add_argument("--from-prix", type=int, help="Only replay this prix and the prix after it")
+    start.add_argument(
+        "--from-date",
+        type=datetime.fromisoformat,
+        help="Only replay prix played on or after this date (YYYY-MM-DD)"
+    )
+    args = parser.parse_args()
+
+    if args.from_prix is not None or args.from_date is not None:
+        print("Starting incremental ELO rating recalculation...")
+        recalculate_elo_ratings(from_prix_id=args.from_prix, from_date=args.from_date)
+        return
+
     print("Starting ELO rating recalculation...")
     
     # Get all players from database
@@ -166,11 +240,8 @@ def main():
         print("Aborted.")
         return
 
-    # Reset ratings to custom values
-    reset_elo_ratings(initial_ratings)
-    
-    # Recalculate ratings
-    recalculate_elo_ratings()
+    # Recalculate ratings from the custom starting values
+    recalculate_elo_ratings(initial_ratings)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,193 @@
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, select, text
+from bulk_load import copy_from_csv, copy_to_csv, deferred_constraints, load_rows, reset_sequences
+from database import get_db_context, init_db, bump_cache_generation
+from models import Base
+
+MANIFEST_NAME = "manifest.json"
+NULL = r"\N"
+STREAM_BATCH_SIZE = 10000
+# Fastest gzip level; level 9 writes ~25% smaller files at ~14x the CPU time
+COMPRESS_LEVEL = 1
+
+# Per-process state rather than data; restoring bumps it instead
+EXCLUDED_TABLES = {"cache_generation"}
+
+def snapshot_tables() -> list:
+    """Get the tables a snapshot holds, parents before children."""
+    return [table for table in Base.metadata.sorted_tables if table.name not in EXCLUDED_TABLES]
+
+def schema_revision(db) -> str:
+    """Get the database's Alembic revision, or None if it isn't managed by Alembic."""
+    if not inspect(db.connection()).has_table("alembic_version"):
+        return None
+    return db.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+def _format_value(value):
+    if value is None:
+        return NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return value
+
+def _parse_value(column, value: str):
+    if value == NULL:
+        return None
+    python_type = column.type.python_type
+    if python_type is bool:
+        return value in ("t", "true", "True", "1")
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+def export_snapshot(db, directory: str) -> dict:
+    """Dump every table to a gzipped CSV file plus a manifest.
+
+    PostgreSQL streams each table out with COPY; other databases are read
+    in batches. Either way the files use the same format, so a snapshot
+    taken on one backend restores on the other.
+
+    Args:
+        db: Database session
+        directory: Directory to write the snapshot to; created if missing
+
+    Returns:
+        The manifest written to directory/manifest.json
+    """
+    os.makedirs(directory, exist_ok=True)
+    use_copy = db.get_bind().dialect.name == "postgresql"
+    manifest = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "schema_revision": schema_revision(db),
+        "tables": {},
+    }
+
+    for table in snapshot_tables():
+        file_name = f"{table.name}.csv.gz"
+        with gzip.open(os.path.join(directory, file_name), "wt", compresslevel=COMPRESS_LEVEL, newline="") as f:
+            if use_copy:
+                rows = copy_to_csv(db, table, f)
+            else:
+                writer = csv.writer(f)
+                writer.writerow(column.name for column in table.columns)
+                result = db.execute(
+                    select(table).order_by(*table.primary_key.columns)
+                    .execution_options(yield_per=STREAM_BATCH_SIZE)
+                )
+                rows = 0
+                for row in result:
+                    writer.writerow(_format_value(value) for value in row)
+                    rows += 1
+        manifest["tables"][table.name] = {"file": file_name, "rows": rows}
+
+    with open(os.path.join(directory, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def import_snapshot(db, directory: str, replace: bool = False) -> dict[str, int]:
+    """Restore a snapshot written by export_snapshot.
+
+    Tables are loaded parents first with COPY on PostgreSQL and batched
+    inserts elsewhere, with foreign key checks and secondary indexes
+    deferred until everything is in (see bulk_load.deferred_constraints).
+
+    Args:
+        db: Database session; the restore happens in its transaction
+        directory: Snapshot directory
+        replace: Delete existing rows first instead of refusing to restore
+                 into a database that has data
+
+    Returns:
+        Dict mapping table name to number of rows restored
+
+    Raises:
+        ValueError: If the snapshot is from another schema revision or has
+                    columns the tables don't, or if the database has data
+                    and replace is False
+    """
+    with open(os.path.join(directory, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+
+    revision = schema_revision(db)
+    if manifest["schema_revision"] and revision and manifest["schema_revision"] != revision:
+        raise ValueError(
+            f"Snapshot was taken at schema revision {manifest['schema_revision']} "
+            f"but the database is at {revision}; run the migrations first"
+        )
+
+    use_copy = db.get_bind().dialect.name == "postgresql"
+    tables = [table for table in snapshot_tables() if table.name in manifest["tables"]]
+    if replace and use_copy:
+        db.execute(text(f"TRUNCATE {', '.join(table.name for table in tables)}"))
+    elif replace:
+        for table in reversed(tables):
+            db.execute(table.delete())
+    elif any(db.execute(select(table).limit(1)).first() for table in tables):
+        raise ValueError("The configured database already has data; pass --replace to overwrite it")
+
+    counts = {}
+    with deferred_constraints(db, tables):
+        for table in tables:
+            path = os.path.join(directory, manifest["tables"][table.name]["file"])
+            with gzip.open(path, "rt", newline="") as f:
+                columns = next(csv.reader([f.readline()]))
+                unknown = set(columns) - set(table.columns.keys())
+                if unknown:
+                    raise ValueError(f"{path} has columns not in {table.name}: {', '.join(sorted(unknown))}")
+
+                if use_copy:
+                    counts[table.name] = copy_from_csv(db, table, columns, f)
+                else:
+                    counts[table.name] = load_rows(db, table, (
+                        {name: _parse_value(table.c[name], value) for name, value in zip(columns, row)}
+                        for row in csv.reader(f)
+                    ))
+
+    reset_sequences(db, [table for table in tables if len(table.primary_key.columns) == 1])
+    if use_copy:
+        for table in tables:
+            db.execute(text(f"ANALYZE {table.name}"))
+    bump_cache_generation(db)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or restore a snapshot of every table as gzipped CSV files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write a snapshot of the configured database")
+    export_parser.add_argument("directory", help="Directory to write the snapshot to")
+    import_parser = commands.add_parser("import", help="Restore a snapshot into the configured database")
+    import_parser.add_argument("directory", help="Snapshot directory")
+    import_parser.add_argument("--replace", action="store_true", help="Delete existing rows before restoring")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "export":
+        with get_db_context() as db:
+            counts = {name: info["rows"] for name, info in export_snapshot(db, args.directory)["tables"].items()}
+    else:
+        init_db()
+        try:
+            with get_db_context() as db:
+                counts = import_snapshot(db, args.directory, args.replace)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    print(f"{args.command.capitalize()}ed {sum(counts.values())} rows in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import os
+import random
+import re
+import sys
+from datetime import datetime, timedelta
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import CheckConstraint
+from models import Prix
+
+START_DATE = datetime(2024, 1, 1, 19, 0)
+NUM_TRACKS = 48
+RACE_POSITIONS = range(1, 13)
+
+# Real kart parts, so the dashboard finds an image for every combo
+CHARACTERS = ["Mario", "Luigi", "Peach", "Daisy", "Yoshi", "Toad", "Bowser", "Wario"]
+VEHICLES = ["Standard Kart", "Pipe Frame", "Mach 8", "Biddybuggy"]
+
+def column_domain(column) -> list[int]:
+    """Get the allowed values of an integer column from its "IN (...)" check constraint.
+
+    Args:
+        column: Table column with a check constraint such as "race_count IN (4, 6, 8)"
+
+    Returns:
+        Sorted list of allowed values
+    """
+    for constraint in column.constraints:
+        if isinstance(constraint, CheckConstraint):
+            match = re.search(r"IN \(([^)]*)\)", str(constraint.sqltext))
+            if match:
+                return sorted(int(value) for value in match.group(1).split(","))
+    raise ValueError(f"No IN (...) check constraint on {column}")
+
+RACE_COUNTS = column_domain(Prix.__table__.c.race_count)
+PLAYER_COUNTS = column_domain(Prix.__table__.c.number_of_players)
+
+def points_for_position(position: int) -> int:
+    """Get the points awarded for a finish position, as in the race form."""
+    return 15 if position == 1 else (
+        12 if position == 2 else (
+            10 if position == 3 else (13 - position)
+        )
+    )
+
+# Tables in an order that respects their foreign keys
+HISTORY_TABLES = ["players", "kart_combos", "tracks", "prixs", "races", "race_results"]
+
+def iter_history(
+    num_players: int = 8,
+    num_prix: int = 200,
+    races_per_prix: int = None,
+    seed: int = 0,
+    chunk_size: int = 1000
+):
+    """Generate a random but valid prix history in chunks.
+
+    Prix sizes and race counts are drawn from the domains allowed by
+    models.Prix, so the rows load into any schema created from the models.
+    The first chunk holds the players, kart_combos and tracks; each later
+    chunk holds up to chunk_size prix with their races and race_results,
+    so histories with millions of race results never sit in memory at once.
+
+    Args:
+        num_players: Number of players in the pool
+        num_prix: Number of prix to generate
+        races_per_prix: Races in every prix, or None to draw from RACE_COUNTS
+        seed: Random seed, so runs are reproducible
+        chunk_size: Prix per chunk
+
+    Yields:
+        Dicts mapping table name to rows. Loading the chunks in order, and
+        each chunk's tables in HISTORY_TABLES order, never breaks a foreign key.
+    """
+    if races_per_prix is not None and races_per_prix not in RACE_COUNTS:
+        raise ValueError(f"races_per_prix must be one of {RACE_COUNTS}")
+    player_counts = [count for count in PLAYER_COUNTS if 1 < count <= num_players]
+    if not player_counts:
+        raise ValueError("num_players must be at least 2")
+
+    rng = random.Random(seed)
+    yield {
+        "players": [
+            {
+                "player_id": player_id,
+                "player_first_name": f"Player{player_id}",
+                "player_last_name": "Synthetic",
+                "player_nickname": f"player{player_id}",
+                "elo_rating": 1500,
+            }
+            for player_id in range(1, num_players + 1)
+        ],
+        "kart_combos": [
+            {
+                "combo_id": player_id,
+                "character_name": CHARACTERS[(player_id - 1) % len(CHARACTERS)],
+                "vehicle_name": VEHICLES[(player_id - 1) // len(CHARACTERS) % len(VEHICLES)],
+                "tire_name": "Standard",
+                "glider_name": "Super Glider",
+            }
+            for player_id in range(1, num_players + 1)
+        ],
+        "tracks": [
+            {"track_id": track_id, "track_name": f"Track {track_id}", "cup_name": f"Cup {(track_id - 1) // 4 + 1}"}
+            for track_id in range(1, NUM_TRACKS + 1)
+        ],
+    }
+
+    race_id = 0
+    result_id = 0
+    chunk = {"prixs": [], "races": [], "race_results": []}
+    for prix_id in range(1, num_prix + 1):
+        players = rng.sample(range(1, num_players + 1), rng.choice(player_counts))
+        race_count = races_per_prix or rng.choice(RACE_COUNTS)
+        chunk["prixs"].append({
+            "prix_id": prix_id,
+            "prix_type": "vs_race",
+            "number_of_players": len(players),
+            "cc_class": 150,
+            "items_setting": "normal",
+            "com_level": "hard",
+            "com_vehicles": "all",
+            "courses_setting": "random",
+            "race_count": race_count,
+            "date_played": START_DATE + timedelta(hours=12 * prix_id),
+        })
+
+        for race_number in range(1, race_count + 1):
+            race_id += 1
+            chunk["races"].append({
+                "race_id": race_id,
+                "prix_id": prix_id,
+                "track_id": rng.randint(1, NUM_TRACKS),
+                "race_number": race_number,
+            })
+            positions = rng.sample(RACE_POSITIONS, len(players))
+            for player_id, position in zip(players, positions):
+                result_id += 1
+                chunk["race_results"].append({
+                    "result_id": result_id,
+                    "race_id": race_id,
+                    "player_id": player_id,
+                    "combo_id": player_id,
+                    "finish_position": position,
+                    "points_earned": points_for_position(position),
+                })
+
+        if len(chunk["prixs"]) == chunk_size:
+            yield chunk
+            chunk = {"prixs": [], "races": [], "race_results": []}
+
+    if chunk["prixs"]:
+        yield chunk
+
+def generate_history(
+    num_players: int = 8,
+    num_prix: int = 200,
+    races_per_prix: int = None,
+    seed: int = 0
+) -> dict[str, list[dict]]:
+    """Generate a random but valid prix history in memory.
+
+    Args:
+        num_players: Number of players in the pool
+        num_prix: Number of prix to generate
+        races_per_prix: Races in every prix, or None to draw from RACE_COUNTS
+        seed: Random seed, so runs are reproducible
+
+    Returns:
+        Dict mapping table name to rows, in insertion order, for every
+        table in HISTORY_TABLES
+    """
+    history = {table: [] for table in HISTORY_TABLES}
+    for chunk in iter_history(num_players, num_prix, races_per_prix, seed):
+        for table, rows in chunk.items():
+            history[table].extend(rows)
+    return history
@@ -4,8 +4,9 @@ import sys
 # Add the project root directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db_context
+from database import get_db_context, bump_cache_generation
 from models import Race, Track, RaceResult
+from track_stats import refresh_player_track_stats
 
 def update_race_tracks():
     """Update specific races with correct track IDs."""
@@ -40,6 +41,8 @@ def update_race_tracks():
         else:
             print(f"Race {race_id} not found")
 
+        refresh_player_track_stats(db)
+        bump_cache_generation(db)
         db.commit()
         print("\nUpdate complete!")
 
@@ -48,6 +51,8 @@ def update_race_results():
 
         race: RaceResult = db.query(RaceResult).filter(RaceResult.result_id==173).first()
         race.points_earned = 10
+        refresh_player_track_stats(db)
+        bump_cache_generation(db)
         db.commit()
         return
         races: list[RaceResult] = db.query(RaceResult).order_by(RaceResult.created_at.asc()).all()
@@ -67,6 +72,8 @@ def update_race():
         race = db.query(Race).filter(Race.race_id == 81).first()
         race.track_id = 136
 
+        refresh_player_track_stats(db)
+        bump_cache_generation(db)
         db.commit()
         return
         print(race.race_id)
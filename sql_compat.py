@@ -0,0 +1,83 @@
+from sqlalchemy import String, case, column, update, values
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class string_agg(FunctionElement):
+    """
+    Concatenate a column's values with a separator.
+
+    Compiles to string_agg on PostgreSQL and group_concat on SQLite, e.g.
+    string_agg(Player.player_nickname, ' and ').
+    """
+    type = String()
+    name = 'string_agg'
+    inherit_cache = True
+
+
+@compiles(string_agg)
+def _compile_string_agg(element, compiler, **kw):
+    return f"string_agg({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(string_agg, 'sqlite')
+def _compile_group_concat(element, compiler, **kw):
+    return f"group_concat({compiler.process(element.clauses, **kw)})"
+
+
+def upsert(db: Session, model):
+    """
+    Start an INSERT for model that supports on_conflict_do_update.
+
+    Use index_elements rather than a constraint name in the ON CONFLICT
+    clause; SQLite only understands the former.
+
+    Args:
+        db: Database session, used to pick the dialect
+        model: Mapped class to insert into
+
+    Returns:
+        Dialect-specific Insert construct
+    """
+    if db.get_bind().dialect.name == 'sqlite':
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def bulk_update(db: Session, key_column, value_column, data: dict) -> None:
+    """
+    Set value_column for many rows in one UPDATE statement.
+
+    PostgreSQL joins against UPDATE ... FROM (VALUES ...); other databases
+    (SQLite can't alias VALUES columns) get an equivalent CASE expression.
+
+    Args:
+        db: Database session
+        key_column: Mapped key column, e.g. Player.player_id
+        value_column: Mapped column to set, e.g. Player.elo_rating
+        data: Dict mapping key to new value
+    """
+    if not data:
+        return
+
+    table = key_column.class_
+    if db.get_bind().dialect.name == 'postgresql':
+        new_values = values(
+            column(key_column.key, key_column.type),
+            column(value_column.key, value_column.type),
+            name='new_values'
+        ).data(list(data.items()))
+        stmt = (
+            update(table)
+            .where(key_column == new_values.c[key_column.key])
+            .values({value_column: new_values.c[value_column.key]})
+        )
+    else:
+        stmt = (
+            update(table)
+            .where(key_column.in_(list(data)))
+            .values({value_column: case(data, value=key_column)})
+        )
+    db.execute(stmt.execution_options(synchronize_session=False))
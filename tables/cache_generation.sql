@@ -0,0 +1,8 @@
+-- Create cache_generation table holding the counter that invalidates the app's query cache
+CREATE TABLE cache_generation (
+    generation_id INTEGER PRIMARY KEY,
+    generation INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO cache_generation (generation_id, generation) VALUES (1, 0);
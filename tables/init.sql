@@ -1,7 +1,10 @@
 -- Main initialization file that creates tables in the correct order
 \i tables/prixs.sql
-\i tables/players.sql
 \i tables/kart_combos.sql
+\i tables/players.sql
 \i tables/tracks.sql
 \i tables/races.sql
-\i tables/race_results.sql 
\ No newline at end of file
+\i tables/race_results.sql 
+\i tables/leaderboard.sql
+\i tables/cache_generation.sql
+\i tables/player_track_stats.sql
\ No newline at end of file
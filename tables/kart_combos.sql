@@ -5,5 +5,6 @@ CREATE TABLE kart_combos (
     vehicle_name VARCHAR(50) NOT NULL,
     tire_name VARCHAR(50) NOT NULL,
     glider_name VARCHAR(50) NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_kart_combo UNIQUE(character_name, vehicle_name, tire_name, glider_name)
 ); 
\ No newline at end of file
@@ -0,0 +1,13 @@
+-- Create leaderboard table to store a per-player snapshot of the Home tab standings
+CREATE TABLE leaderboard (
+    player_id INTEGER PRIMARY KEY REFERENCES players(player_id),
+    player_nickname VARCHAR(50) NOT NULL,
+    elo_rating INTEGER NOT NULL,
+    total_races INTEGER NOT NULL DEFAULT 0,
+    races_won INTEGER NOT NULL DEFAULT 0,
+    total_prixs INTEGER NOT NULL DEFAULT 0,
+    prixs_won INTEGER NOT NULL DEFAULT 0,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX ix_leaderboard_elo_rating ON leaderboard (elo_rating);
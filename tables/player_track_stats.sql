@@ -0,0 +1,12 @@
+-- Create player_track_stats table to store per-player, per-track race totals
+CREATE TABLE player_track_stats (
+    player_id INTEGER REFERENCES players(player_id),
+    track_id INTEGER REFERENCES tracks(track_id),
+    races INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    points_sum INTEGER NOT NULL DEFAULT 0,
+    position_sum INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (player_id, track_id)
+);
+
+CREATE INDEX ix_player_track_stats_track_id ON player_track_stats (track_id);
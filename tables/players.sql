@@ -5,5 +5,7 @@ CREATE TABLE players (
     player_last_name VARCHAR(50) NOT NULL,
     player_nickname VARCHAR(50) NOT NULL UNIQUE,
     elo_rating INTEGER NOT NULL DEFAULT 1500,
+    last_combo_id INTEGER REFERENCES kart_combos(combo_id),
+    last_played_at TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
\ No newline at end of file
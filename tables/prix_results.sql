@@ -8,5 +8,7 @@ CREATE TABLE prix_results (
     elo_adjustment INTEGER NOT NULL,
     ending_elo INTEGER NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(prix_id, player_id)
-); 
\ No newline at end of file
+    CONSTRAINT uq_prix_player UNIQUE (prix_id, player_id)
+);
+
+CREATE INDEX ix_prix_results_player_id_prix_id ON prix_results (player_id, prix_id);
@@ -13,4 +13,6 @@ CREATE TABLE prixs (
     courses_setting VARCHAR(10) NOT NULL CHECK (courses_setting IN ('choose', 'random', 'in_order')),
     race_count INTEGER NOT NULL CHECK (race_count IN (4, 6, 8, 12, 16, 24, 32, 48)),
     date_played TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-); 
\ No newline at end of file
+);
+
+CREATE INDEX ix_prixs_date_played ON prixs (date_played);
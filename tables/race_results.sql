@@ -7,6 +7,9 @@ CREATE TABLE race_results (
     finish_position INTEGER NOT NULL CHECK (finish_position BETWEEN 1 AND 12),
     points_earned INTEGER NOT NULL CHECK (points_earned BETWEEN 1 AND 15),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(race_id, player_id),
+    CONSTRAINT uq_race_player UNIQUE (race_id, player_id) INCLUDE (finish_position, points_earned),
     UNIQUE(race_id, finish_position)
-); 
\ No newline at end of file
+);
+
+CREATE INDEX ix_race_results_player_id_race_id ON race_results (player_id, race_id) INCLUDE (finish_position, points_earned, combo_id);
+CREATE INDEX ix_race_results_combo_id ON race_results (combo_id);
@@ -5,5 +5,7 @@ CREATE TABLE races (
     track_id INTEGER REFERENCES tracks(track_id),
     race_number INTEGER NOT NULL CHECK (race_number > 0),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(prix_id, race_number)
-); 
\ No newline at end of file
+    CONSTRAINT uq_prix_race_number UNIQUE (prix_id, race_number) INCLUDE (track_id)
+);
+
+CREATE INDEX ix_races_track_id ON races (track_id);
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from config import DatabaseConfig
+from database import create_db_engine
+from models import Base
+from scripts.synthetic_history import HISTORY_TABLES, generate_history
+
+@pytest.fixture
+def sqlite_db():
+    """Session on a fresh in-memory SQLite database with the full schema."""
+    engine = create_db_engine(DatabaseConfig(backend='sqlite', sqlite_path=':memory:'))
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+@pytest.fixture
+def sqlite_history(sqlite_db):
+    """Load a synthetic history into sqlite_db.
+    
+    Call it with generate_history's arguments; it returns the generated rows.
+    """
+    def load(**kwargs):
+        history = generate_history(**kwargs)
+        for table in HISTORY_TABLES:
+            sqlite_db.execute(insert(Base.metadata.tables[table]), history[table])
+        sqlite_db.commit()
+        return history
+    return load
@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+
+import catalog
+from image_assets import IMAGE_TYPES
+from models import Track
+
+def test_lookups_cover_every_cup_and_part():
+    assert len(catalog.TRACK_CUPS) == sum(len(tracks) for tracks in catalog.CUPS.values())
+    assert catalog.TRACK_CUPS["Mario Kart Stadium"] == "Mushroom Cup"
+    assert set(catalog.KART_PARTS) == set(IMAGE_TYPES)
+    for part_type, names in catalog.KART_PARTS.items():
+        assert len(set(names)) == len(names)
+        assert [catalog.KART_PART_INDEX[part_type][name] for name in names] == list(range(len(names)))
+
+def test_tracks_load_once_per_process(sqlite_db, monkeypatch):
+    queries = []
+
+    @contextmanager
+    def db_context():
+        queries.append(1)
+        yield sqlite_db
+
+    monkeypatch.setattr(catalog, "get_db_context", db_context)
+    monkeypatch.setattr(catalog, "_tracks", None)
+
+    # An empty tracks table isn't cached
+    assert catalog.get_tracks().ids == {}
+    for cup_name, tracks in catalog.CUPS.items():
+        sqlite_db.add_all(Track(track_name=track_name, cup_name=cup_name) for track_name in tracks)
+    sqlite_db.commit()
+
+    tracks = catalog.get_tracks()
+    assert catalog.get_tracks() is tracks
+    assert len(queries) == 2
+    assert set(tracks.ids) == set(catalog.TRACK_CUPS)
+    assert all(tracks.names[track_id] == name for name, track_id in tracks.ids.items())
+    assert tracks.sorted_names == sorted(catalog.TRACK_CUPS)
+
+    assert catalog.reload_tracks() is not tracks
+    assert len(queries) == 3
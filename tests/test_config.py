@@ -0,0 +1,12 @@
+from config import DatabaseConfig
+
+def test_engine_options_include_pool_settings():
+    options = DatabaseConfig(pool_size=3, max_overflow=2, pool_recycle=60).engine_options
+    assert options['pool_size'] == 3
+    assert options['max_overflow'] == 2
+    assert options['pool_recycle'] == 60
+    assert options['pool_pre_ping'] is True
+
+def test_statement_timeout_not_applied_to_every_connection():
+    # Scripts share the engine and run statements longer than the app's cap
+    assert 'connect_args' not in DatabaseConfig(statement_timeout_ms=5000).engine_options
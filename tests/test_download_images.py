@@ -0,0 +1,103 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from scripts.download_images import create_session, download_images
+
+IMAGES = {
+    "/mario.png": (b"mario-image", '"mario-v1"'),
+    "/kart.png": (b"kart-image", '"kart-v1"'),
+}
+
+class ImageHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+    failures_left = {}
+
+    def do_GET(self):
+        self.requests_seen.append(self.path)
+        if self.failures_left.get(self.path, 0) > 0:
+            self.failures_left[self.path] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.path not in IMAGES:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body, etag = IMAGES[self.path]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    ImageHandler.requests_seen = []
+    ImageHandler.failures_left = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def url_dict(base_url):
+    return {
+        "characters": [("mario.png", f"{base_url}/mario.png")],
+        "vehicles": [("standard_kart.png", f"{base_url}/kart.png")],
+    }
+
+def test_downloads_and_records_manifest(server, tmp_path):
+    summary = download_images(url_dict(server), base_path=tmp_path)
+
+    assert summary == {"downloaded": 2, "unchanged": 0, "failed": 0}
+    assert (tmp_path / "characters" / "mario.png").read_bytes() == b"mario-image"
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert manifest["vehicles/standard_kart.png"]["etag"] == '"kart-v1"'
+
+def test_repeat_run_uses_conditional_requests(server, tmp_path):
+    download_images(url_dict(server), base_path=tmp_path)
+
+    summary = download_images(url_dict(server), base_path=tmp_path)
+
+    assert summary == {"downloaded": 0, "unchanged": 2, "failed": 0}
+    assert len(ImageHandler.requests_seen) == 4
+
+def test_modified_local_file_is_fetched_again(server, tmp_path):
+    download_images(url_dict(server), base_path=tmp_path)
+    (tmp_path / "characters" / "mario.png").write_bytes(b"corrupted")
+
+    summary = download_images(url_dict(server), base_path=tmp_path)
+
+    assert summary == {"downloaded": 1, "unchanged": 1, "failed": 0}
+    assert (tmp_path / "characters" / "mario.png").read_bytes() == b"mario-image"
+
+def test_retries_server_errors(server, tmp_path):
+    ImageHandler.failures_left = {"/mario.png": 2}
+    session = create_session(max_workers=2, backoff_factor=0)
+
+    summary = download_images(url_dict(server), base_path=tmp_path, session=session)
+
+    assert summary["downloaded"] == 2
+    assert ImageHandler.requests_seen.count("/mario.png") == 3
+
+def test_failed_download_is_reported(server, tmp_path):
+    urls = {"characters": [("missing.png", f"{server}/missing.png")]}
+
+    summary = download_images(urls, base_path=tmp_path)
+
+    assert summary == {"downloaded": 0, "unchanged": 0, "failed": 1}
+    assert not (tmp_path / "characters" / "missing.png").exists()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,5 +1,13 @@
+import numpy as np
 import pytest
-from elo import calculate_elo_adjustments, apply_elo_adjustments, get_rating_change_description
+from elo import (
+    calculate_elo_adjustments,
+    apply_elo_adjustments,
+    get_rating_change_description,
+    calculate_elo_adjustments_vectorized,
+    calculate_elo_adjustments_batch,
+    apply_elo_adjustments_vectorized,
+)
 
 def test_basic_elo_calculation():
     # Test basic scenario with 3 players
@@ -110,5 +118,62 @@ def test_large_field():
     assert adjustments["P1"] > adjustments["P8"]
     assert abs(sum(adjustments.values())) <= 1
 
+def test_vectorized_matches_scalar():
+    # Random fields, including ties, must round to exactly the same integers
+    rng = np.random.default_rng(42)
+    for _ in range(500):
+        num_players = int(rng.integers(2, 13))
+        ratings = rng.integers(800, 2200, size=num_players)
+        positions = rng.integers(1, num_players + 1, size=num_players)
+        names = [f"P{i}" for i in range(num_players)]
+
+        expected = calculate_elo_adjustments(
+            list(zip(names, positions.tolist())),
+            dict(zip(names, ratings.tolist()))
+        )
+        adjustments = calculate_elo_adjustments_vectorized(ratings, positions)
+
+        assert adjustments.tolist() == [expected[name] for name in names]
+
+def test_batch_with_padding():
+    # Two prix of different sizes scored in one call
+    ratings = np.array([
+        [1500, 1600, 1400, 0],
+        [1800, 1200, 0, 0],
+    ])
+    positions = np.array([
+        [1, 2, 3, 0],
+        [2, 1, 0, 0],
+    ])
+    mask = np.array([
+        [True, True, True, False],
+        [True, True, False, False],
+    ])
+
+    adjustments = calculate_elo_adjustments_batch(ratings, positions, mask)
+
+    first = calculate_elo_adjustments(
+        [("A", 1), ("B", 2), ("C", 3)], {"A": 1500, "B": 1600, "C": 1400}
+    )
+    second = calculate_elo_adjustments(
+        [("A", 2), ("B", 1)], {"A": 1800, "B": 1200}
+    )
+    assert adjustments[0].tolist() == [first["A"], first["B"], first["C"], 0]
+    assert adjustments[1].tolist() == [second["A"], second["B"], 0, 0]
+
+def test_batch_single_player_prix():
+    adjustments = calculate_elo_adjustments_batch(
+        np.array([[1500, 0]]), np.array([[1, 0]]), np.array([[True, False]])
+    )
+
+    assert adjustments.tolist() == [[0, 0]]
+
+def test_apply_adjustments_vectorized():
+    new_ratings = apply_elo_adjustments_vectorized(
+        np.array([50, 1400]), np.array([-100, 15]), min_rating=0
+    )
+
+    assert new_ratings.tolist() == [0, 1415]
+
 if __name__ == "__main__":
     pytest.main([__file__]) 
\ No newline at end of file
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+from PIL import Image
+
+import image_assets
+
+@pytest.fixture
+def image_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_assets, "IMAGE_DIR", tmp_path / "images")
+    monkeypatch.setattr(image_assets, "THUMBNAIL_DIR", tmp_path / "images" / "thumbnails")
+    image_assets._thumbnail_bytes.cache_clear()
+    (tmp_path / "images" / "characters").mkdir(parents=True)
+    Image.new("RGBA", (60, 30), "red").save(tmp_path / "images" / "characters" / "baby_mario.png")
+    yield tmp_path / "images"
+    image_assets._thumbnail_bytes.cache_clear()
+
+def test_thumbnail_resized_to_height(image_dir):
+    data = image_assets.get_thumbnail("Baby Mario", "characters", height=50)
+
+    with Image.open(image_assets.io.BytesIO(data)) as img:
+        assert img.format == "WEBP"
+        assert img.size == (100, 50)
+    assert len(list((image_dir / "thumbnails" / "characters").glob("*.webp"))) == 1
+
+def test_thumbnail_served_without_decoding(image_dir, monkeypatch):
+    first = image_assets.get_thumbnail("Baby Mario", "characters")
+
+    # Neither the in-memory nor the on-disk cache needs the source decoded again
+    monkeypatch.setattr(image_assets, "render_thumbnail", pytest.fail)
+    assert image_assets.get_thumbnail("Baby Mario", "characters") == first
+    image_assets._thumbnail_bytes.cache_clear()
+    assert image_assets.get_thumbnail("Baby Mario", "characters") == first
+
+def test_changed_source_regenerates_thumbnail(image_dir):
+    source = image_dir / "characters" / "baby_mario.png"
+    first = image_assets.get_thumbnail("Baby Mario", "characters")
+
+    Image.new("RGBA", (30, 30), "blue").save(source)
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert image_assets.get_thumbnail("Baby Mario", "characters") != first
+
+if __name__ == "__main__":
+    pytest.main([__file__])
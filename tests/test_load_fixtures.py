@@ -0,0 +1,48 @@
+import pytest
+from bulk_load import load_rows
+from leaderboard import get_leaderboard
+from models import Player, PrixResult, RaceResult, Track
+from prix_finalization import finalize_prix
+from scripts.load_fixtures import load_history
+from scripts.synthetic_history import iter_history
+
+def test_load_rows_streams_batches_and_fills_defaults(sqlite_db):
+    rows = ({"track_id": i, "track_name": f"Track {i}", "cup_name": "Cup"} for i in range(1, 26))
+
+    assert load_rows(sqlite_db, Track, rows, batch_size=10) == 25
+    assert sqlite_db.query(Track).count() == 25
+    assert sqlite_db.query(Track).filter(Track.created_at.is_(None)).count() == 0
+    assert load_rows(sqlite_db, Track, []) == 0
+
+def test_load_history_scores_like_finalizing_each_prix(sqlite_db):
+    counts = load_history(sqlite_db, iter_history(num_players=4, num_prix=12, seed=7, chunk_size=5))
+    sqlite_db.commit()
+
+    assert counts["prixs"] == 12
+    assert counts["race_results"] == sqlite_db.query(RaceResult).count()
+    loaded = [
+        (r.prix_id, r.player_id, r.placement, r.starting_elo, r.ending_elo)
+        for r in sqlite_db.query(PrixResult).order_by(PrixResult.prix_id, PrixResult.player_id)
+    ]
+    ratings = dict(sqlite_db.query(Player.player_id, Player.elo_rating))
+    assert len(get_leaderboard(sqlite_db)) == 4
+
+    # Finalizing the prix one by one from scratch gives the same results
+    sqlite_db.query(PrixResult).delete()
+    sqlite_db.query(Player).update({"elo_rating": 1500})
+    for prix_id in range(1, 13):
+        finalize_prix(sqlite_db, prix_id, refresh=False)
+    assert loaded == [
+        (r.prix_id, r.player_id, r.placement, r.starting_elo, r.ending_elo)
+        for r in sqlite_db.query(PrixResult).order_by(PrixResult.prix_id, PrixResult.player_id)
+    ]
+    assert ratings == dict(sqlite_db.query(Player.player_id, Player.elo_rating))
+
+def test_load_history_refuses_a_database_with_prix(sqlite_db):
+    load_history(sqlite_db, iter_history(num_players=3, num_prix=2))
+
+    with pytest.raises(ValueError, match="already has prix"):
+        load_history(sqlite_db, iter_history(num_players=3, num_prix=2))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,23 @@
+import pytest
+from elo import calculate_elo_adjustments
+from prix_finalization import score_prix
+
+def test_score_prix_rows_follow_placements():
+    ratings = {1: 1500, 2: 1550, 3: 1450, 4: 1600}
+
+    rows, new_ratings = score_prix(7, [(1, 40), (2, 55), (3, 40)], ratings)
+
+    adjustments = calculate_elo_adjustments([(2, 1), (1, 2), (3, 2)], ratings)
+    assert [(row["player_id"], row["placement"]) for row in rows] == [(2, 1), (1, 2), (3, 2)]
+    assert all(row["prix_id"] == 7 for row in rows)
+    assert rows[1]["starting_elo"] == 1500
+    assert rows[1]["elo_adjustment"] == adjustments[1]
+    assert rows[1]["ending_elo"] == 1500 + adjustments[1]
+    # Only the prix's players get a new rating
+    assert new_ratings == {player_id: ratings[player_id] + adjustments[player_id] for player_id in (1, 2, 3)}
+
+def test_score_prix_without_results():
+    assert score_prix(7, [], {1: 1500}) == ([], {})
+
+if __name__ == "__main__":
+    pytest.main([__file__])
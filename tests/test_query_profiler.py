@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from config import DatabaseConfig
+from database import create_db_engine, fingerprint, profile_queries, query_section
+
+# Counts to 200k in SQLite, slow enough to cross a 1 ms threshold
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 200000) "
+    "SELECT count(*) FROM n"
+)
+
+def test_fingerprint_ignores_parameters_and_literals():
+    assert fingerprint("SELECT * FROM t WHERE a = %(a_1)s AND b IN (%(b_1_1)s, %(b_1_2)s)") == (
+        fingerprint("SELECT *\n  FROM t WHERE a = 'x' AND b IN (1, 2, 3)")
+    )
+    assert fingerprint("SELECT anon_1.col FROM t LIMIT 10") == "SELECT anon_1.col FROM t LIMIT ?"
+
+def test_profile_records_statements_by_section():
+    engine = create_db_engine(DatabaseConfig(backend='sqlite', sqlite_path=':memory:', profile_queries=True))
+    with engine.connect() as conn, profile_queries() as queries:
+        with query_section("Home"):
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        conn.execute(text("SELECT 3"))
+    # Nothing is recorded outside profile_queries()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 4"))
+    engine.dispose()
+
+    assert [(q.fingerprint, q.section) for q in queries] == [
+        ("SELECT ?", "Home"), ("SELECT ?", "Home"), ("SELECT ?", None)
+    ]
+    assert all(q.duration_ms >= 0 for q in queries)
+
+def test_slow_queries_log_their_plan(caplog):
+    engine = create_db_engine(DatabaseConfig(backend='sqlite', sqlite_path=':memory:', slow_query_ms=1))
+    with caplog.at_level(logging.WARNING, logger="database"), engine.connect() as conn:
+        with query_section("Home"):
+            assert conn.execute(SLOW_QUERY).scalar() == 200000
+        conn.execute(text("SELECT 1"))
+    engine.dispose()
+
+    [record] = caplog.records
+    assert "Slow query" in record.getMessage()
+    assert "section Home" in record.getMessage()
+    assert "SCAN n" in record.getMessage()
+
+def test_failed_statements_leave_no_state_on_the_connection():
+    engine = create_db_engine(DatabaseConfig(backend='sqlite', sqlite_path=':memory:', profile_queries=True))
+    with engine.connect() as conn, profile_queries() as queries:
+        info_before = dict(conn.info)
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info == info_before
+    engine.dispose()
+
+    assert [q.fingerprint for q in queries] == ["SELECT ?"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from race_prediction import TrackMatrix, load_track_matrix, predict_race
+from track_stats import refresh_player_track_stats
+
+def matrix(ratings, races, points):
+    return TrackMatrix(
+        players=[f"p{i}" for i in range(len(ratings))],
+        ratings=np.array(ratings, dtype=float),
+        track_index={"Track A": 0, "Track B": 1},
+        races=np.array(races, dtype=float),
+        points=np.array(points, dtype=float),
+    )
+
+def test_two_players_without_track_history_follow_elo():
+    predictions = predict_race(matrix([1600, 1400], [[0, 0], [0, 0]], [[0, 0], [0, 0]]), "Track A")
+
+    expected = 1 / (1 + 10 ** ((1400 - 1600) / 400))
+    assert predictions[0].win_probability == pytest.approx(expected)
+    assert predictions[0].expected_rank == pytest.approx(2 - expected)
+    assert predictions[0].track_avg_points is None
+
+def test_track_history_shifts_the_prediction():
+    # Equal ratings and overall averages, but p0 is better on Track A and worse on Track B
+    races = [[10, 10], [10, 10], [10, 10]]
+    points = [[120, 80], [80, 120], [100, 100]]
+    m = matrix([1500, 1500, 1500], races, points)
+
+    on_a = predict_race(m, "Track A")
+    on_b = predict_race(m, "Track B")
+    assert on_a[0].win_probability > on_a[2].win_probability > on_a[1].win_probability
+    assert on_b[0].win_probability < on_b[2].win_probability < on_b[1].win_probability
+    assert on_a[0].track_avg_points == 12
+
+    for predictions in (on_a, on_b, predict_race(m, "Unraced Track")):
+        assert sum(p.win_probability for p in predictions) == pytest.approx(1)
+        assert sum(p.expected_rank for p in predictions) == pytest.approx(6)
+
+def test_load_track_matrix(sqlite_db, sqlite_history):
+    history = sqlite_history(num_players=4, num_prix=6, seed=13)
+    refresh_player_track_stats(sqlite_db)
+
+    m = load_track_matrix(sqlite_db, ["player2", "player1"])
+
+    assert m.players == ["player2", "player1"]
+    assert list(m.ratings) == [1500, 1500]
+    player1_points = sum(
+        result["points_earned"] for result in history["race_results"] if result["player_id"] == 1
+    )
+    assert m.points[1].sum() == player1_points
+    assert m.races.shape == (2, len(m.track_index))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,121 @@
+from collections import namedtuple
+from contextlib import contextmanager
+
+import pytest
+import scripts.recalculate_elo as recalculate_elo
+from elo import calculate_elo_adjustments
+from models import Player, Prix, PrixResult, Race, RaceResult
+from prix_finalization import calculate_placements
+from scripts.recalculate_elo import recalculate_elo_ratings, replay_elo_ratings
+
+PrixTotal = namedtuple("PrixTotal", ["prix_id", "player_id", "total_points"])
+
+def test_placements_share_ties():
+    placements = calculate_placements([("A", 30), ("B", 45), ("C", 30), ("D", 12)])
+
+    assert placements == [("B", 1), ("A", 2), ("C", 2), ("D", 4)]
+
+def test_replay_chains_ratings_between_prix():
+    prix_totals = [
+        PrixTotal(1, 1, 60), PrixTotal(1, 2, 40), PrixTotal(1, 3, 20),
+        PrixTotal(2, 2, 50), PrixTotal(2, 3, 30),
+    ]
+    ratings = {1: 1500, 2: 1500, 3: 1500}
+
+    rows, final_ratings = replay_elo_ratings(prix_totals, ratings)
+
+    first = calculate_elo_adjustments([(1, 1), (2, 2), (3, 3)], ratings)
+    after_first = {player_id: ratings[player_id] + first[player_id] for player_id in ratings}
+    second = calculate_elo_adjustments(
+        [(2, 1), (3, 2)], {2: after_first[2], 3: after_first[3]}
+    )
+
+    assert len(rows) == 5
+    assert rows[3] == {
+        "prix_id": 2,
+        "player_id": 2,
+        "placement": 1,
+        "starting_elo": after_first[2],
+        "elo_adjustment": second[2],
+        "ending_elo": after_first[2] + second[2],
+    }
+    assert final_ratings == {
+        1: after_first[1],
+        2: after_first[2] + second[2],
+        3: after_first[3] + second[3],
+    }
+    # The caller's starting ratings are left untouched
+    assert ratings == {1: 1500, 2: 1500, 3: 1500}
+
+def stored_elo(db):
+    results = [
+        (r.prix_id, r.player_id, r.placement, r.starting_elo, r.elo_adjustment, r.ending_elo)
+        for r in db.query(PrixResult).order_by(PrixResult.prix_id, PrixResult.player_id)
+    ]
+    return results, dict(db.query(Player.player_id, Player.elo_rating))
+
+def delete_results(db, player_id, prix_filter):
+    race_ids = [race_id for (race_id,) in db.query(Race.race_id).join(Prix).filter(prix_filter)]
+    db.query(RaceResult).filter(
+        RaceResult.player_id == player_id, RaceResult.race_id.in_(race_ids)
+    ).delete(synchronize_session=False)
+
+@pytest.mark.parametrize("start", ["from_prix_id", "from_date"])
+def test_incremental_replay_matches_full_replay(sqlite_db, sqlite_history, monkeypatch, start):
+    @contextmanager
+    def db_context():
+        yield sqlite_db
+        sqlite_db.commit()
+
+    monkeypatch.setattr(recalculate_elo, "get_db_context", db_context)
+    sqlite_history(num_players=6, num_prix=12, seed=4)
+
+    # Some prix are played at the same time, so only prix_id orders them
+    for earlier, later in [(3, 4), (5, 6), (7, 10)]:
+        date_played = sqlite_db.query(Prix.date_played).filter(Prix.prix_id == earlier).scalar()
+        sqlite_db.query(Prix).filter(Prix.prix_id == later).update({"date_played": date_played})
+    # Player 1 sits out everything from prix 5 on, player 2 first plays in
+    # prix 7 and next in prix 10
+    delete_results(sqlite_db, 1, Prix.prix_id >= 5)
+    delete_results(sqlite_db, 2, Prix.prix_id < 7)
+    sqlite_db.commit()
+
+    recalculate_elo_ratings()
+    full_results, full_ratings = stored_elo(sqlite_db)
+    assert 2 in {player_id for _, player_id, *_ in full_results}
+
+    # Starting at prix 6 must leave prix 5 alone despite the tie, while the
+    # date starts at both. Corrupt everything that should be replayed, so
+    # only the stored ratings before the start, and player 2's starting_elo
+    # in prix 7, can seed it.
+    if start == "from_prix_id":
+        first_prix, start_value = 6, 6
+    else:
+        first_prix = 5
+        start_value = sqlite_db.query(Prix.date_played).filter(Prix.prix_id == 5).scalar()
+    sqlite_db.query(PrixResult).filter(PrixResult.prix_id >= first_prix).update(
+        {"elo_adjustment": 0, "ending_elo": 0}
+    )
+    sqlite_db.query(PrixResult).filter(
+        PrixResult.prix_id >= first_prix, (PrixResult.player_id != 2) | (PrixResult.prix_id != 7)
+    ).update({"starting_elo": 0})
+    sqlite_db.query(PrixResult).filter(PrixResult.prix_id < first_prix).update(
+        {"placement": PrixResult.placement + 100}
+    )
+    sqlite_db.query(Player).filter(Player.player_id != 1).update({"elo_rating": 0})
+    # Players who sat out the replay keep whatever rating they have stored
+    sqlite_db.query(Player).filter(Player.player_id == 1).update({"elo_rating": 1234})
+    sqlite_db.commit()
+
+    recalculate_elo_ratings(**{start: start_value})
+    results, ratings = stored_elo(sqlite_db)
+
+    # Prix before the start are left as stored
+    assert results == [
+        (prix_id, player_id, placement + 100 if prix_id < first_prix else placement, *elo)
+        for prix_id, player_id, placement, *elo in full_results
+    ]
+    assert ratings == {**full_ratings, 1: 1234}
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,41 @@
+import pytest
+
+from database import _profile as query_profile
+from render_profiler import profile_rerun, profile_section
+
+def test_sections_nest_and_label_queries(tmp_path):
+    labels = []
+    with profile_rerun("sections", str(tmp_path)) as profile:
+        with profile_section("Home"):
+            with profile_section("Leaderboard"):
+                labels.append(query_profile.section)
+        with profile_section("History"):
+            pass
+
+    assert [s.name for s in profile.sections] == ["Home / Leaderboard", "Home", "History"]
+    assert labels == ["Home / Leaderboard"]
+    assert profile.total_seconds >= max(s.seconds for s in profile.sections)
+
+    report = open(profile.report_path).read()
+    assert "Home / Leaderboard" in report
+    assert "functions by cumulative time" not in report
+
+def test_functions_mode_reports_top_functions(tmp_path):
+    with profile_rerun("functions", str(tmp_path)) as profile:
+        with profile_section("Home"):
+            sorted(range(1000), key=str)
+
+    report = open(profile.report_path).read()
+    assert "Top 30 functions by cumulative time" in report
+    assert "builtins.sorted" in report
+
+def test_off_mode_records_nothing(tmp_path):
+    with profile_rerun("off", str(tmp_path)) as profile:
+        with profile_section("Home"):
+            pass
+    assert profile is None
+    assert not list(tmp_path.iterdir())
+
+    with pytest.raises(ValueError):
+        with profile_rerun("everything", str(tmp_path)):
+            pass
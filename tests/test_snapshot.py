@@ -0,0 +1,65 @@
+import gzip
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import sessionmaker
+
+from config import DatabaseConfig
+from database import create_db_engine
+from models import Base
+from scripts.load_fixtures import load_history
+from scripts.snapshot import export_snapshot, import_snapshot, snapshot_tables
+from scripts.synthetic_history import iter_history
+
+def new_database():
+    engine = create_db_engine(DatabaseConfig(backend='sqlite', sqlite_path=':memory:'))
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+def table_rows(db):
+    return {
+        table.name: db.execute(select(table).order_by(*table.primary_key.columns)).all()
+        for table in snapshot_tables()
+    }
+
+def test_snapshot_round_trip(sqlite_db, tmp_path):
+    load_history(sqlite_db, iter_history(num_players=4, num_prix=15, seed=9, chunk_size=4))
+    sqlite_db.commit()
+    manifest = export_snapshot(sqlite_db, tmp_path)
+    assert manifest["tables"]["race_results"]["rows"] > 0
+
+    restored = new_database()
+    counts = import_snapshot(restored, tmp_path)
+    restored.commit()
+
+    assert counts == {name: info["rows"] for name, info in manifest["tables"].items()}
+    assert table_rows(restored) == table_rows(sqlite_db)
+
+    # Restoring again needs --replace, which leaves the same rows
+    with pytest.raises(ValueError, match="pass --replace"):
+        import_snapshot(restored, tmp_path)
+    import_snapshot(restored, tmp_path, replace=True)
+    restored.commit()
+    assert table_rows(restored) == table_rows(sqlite_db)
+
+def test_snapshot_refuses_a_different_schema_revision(sqlite_db, tmp_path):
+    sqlite_db.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32))"))
+    sqlite_db.execute(text("INSERT INTO alembic_version VALUES ('old')"))
+    export_snapshot(sqlite_db, tmp_path)
+
+    restored = new_database()
+    restored.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32))"))
+    restored.execute(text("INSERT INTO alembic_version VALUES ('new')"))
+    with pytest.raises(ValueError, match="schema revision old"):
+        import_snapshot(restored, tmp_path)
+
+def test_snapshot_refuses_unknown_columns(sqlite_db, tmp_path):
+    manifest = export_snapshot(sqlite_db, tmp_path)
+    with gzip.open(tmp_path / manifest["tables"]["players"]["file"], "wt") as f:
+        f.write("player_id,player_nickname,nickname_color\n")
+
+    with pytest.raises(ValueError, match="columns not in players: nickname_color"):
+        import_snapshot(new_database(), tmp_path)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+
+import kart_combos
+from config import DatabaseConfig
+from leaderboard import get_leaderboard
+from models import Player, PrixResult
+from prix_finalization import finalize_prix
+from sql_compat import string_agg
+
+def test_sqlite_urls():
+    assert DatabaseConfig(backend='sqlite', sqlite_path='/tmp/mk.db').database_url == 'sqlite:////tmp/mk.db'
+    assert DatabaseConfig(backend='sqlite', sqlite_path=':memory:').database_url == 'sqlite:///:memory:'
+    with pytest.raises(ValueError):
+        DatabaseConfig(backend='mysql').database_url
+
+def test_finalize_prix_upserts_results_and_ratings(sqlite_db, sqlite_history):
+    sqlite_history(num_players=4, num_prix=1, seed=5)
+
+    finalize_prix(sqlite_db, 1)
+    # Finalizing again overwrites the results rather than duplicating them
+    rows = finalize_prix(sqlite_db, 1)
+    sqlite_db.commit()
+
+    results = {r.player_id: r.ending_elo for r in sqlite_db.query(PrixResult)}
+    ratings = dict(sqlite_db.query(Player.player_id, Player.elo_rating))
+    assert results == {row["player_id"]: row["ending_elo"] for row in rows}
+    assert all(ratings[player_id] == ending_elo for player_id, ending_elo in results.items())
+    assert {entry.player_nickname for entry in get_leaderboard(sqlite_db)} == set(
+        f"player{player_id}" for player_id in results
+    )
+
+def test_get_or_create_combos_on_sqlite(sqlite_db, sqlite_history):
+    sqlite_history(num_players=2, num_prix=1)
+    existing = ("Mario", "Standard Kart", "Standard", "Super Glider")
+    new = ("Luigi", "Pipe Frame", "Slick", "Parafoil")
+
+    combo_ids = kart_combos.get_or_create_combos(sqlite_db, [existing, new, new])
+    kart_combos.set_last_combos(sqlite_db, {2: combo_ids[new]}, played_at=datetime(2024, 5, 1))
+    sqlite_db.commit()
+
+    assert combo_ids[existing] == 1
+    assert kart_combos.get_last_combo(sqlite_db, "player2").vehicle_name == "Pipe Frame"
+    assert dict(sqlite_db.query(Player.player_id, Player.last_played_at)) == {1: None, 2: datetime(2024, 5, 1)}
+
+def test_string_agg_on_sqlite(sqlite_db, sqlite_history):
+    sqlite_history(num_players=3, num_prix=1)
+
+    names = sqlite_db.query(string_agg(Player.player_nickname, ' and ')).scalar()
+
+    assert sorted(names.split(' and ')) == ["player1", "player2", "player3"]
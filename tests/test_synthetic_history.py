@@ -0,0 +1,33 @@
+import pytest
+from scripts.synthetic_history import HISTORY_TABLES, PLAYER_COUNTS, RACE_COUNTS, generate_history, iter_history
+
+def test_history_respects_prix_domains():
+    history = generate_history(num_players=6, num_prix=50, seed=1)
+
+    assert RACE_COUNTS == [4, 6, 8, 12, 16, 24, 32, 48]
+    assert PLAYER_COUNTS == [1, 2, 3, 4]
+    for prix in history["prixs"]:
+        assert prix["race_count"] in RACE_COUNTS
+        assert 2 <= prix["number_of_players"] <= 4
+    assert len(history["races"]) == sum(prix["race_count"] for prix in history["prixs"])
+    assert all(1 <= result["points_earned"] <= 15 for result in history["race_results"])
+
+def test_history_is_reproducible():
+    assert generate_history(num_prix=10, seed=3) == generate_history(num_prix=10, seed=3)
+
+def test_fixed_races_per_prix_must_be_allowed():
+    history = generate_history(num_prix=5, races_per_prix=12)
+    assert {prix["race_count"] for prix in history["prixs"]} == {12}
+
+    with pytest.raises(ValueError):
+        generate_history(races_per_prix=5)
+
+def test_chunks_add_up_to_the_full_history():
+    chunks = list(iter_history(num_players=5, num_prix=23, seed=2, chunk_size=10))
+
+    assert [len(chunk["prixs"]) for chunk in chunks[1:]] == [10, 10, 3]
+    merged = {table: [row for chunk in chunks for row in chunk.get(table, [])] for table in HISTORY_TABLES}
+    assert merged == generate_history(num_players=5, num_prix=23, seed=2)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
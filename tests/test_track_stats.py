@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import select
+
+from models import PlayerTrackStats
+from track_stats import get_player_track_stats, record_race, refresh_player_track_stats
+
+def rollup(db):
+    return db.execute(
+        select(PlayerTrackStats.__table__).order_by(PlayerTrackStats.player_id, PlayerTrackStats.track_id)
+    ).all()
+
+def test_record_race_matches_a_full_rebuild(sqlite_db, sqlite_history):
+    history = sqlite_history(num_players=5, num_prix=6, seed=11)
+
+    for race in history["races"]:
+        record_race(sqlite_db, race["race_id"])
+    incremental = rollup(sqlite_db)
+
+    refresh_player_track_stats(sqlite_db)
+    assert incremental == rollup(sqlite_db)
+    assert sum(row.races for row in incremental) == len(history["race_results"])
+
+def test_get_player_track_stats_filters_and_averages(sqlite_db, sqlite_history):
+    history = sqlite_history(num_players=4, num_prix=8, seed=12)
+    refresh_player_track_stats(sqlite_db)
+
+    track_name = history["tracks"][history["races"][0]["track_id"] - 1]["track_name"]
+    rows = get_player_track_stats(sqlite_db, track_name=track_name)
+    assert rows and {row.track_name for row in rows} == {track_name}
+    assert [row.avg_points for row in rows] == sorted((row.avg_points for row in rows), reverse=True)
+
+    # Averages agree with the raw race results
+    track_id = history["races"][0]["track_id"]
+    race_ids = {race["race_id"] for race in history["races"] if race["track_id"] == track_id}
+    for row in rows:
+        player_id = int(row.player_nickname.removeprefix("player"))
+        points = [
+            result["points_earned"] for result in history["race_results"]
+            if result["race_id"] in race_ids and result["player_id"] == player_id
+        ]
+        assert row.races == len(points)
+        assert row.avg_points == pytest.approx(sum(points) / len(points))
+
+    player_rows = get_player_track_stats(sqlite_db, player_nicknames=["player1", "player2"])
+    assert {row.player_nickname for row in player_rows} == {"player1", "player2"}
+    assert get_player_track_stats(sqlite_db, track_name=track_name, player_nicknames=["nobody"]) == []
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,100 @@
+from sqlalchemy import Float, cast, delete, desc, func, insert, select
+from sqlalchemy.orm import Session
+from models import Player, PlayerTrackStats, Race, RaceResult, Track
+from sql_compat import upsert
+
+ROLLUP_COLUMNS = ['player_id', 'track_id', 'races', 'wins', 'points_sum', 'position_sum']
+
+
+def _race_result_totals(*filters):
+    """Per-player, per-track totals over the race_results matching filters."""
+    return (
+        select(
+            RaceResult.player_id,
+            Race.track_id,
+            func.count(RaceResult.result_id),
+            func.count(RaceResult.result_id).filter(RaceResult.finish_position == 1),
+            func.sum(RaceResult.points_earned),
+            func.sum(RaceResult.finish_position)
+        )
+        .join(Race, RaceResult.race_id == Race.race_id)
+        .where(RaceResult.player_id.isnot(None), Race.track_id.isnot(None), *filters)
+        .group_by(RaceResult.player_id, Race.track_id)
+    )
+
+
+def refresh_player_track_stats(db: Session) -> None:
+    """
+    Rebuild the player_track_stats rollup from race_results.
+
+    Use after writes that edit or delete existing race results; new races
+    are added incrementally with record_race.
+
+    Args:
+        db: Database session
+    """
+    db.execute(delete(PlayerTrackStats))
+    db.execute(insert(PlayerTrackStats).from_select(ROLLUP_COLUMNS, _race_result_totals()))
+
+
+def record_race(db: Session, race_id: int) -> None:
+    """
+    Add a newly inserted race's results to the player_track_stats rollup.
+
+    One INSERT ... SELECT ... ON CONFLICT statement adds each player's
+    result to their running totals for the race's track. Call it once,
+    after the race's results are inserted, in the same transaction.
+
+    Args:
+        db: Database session
+        race_id: Race whose results were just inserted
+    """
+    stmt = upsert(db, PlayerTrackStats).from_select(
+        ROLLUP_COLUMNS, _race_result_totals(Race.race_id == race_id)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['player_id', 'track_id'],
+        set_={
+            "races": PlayerTrackStats.races + stmt.excluded.races,
+            "wins": PlayerTrackStats.wins + stmt.excluded.wins,
+            "points_sum": PlayerTrackStats.points_sum + stmt.excluded.points_sum,
+            "position_sum": PlayerTrackStats.position_sum + stmt.excluded.position_sum,
+        }
+    )
+    db.execute(stmt)
+
+
+def get_player_track_stats(db: Session, track_name: str = None, player_nicknames=None) -> list:
+    """
+    Read per-player, per-track stats from the rollup.
+
+    Either filter narrows the read to an index lookup: a track goes through
+    ix_player_track_stats_track_id, players through the primary key.
+
+    Args:
+        db: Database session
+        track_name: Only this track, or None for every track
+        player_nicknames: Only these players, or None for every player
+
+    Returns:
+        List of rows with player_nickname, track_name, races, wins,
+        avg_points and avg_position, highest avg_points first
+    """
+    query = (
+        db.query(
+            Player.player_nickname,
+            Track.track_name,
+            PlayerTrackStats.races,
+            PlayerTrackStats.wins,
+            (cast(PlayerTrackStats.points_sum, Float) / PlayerTrackStats.races).label('avg_points'),
+            (cast(PlayerTrackStats.position_sum, Float) / PlayerTrackStats.races).label('avg_position')
+        )
+        .join(Player, Player.player_id == PlayerTrackStats.player_id)
+        .join(Track, Track.track_id == PlayerTrackStats.track_id)
+    )
+    if track_name is not None:
+        query = query.filter(Track.track_name == track_name)
+    if player_nicknames is not None:
+        query = query.filter(Player.player_nickname.in_(player_nicknames))
+
+    return query.order_by(desc('avg_points'), Player.player_nickname, Track.track_name).all()